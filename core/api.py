@@ -20,6 +20,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['display_name', 'nickname', 'current_location', 'user__username', 'user__email']
     ordering_fields = ['display_name', 'created_at']
+    ordering = ['pk']
 
     def get_queryset(self):
         qs = super().get_queryset()
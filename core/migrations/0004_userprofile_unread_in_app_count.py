@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_unread(apps, schema_editor):
+    UserProfile = apps.get_model('core', 'UserProfile')
+    Notification = apps.get_model('notifications', 'Notification')
+    UserProfile.objects.update(unread_in_app_count=Coalesce(Subquery(
+        Notification.objects.filter(recipient_id=OuterRef('user_id'), channel='in_app', is_read=False)
+        .order_by().values('recipient_id').annotate(n=Count('pk')).values('n')
+    ), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_userprofile_digest_frequency_and_more'),
+        ('notifications', '0003_notificationbatch_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_in_app_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
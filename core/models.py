@@ -113,6 +113,8 @@ class UserProfile(models.Model):
     digest_frequency = models.CharField(
         max_length=10, choices=DIGEST_CHOICES, default='instant'
     )
+    # Unread in-app notifications, kept by notifications/counters.py
+    unread_in_app_count = models.PositiveIntegerField(default=0, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
@@ -120,6 +122,16 @@ class UserProfile(models.Model):
     def __str__(self):
         return self.display_name or self.nickname or self.user.username
 
+    def save(self, *args, **kwargs):
+        # The unread counter only changes through single UPDATEs; a full save
+        # of a profile loaded earlier must not write back a stale copy.
+        if self.pk and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'unread_in_app_count'
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return self.user.get_full_name() or self.display_name or self.user.username
@@ -0,0 +1,139 @@
+"""
+core/pagination.py — Keyset (cursor) pagination for every list endpoint
+
+List views page with opaque cursors instead of OFFSET. Every ordering gets
+the primary key as a final tie-breaker, and the cursor holds the values of
+all of its fields for the last row sent; the next page is the rows strictly
+after that tuple ((a > x) OR (a = x AND b > y) OR …). Positions are unique,
+so pages never repeat or skip rows however many share a last name, deep
+pages cost the same index range scan as the first one, and rows inserted
+meanwhile never shift a page. ``max_page_size`` caps what one request can
+pull.
+"""
+
+import datetime
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def _nullable(model, field_name):
+    if field_name == 'pk':
+        return False
+    try:
+        return model._meta.get_field(field_name).null
+    except FieldDoesNotExist:  # annotation
+        return False
+
+
+class _PositionEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds times to milliseconds; a cursor needs them exact
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-pk',)
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if any(_nullable(queryset.model, field.lstrip('-')) for field in ordering):
+            # A NULL cursor value can't be compared against; use the view's
+            # (non-null) default rather than erroring.
+            ordering = tuple(getattr(view, 'ordering', None) or self.ordering)
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            # Tie-break in the lead field's direction
+            ordering += ('-pk' if ordering[0].startswith('-') else 'pk',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        queryset = queryset.order_by(*(
+            [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+            if reverse else self.ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > len(self.page) else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, position, reverse):
+        """Rows strictly after ``position`` in the (possibly reversed) ordering."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        branches = []
+        for i, (field, value) in enumerate(zip(self.ordering, values)):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            equal = [Q(**{f.lstrip('-'): v}) for f, v in zip(self.ordering[:i], values[:i])]
+            branches.append(reduce(and_, equal, Q(**{f'{name}__{lookup}': value})))
+        return reduce(or_, branches)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [
+            instance[field.lstrip('-')] if isinstance(instance, dict)
+            else getattr(instance, field.lstrip('-'))
+            for field in ordering
+        ]
+        return json.dumps(values, cls=_PositionEncoder, separators=(',', ':'))
+
+
+def paginated_response(request, queryset, ordering, serializer_class, context=None):
+    """
+    Page a queryset for a custom @action that lists a different model than
+    its viewset. The ordering is fixed by the caller, so ``?ordering=`` meant
+    for the viewset's own model is not applied here.
+    """
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    context = {'request': request, **(context or {})}
+    return paginator.get_paginated_response(
+        serializer_class(page, many=True, context=context).data
+    )
@@ -0,0 +1,143 @@
+"""
+core/tasks.py — Background tasks for side effects that need not hold up a request
+
+A task is a plain function registered with @task; callers enqueue it:
+
+    @task(max_retries=3)
+    def deliver_notifications(messages):
+        ...
+
+    deliver_notifications.enqueue(rows, key=f'change_approved:{cr.pk}')
+
+enqueue() waits for the surrounding transaction to commit (a rollback
+enqueues nothing, and the task never reads rows that are not there yet) and
+then hands the call to settings.TASK_BACKEND:
+- 'celery': the worker of la_racine/celery.py runs it; needs a broker,
+- 'thread': a process-wide thread pool, for single-box deployments,
+- 'eager': inline right after commit — tests and local development.
+
+Arguments must be JSON-serializable. A ``key`` makes the call idempotent:
+it is claimed in the cache when the task first runs, and later calls with
+the same key are dropped for TASK_IDEMPOTENCY_TTL seconds (the default
+cache, shared Redis unless DEBUG — see settings.CACHES). A failing task is run again up to
+``max_retries`` times, TASK_RETRY_DELAY × 2^attempt seconds apart; the key
+is released once retries are exhausted, so the work can be enqueued again.
+A final failure is logged and dropped on every backend — with 'eager' the
+request's data has already committed, so raising would only turn it into a
+500. Calling the task object directly runs it synchronously and raises.
+"""
+
+import importlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Task:
+    """A registered task function; see the module docstring."""
+
+    def __init__(self, func, name, max_retries):
+        self.func = func
+        self.name = name
+        self.max_retries = max_retries
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, key=None, **kwargs):
+        """Run the task in the background once the current transaction commits."""
+        transaction.on_commit(partial(_dispatch, self.name, list(args), kwargs, key, 0))
+
+
+def task(func=None, *, name=None, max_retries=3):
+    """Register ``func`` as a task; usable with or without arguments."""
+    if func is None:
+        return partial(task, name=name, max_retries=max_retries)
+    registered = Task(func, name or f'{func.__module__}.{func.__name__}', max_retries)
+    TASKS[registered.name] = registered
+    return registered
+
+
+def get_task(name):
+    """The registered task ``name``, importing its module when needed (workers)."""
+    if name not in TASKS:
+        importlib.import_module(name.rpartition('.')[0])
+    return TASKS[name]
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_setting('TASK_THREADS', 4), thread_name_prefix='task'
+            )
+        return _executor
+
+
+def _run_in_thread(*call):
+    try:
+        run(*call)
+    finally:
+        close_old_connections()
+
+
+def _dispatch(name, args, kwargs, key, attempt, delay=0):
+    backend = _setting('TASK_BACKEND', 'eager')
+    call = (name, args, kwargs, key, attempt)
+    if backend == 'celery':
+        from la_racine.celery import run_task
+        run_task.apply_async(call, countdown=delay)
+    elif backend == 'thread':
+        if delay:
+            timer = threading.Timer(delay, lambda: _pool().submit(_run_in_thread, *call))
+            timer.daemon = True
+            timer.start()
+        else:
+            _pool().submit(_run_in_thread, *call)
+    else:
+        run(*call)
+
+
+def _claim_key(key):
+    return f'task:{key}'
+
+
+def run(name, args, kwargs, key=None, attempt=0):
+    """Run one attempt of a task, then schedule a retry or give up on failure."""
+    task_ = get_task(name)
+    if key and attempt == 0 and not cache.add(
+        _claim_key(key), True, _setting('TASK_IDEMPOTENCY_TTL', 24 * 3600)
+    ):
+        logger.info('Task %s skipped: key %s already ran', name, key)
+        return None
+    try:
+        return task_.func(*args, **kwargs)
+    except Exception:
+        if attempt < task_.max_retries:
+            delay = _setting('TASK_RETRY_DELAY', 2) * 2 ** attempt
+            logger.warning('Task %s failed (attempt %d), retrying in %ss', name, attempt + 1, delay,
+                           exc_info=True)
+            _dispatch(name, args, kwargs, key, attempt + 1, delay)
+            return None
+        logger.exception('Task %s failed after %d attempts', name, attempt + 1)
+        if key:
+            cache.delete(_claim_key(key))
+        return None
@@ -37,7 +37,7 @@ class RolePermissionTests(APITestCase):
         c = self.auth(self.viewer)
         resp = c.get('/api/trees/')
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        names = [t['name'] for t in resp.data]
+        names = [t['name'] for t in resp.data['results']]
         self.assertIn('Owned Tree', names)
 
     def test_stranger_cannot_see_private_tree(self):
@@ -0,0 +1,89 @@
+"""
+core/tests/test_tasks.py — Background task layer tests
+"""
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from core.tasks import task
+
+CALLS = []
+
+
+@task(max_retries=2)
+def record(value):
+    CALLS.append(value)
+
+
+@task(max_retries=2)
+def flaky(failures):
+    CALLS.append('try')
+    if CALLS.count('try') <= failures:
+        raise RuntimeError('transient')
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    """Recorded calls, and no idempotency keys left over in the cache."""
+    cache.clear()
+    CALLS.clear()
+    return CALLS
+
+
+@pytest.fixture
+def eager(settings):
+    settings.TASK_BACKEND = 'eager'
+    settings.TASK_RETRY_DELAY = 0
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('eager')
+class TestEagerTasks:
+
+    def test_runs_after_commit_only(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            record.enqueue(1)
+        assert CALLS == [] and len(callbacks) == 1
+        callbacks[0]()
+        assert CALLS == [1]
+
+    def test_idempotency_key(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            record.enqueue(1, key='record:1')
+            record.enqueue(2, key='record:1')
+            record.enqueue(3, key='record:3')
+        assert CALLS == [1, 3]
+
+    def test_retries_then_succeeds(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            flaky.enqueue(2, key='flaky')
+        assert CALLS == ['try', 'try', 'try']
+
+    def test_gives_up_and_releases_key(self, django_capture_on_commit_callbacks, caplog):
+        with django_capture_on_commit_callbacks(execute=True):
+            flaky.enqueue(5, key='flaky')
+        assert CALLS == ['try', 'try', 'try']
+        assert 'failed after 3 attempts' in caplog.text
+        CALLS.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            flaky.enqueue(0, key='flaky')  # the failed key can run again
+        assert CALLS == ['try']
+
+    def test_direct_call_raises(self):
+        with pytest.raises(RuntimeError):
+            flaky(1)
+
+
+@pytest.mark.django_db
+def test_thread_backend(settings, django_capture_on_commit_callbacks):
+    settings.TASK_BACKEND = 'thread'
+    done = threading.Event()
+
+    @task
+    def signal():
+        done.set()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        signal.enqueue()
+    assert done.wait(5)
@@ -4,16 +4,16 @@
  * Multi-step form to add a new family member to a tree.
  * Sections:
  *   1. Identity  — name, gender, maiden name
- *   2. Life Dates — birth date (FuzzyDate), place of birth, death info
+ *   2. Life Dates — birth date (inline fuzzy date), place of birth, death info
  *   3. About     — occupation, biography, nationality, religion
  *   4. Notes     — internal notes
  */
 
 import React, { useState } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
-import { memberAPI, fuzzyDateAPI } from '../services/api';
+import { memberAPI } from '../services/api';
 import { useTranslation } from 'react-i18next';
-import FuzzyDatePicker from './FuzzyDatePicker';
+import FuzzyDatePicker, { toApiDate } from './FuzzyDatePicker';
 
 // Step definitions
 const STEPS = ['Identity', 'Life Dates', 'About', 'Review'];
@@ -54,19 +54,13 @@ const AddMember = () => {
     ? firstName.trim() && lastName.trim()
     : true;
 
-  /** Create a FuzzyDate record and return its ID, or null if empty */
-  const createFuzzyDate = async (fuzzyObj) => {
-    if (!fuzzyObj || (!fuzzyObj.date && !fuzzyObj.display_text)) return null;
-    const { data } = await fuzzyDateAPI.create(fuzzyObj);
-    return data.id;
-  };
-
   const handleSubmit = async () => {
     setError('');
     setIsLoading(true);
     try {
-      const birthDateId  = await createFuzzyDate(birthDate);
-      const deathDateId  = !isAlive ? await createFuzzyDate(deathDate) : null;
+      // Dates are sent inline with the member
+      const birth = toApiDate(birthDate);
+      const death = !isAlive ? toApiDate(deathDate) : null;
 
       const payload = {
         tree: parseInt(treeId),
@@ -75,10 +69,10 @@ const AddMember = () => {
         ...(maidenName      && { maiden_name: maidenName }),
         ...(nickname        && { nickname }),
         ...(gender          && { gender }),
-        ...(birthDateId     && { birth_date: birthDateId }),
+        ...(birth           && { birth_date: birth }),
         ...(birthLocation   && { birth_location: birthLocation }),
         is_alive: isAlive,
-        ...(deathDateId     && { death_date: deathDateId }),
+        ...(death           && { death_date: death }),
         ...(deathLocation   && { death_location: deathLocation }),
         ...(currentLocation && { current_location: currentLocation }),
         ...(occupation      && { occupation }),
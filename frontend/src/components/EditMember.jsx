@@ -14,7 +14,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { memberAPI } from '../services/api';
-import FuzzyDatePicker from './FuzzyDatePicker';
+import FuzzyDatePicker, { fromApiDate, toApiDate } from './FuzzyDatePicker';
 
 const EditMember = () => {
   const { memberId } = useParams();
@@ -48,6 +48,8 @@ const EditMember = () => {
 
   const [birthDate, setBirthDate] = useState({});
   const [deathDate, setDeathDate] = useState({});
+  // Only dates the user touched are sent, so unedited ones keep their precision
+  const [changedDates, setChangedDates] = useState({});
 
   useEffect(() => {
     const load = async () => {
@@ -76,8 +78,8 @@ const EditMember = () => {
           is_alive: m.is_alive ?? true,
         });
         // Pre-populate fuzzy dates from the API response
-        if (m.birth_date_detail) setBirthDate(m.birth_date_detail);
-        if (m.death_date_detail) setDeathDate(m.death_date_detail);
+        setBirthDate(fromApiDate(m.birth_date_detail));
+        setDeathDate(fromApiDate(m.death_date_detail));
 
         // Candidates for relationship selectors (other members in same tree)
         const all = allMembersRes.data.results ?? allMembersRes.data;
@@ -105,6 +107,16 @@ const EditMember = () => {
     }));
   };
 
+  const changeBirthDate = (value) => {
+    setBirthDate(value);
+    setChangedDates(prev => ({ ...prev, birth_date: true }));
+  };
+
+  const changeDeathDate = (value) => {
+    setDeathDate(value);
+    setChangedDates(prev => ({ ...prev, death_date: true }));
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     if (!formData.first_name.trim() || !formData.last_name.trim()) {
@@ -116,8 +128,11 @@ const EditMember = () => {
     try {
       await memberAPI.update(memberId, {
         ...formData,
-        // Birth/death date IDs come from member.birth_date / member.death_date
-        // (FuzzyDates are managed separately; for now we pass the text display only)
+        // Dates are sent inline
+        ...(changedDates.birth_date && { birth_date: toApiDate(birthDate) }),
+        ...((changedDates.death_date || (formData.is_alive && member.death_date_detail)) && {
+          death_date: formData.is_alive ? null : toApiDate(deathDate),
+        }),
       });
       showToast('success', t('member.updateSuccess'));
       setTimeout(() => navigate(`/members/${memberId}`), 1200);
@@ -240,7 +255,7 @@ const EditMember = () => {
                 <span className="add-member__date-block-icon">🍼</span>
                 <span>{t('member.birth')}</span>
               </div>
-              <FuzzyDatePicker label={t('member.dateOfBirth')} value={birthDate} onChange={setBirthDate} allowBCE={true} />
+              <FuzzyDatePicker label={t('member.dateOfBirth')} value={birthDate} onChange={changeBirthDate} allowBCE={true} />
               <div className="form-group">
                 <label className="form-label">📍 {t('member.placeOfBirth')}</label>
                 <input type="text" name="birth_location" value={formData.birth_location} onChange={handleChange} className="form-input" placeholder="e.g. Kinshasa, DRC" />
@@ -270,7 +285,7 @@ const EditMember = () => {
                   <span className="add-member__date-block-icon">✝</span>
                   <span>{t('member.death')}</span>
                 </div>
-                <FuzzyDatePicker label={t('member.dateOfDeath')} value={deathDate} onChange={setDeathDate} />
+                <FuzzyDatePicker label={t('member.dateOfDeath')} value={deathDate} onChange={changeDeathDate} />
                 <div className="form-group">
                   <label className="form-label">📍 {t('member.placeOfDeath')}</label>
                   <input type="text" name="death_location" value={formData.death_location} onChange={handleChange} className="form-input" />
@@ -23,20 +23,26 @@ const FAMILY_COLORS = [
   { primary: '#0f766e', light: '#ccfbf1', name: 'Teal' },   // teal-700
 ];
 
+// Members come from graphMembers() (services/api.js): display name, years
+// (negative for BCE), parent ids and a spouse id.
+const formatYear = (year) => {
+  if (year === null || year === undefined) return '';
+  return year < 0 ? `${-year} BCE` : year;
+};
+
+const initials = (name) => {
+  const words = name.trim().split(/\s+/);
+  return `${words[0]?.[0] ?? ''}${words.length > 1 ? words[words.length - 1][0] : ''}`;
+};
+
 const FamilyMemberNode = ({ data }) => {
   const { member, onMemberClick, branchColor } = data;
 
-  const formatDate = (dateString) => {
-    if (!dateString) return '';
-    return new Date(dateString).getFullYear();
-  };
-
   const getAge = () => {
-    if (!member.birth_date) return '';
-    const birth = new Date(member.birth_date);
-    const death = member.death_date ? new Date(member.death_date) : new Date();
-    const age = death.getFullYear() - birth.getFullYear();
-    return member.death_date ? ` (${age})` : ` (${age})`;
+    if (member.birth_year === null) return '';
+    if (member.death_year === null && !member.is_alive) return '';
+    const end = member.death_year ?? new Date().getFullYear();
+    return ` (${end - member.birth_year})`;
   };
 
   const inlineStyle = branchColor ? {
@@ -50,37 +56,24 @@ const FamilyMemberNode = ({ data }) => {
       className="family-node"
       onClick={() => onMemberClick(member)}
       data-tooltip-id={`member-tooltip-${member.id}`}
-      data-tooltip-content={`${member.first_name} ${member.last_name}${member.nickname ? ` "${member.nickname}"` : ''}`}
+      data-tooltip-content={member.display_name}
       style={inlineStyle}
     >
-      {member.photo ? (
-        <img
-          src={member.photo}
-          alt={`${member.first_name} ${member.last_name}`}
-        />
-      ) : (
-        <div
-          className="family-node-initials"
-          style={branchColor ? { backgroundColor: branchColor.primary } : {}}
-        >
-          {member.first_name[0]}{member.last_name[0]}
-        </div>
-      )}
+      <div
+        className="family-node-initials"
+        style={branchColor ? { backgroundColor: branchColor.primary } : {}}
+      >
+        {initials(member.display_name)}
+      </div>
 
       <div className="family-node-name">
-        {member.first_name} {member.last_name}
+        {member.display_name}
       </div>
 
       <div className="family-node-dates">
-        {formatDate(member.birth_date)} - {formatDate(member.death_date) || 'Present'}{getAge()}
+        {formatYear(member.birth_year)} - {formatYear(member.death_year) || (member.is_alive ? 'Present' : '?')}{getAge()}
       </div>
 
-      {member.nickname && (
-        <div className="family-node-nickname">
-          "{member.nickname}"
-        </div>
-      )}
-
       {!member.is_alive && (
         <div className="family-node-deceased">
           <span>†</span>
@@ -313,14 +306,9 @@ const FamilyTree = ({ members, onMemberClick }) => {
           style={{ maxWidth: '300px', fontSize: '12px', zIndex: 9999 }}
         >
           <div>
-            <strong>{member.first_name} {member.last_name}</strong>
-            {member.nickname && <div>"{member.nickname}"</div>}
-            <div>Gender: {member.gender || 'Not specified'}</div>
-            {member.birth_date && <div>Born: {new Date(member.birth_date).toLocaleDateString()}</div>}
-            {member.death_date && <div>Died: {new Date(member.death_date).toLocaleDateString()}</div>}
-            {member.location && <div>Location: {member.location}</div>}
-            {member.relationship && <div>Relationship: {member.relationship}</div>}
-            {member.notes && <div>Notes: {member.notes}</div>}
+            <strong>{member.display_name}</strong>
+            {member.birth_year !== null && <div>Born: {formatYear(member.birth_year)}</div>}
+            {member.death_year !== null && <div>Died: {formatYear(member.death_year)}</div>}
           </div>
         </Tooltip>
       ))}
@@ -9,8 +9,8 @@
  * The component outputs a fuzzyDate object:
  *   { precision, date, display_text, bce }
  *
- * The parent must POST this to /api/fuzzy-dates/ and use the returned ID
- * as birth_date or death_date on the FamilyMember.
+ * The parent sends toApiDate(value) inline as birth_date or death_date on
+ * the FamilyMember, and seeds the picker with fromApiDate(member.*_date_detail).
  */
 
 import React, { useState } from 'react';
@@ -20,6 +20,35 @@ const MONTHS = [
   'July','August','September','October','November','December',
 ];
 
+// API precision → picker mode (anything else is an estimate)
+const MODES = { exact: 'full', month_year: 'full', year: 'year' };
+
+/** Picker value for a member's birth_date_detail / death_date_detail. */
+export function fromApiDate(detail) {
+  if (!detail) return {};
+  return {
+    ...detail,
+    precision: MODES[detail.precision] || 'estimate',
+    display_text: detail.display_text || detail.display,
+  };
+}
+
+/**
+ * The picker's value as the API's inline date
+ * { date, precision, bce, display_text }, or null when nothing was entered.
+ */
+export function toApiDate(value) {
+  if (!value || (!value.date && !value.display_text)) return null;
+  const precision = { full: 'exact', year: 'year' }[value.precision]
+    || (value.date ? 'approximate' : 'unknown');
+  return {
+    date: value.date || null,
+    precision,
+    bce: Boolean(value.bce),
+    display_text: value.display_text || '',
+  };
+}
+
 const PRECISION_OPTIONS = [
   { value: 'full',     label: '📅 Full date',    hint: 'Day, month and year' },
   { value: 'year',     label: '🗓️ Year only',    hint: 'Only the year is known' },
@@ -398,7 +398,7 @@ function ChangeRequestsPanel({ memberId }) {
 
   useEffect(() => {
     memberAPI.getChangeRequests(memberId)
-      .then((res) => setRequests(res.data))
+      .then((res) => setRequests(res.data.results ?? res.data))
       .catch(() => { })
       .finally(() => setLoading(false));
   }, [memberId]);
@@ -4,39 +4,26 @@ import { useTranslation } from 'react-i18next';
 const Timeline = ({ members, onMemberClick }) => {
     const { t } = useTranslation();
 
-    // 1. Extract all events (births and deaths)
+    // 1. Extract all events (births and deaths). Members come from
+    //    graphMembers() (services/api.js), with years only; BCE years are negative.
     const events = [];
     members.forEach(member => {
-        if (member.birth_date) {
-            events.push({
-                id: `birth-${member.id}`,
-                date: new Date(member.birth_date),
-                type: 'birth',
-                member: member
-            });
+        if (member.birth_year !== null) {
+            events.push({ id: `birth-${member.id}`, year: member.birth_year, type: 'birth', member });
         }
-        if (member.death_date) {
-            events.push({
-                id: `death-${member.id}`,
-                date: new Date(member.death_date),
-                type: 'death',
-                member: member
-            });
+        if (member.death_year !== null) {
+            events.push({ id: `death-${member.id}`, year: member.death_year, type: 'death', member });
         }
     });
 
-    // 2. Sort events chornologically
-    events.sort((a, b) => a.date - b.date);
-
-    // 3. Group by Year
+    // 2. Group by year
     const eventsByYear = {};
     events.forEach(event => {
-        const year = event.date.getFullYear();
-        if (!eventsByYear[year]) eventsByYear[year] = [];
-        eventsByYear[year].push(event);
+        if (!eventsByYear[event.year]) eventsByYear[event.year] = [];
+        eventsByYear[event.year].push(event);
     });
 
-    const years = Object.keys(eventsByYear).sort((a, b) => a - b);
+    const years = Object.keys(eventsByYear).map(Number).sort((a, b) => a - b);
 
     return (
         <div className="timeline-container">
@@ -49,7 +36,7 @@ const Timeline = ({ members, onMemberClick }) => {
                     <div className="timeline-line"></div>
                     {years.map(year => (
                         <div key={year} className="timeline-year-group">
-                            <div className="timeline-year-marker">{year}</div>
+                            <div className="timeline-year-marker">{year < 0 ? `${-year} BCE` : year}</div>
                             <div className="timeline-events">
                                 {eventsByYear[year].map(event => (
                                     <div
@@ -61,18 +48,10 @@ const Timeline = ({ members, onMemberClick }) => {
                                             {event.type === 'birth' ? '👶' : '⚰️'}
                                         </div>
                                         <div className="timeline-content">
-                                            <div className="timeline-date">
-                                                {event.date.toLocaleDateString(undefined, { month: 'short', day: 'numeric' })}
-                                            </div>
                                             <div className="timeline-title">
-                                                <strong>{event.member.first_name} {event.member.last_name}</strong>
+                                                <strong>{event.member.display_name}</strong>
                                                 {event.type === 'birth' ? t('timeline.wasBorn', ' was born') : t('timeline.passedAway', ' passed away')}
                                             </div>
-                                            {event.member.photo && (
-                                                <div className="timeline-photo">
-                                                    <img src={event.member.photo} alt="" />
-                                                </div>
-                                            )}
                                         </div>
                                     </div>
                                 ))}
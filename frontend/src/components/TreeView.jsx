@@ -6,7 +6,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import TreeThemeProvider from './TreeThemeProvider';
-import { treeAPI } from '../services/api';
+import { treeAPI, graphMembers } from '../services/api';
 import FamilyTree from './FamilyTree';
 import Timeline from './Timeline';
 
@@ -65,7 +65,10 @@ const TreeView = () => {
   const { t } = useTranslation();
   const { treeId } = useParams();
   const [tree, setTree] = useState(null);
-  const [members, setMembers] = useState([]);
+  const [nodes, setNodes] = useState([]);        // every member, from the compact graph
+  const [members, setMembers] = useState([]);    // full rows for the list, page by page
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState('');
   const [viewMode, setViewMode] = useState('list');
@@ -74,13 +77,15 @@ const TreeView = () => {
   useEffect(() => {
     const fetchTreeData = async () => {
       try {
-        const [treeRes, membersRes] = await Promise.all([
+        const [treeRes, graphRes, pageRes] = await Promise.all([
           treeAPI.get(treeId),
-          treeAPI.getMembers(treeId),
+          treeAPI.getGraph(treeId),
+          treeAPI.getMembersPage(treeId),
         ]);
         setTree(treeRes.data);
-        const membersData = membersRes.data.results ?? membersRes.data;
-        setMembers(membersData);
+        setNodes(graphMembers(graphRes.data));
+        setMembers(pageRes.data.results);
+        setNextPage(pageRes.data.next);
       } catch {
         setError(t('messages.errorOccurred'));
       } finally {
@@ -91,6 +96,19 @@ const TreeView = () => {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [treeId]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const { data } = await treeAPI.getMembersPage(treeId, nextPage);
+      setMembers(prev => [...prev, ...data.results]);
+      setNextPage(data.next);
+    } catch {
+      setError(t('messages.errorOccurred'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filtered = search.trim()
     ? members.filter(m =>
         `${m.first_name} ${m.last_name} ${m.nickname || ''}`.toLowerCase()
@@ -147,7 +165,7 @@ const TreeView = () => {
           </div>
 
           <div className="tree-view__meta">
-            <span className="tree-view__meta-item tree-view__meta-item--on-dark">👥 {members.length} member{members.length !== 1 ? 's' : ''}</span>
+            <span className="tree-view__meta-item tree-view__meta-item--on-dark">👥 {nodes.length} member{nodes.length !== 1 ? 's' : ''}</span>
             {tree.privacy_level && (
               <span className="tree-view__meta-item tree-view__meta-item--on-dark">🔒 {tree.privacy_level}</span>
             )}
@@ -192,7 +210,7 @@ const TreeView = () => {
       </div>
 
       {/* Content */}
-      {members.length === 0 ? (
+      {nodes.length === 0 ? (
         <div className="tree-view__empty">
           <div className="tree-view__empty-icon">👥</div>
           <h2>No members yet</h2>
@@ -202,9 +220,9 @@ const TreeView = () => {
           </Link>
         </div>
       ) : viewMode === 'tree' ? (
-        <FamilyTree members={members} onMemberClick={() => {}} />
+        <FamilyTree members={nodes} onMemberClick={() => {}} />
       ) : viewMode === 'timeline' ? (
-        <Timeline members={members} onMemberClick={() => {}} />
+        <Timeline members={nodes} onMemberClick={() => {}} />
       ) : (
         <div className="tree-view__members-grid">
           {filtered.length === 0 ? (
@@ -214,6 +232,11 @@ const TreeView = () => {
               <MemberCard key={member.id} member={member} treeId={treeId} />
             ))
           )}
+          {nextPage && (
+            <button className="btn btn--ghost tree-view__load-more" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? t('messages.loadingData') : 'Load more members'}
+            </button>
+          )}
         </div>
       )}
     </div>
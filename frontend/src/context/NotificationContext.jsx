@@ -4,10 +4,11 @@
  * Provides notification state globally:
  * - unreadCount: shown on the bell icon in Header
  * - notifications: recent notifications list
- * - Auto-polls for unread count every 30 seconds when user is authenticated
+ * - Live updates over the notification stream (Server-Sent Events) when
+ *   user is authenticated; polls every 30 seconds where EventSource is missing
  */
 
-import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
+import React, { createContext, useContext, useState, useEffect, useCallback, useRef } from 'react';
 import { notificationAPI } from '../services/api';
 import { useAuth } from '../hooks/useAuth';
 
@@ -25,6 +26,8 @@ export const NotificationProvider = ({ children }) => {
   const [unreadCount, setUnreadCount] = useState(0);
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(false);
+  // While the stream is open the server sends every unread count change
+  const streaming = useRef(false);
 
   const refresh = useCallback(async () => {
     if (!isAuthenticated) return;
@@ -43,7 +46,7 @@ export const NotificationProvider = ({ children }) => {
     }
   }, [isAuthenticated]);
 
-  // Poll every 30 seconds while authenticated
+  // Follow the stream while authenticated
   useEffect(() => {
     if (!isAuthenticated) {
       setUnreadCount(0);
@@ -51,8 +54,43 @@ export const NotificationProvider = ({ children }) => {
       return;
     }
     refresh();
-    const interval = setInterval(refresh, 30_000);
-    return () => clearInterval(interval);
+    if (typeof EventSource === 'undefined') {
+      const interval = setInterval(refresh, 30_000);
+      return () => clearInterval(interval);
+    }
+
+    let source;
+    let retry;
+    let lastEventId = null;
+    const connect = () => {
+      source = notificationAPI.stream(lastEventId);
+      source.onopen = () => { streaming.current = true; };
+      source.addEventListener('unread', (e) => {
+        const data = JSON.parse(e.data);
+        setUnreadCount((c) => data.unread_count ?? Math.max(0, c + data.delta));
+      });
+      source.addEventListener('notification', (e) => {
+        lastEventId = e.lastEventId;
+        const notif = JSON.parse(e.data);
+        setNotifications((prev) =>
+          prev.some((n) => n.id === notif.id) ? prev : [notif, ...prev]
+        );
+      });
+      source.onerror = () => {
+        // EventSource retries dropped connections itself; a rejected one
+        // (expired token) is closed: refresh the token through the API, then reconnect
+        if (source.readyState === EventSource.CLOSED) {
+          streaming.current = false;
+          retry = setTimeout(() => refresh().finally(connect), 5_000);
+        }
+      };
+    };
+    connect();
+    return () => {
+      clearTimeout(retry);
+      source.close();
+      streaming.current = false;
+    };
   }, [isAuthenticated, refresh]);
 
   const markRead = useCallback(async (id) => {
@@ -61,7 +99,7 @@ export const NotificationProvider = ({ children }) => {
       setNotifications((prev) =>
         prev.map((n) => (n.id === id ? { ...n, is_read: true } : n))
       );
-      setUnreadCount((c) => Math.max(0, c - 1));
+      if (!streaming.current) setUnreadCount((c) => Math.max(0, c - 1));
     } catch { /* ignore */ }
   }, []);
 
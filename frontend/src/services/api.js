@@ -86,6 +86,41 @@ api.interceptors.response.use(
   }
 );
 
+// ── Collect every page of a cursor-paginated list ────────────────────────────
+// List endpoints return { next, previous, results }. Views that need the whole
+// set (e.g. the tree canvas) follow `next` and get back a plain array.
+export const getAllPages = async (url, params) => {
+  let res = await api.get(url, { params: { page_size: 200, ...params } });
+  const results = [...(res.data.results ?? res.data)];
+  while (res.data.next) {
+    res = await api.get(res.data.next);
+    results.push(...res.data.results);
+  }
+  return { ...res, data: results };
+};
+
+// ── Compact tree graph → one node per member ─────────────────────────────────
+// GET /trees/{id}/graph/ returns parallel columns plus edge lists holding
+// positions into them (tree/graph.py). The canvas and timeline want one
+// object per member with parent ids and a spouse id.
+export const graphMembers = (graph) => {
+  const nodes = graph.ids.map((id, i) => ({
+    id,
+    display_name: graph.names[i],
+    birth_year: graph.birth_years[i],
+    death_year: graph.death_years[i],
+    is_alive: graph.living[i],
+    parent_ids: [],
+    spouse: null,
+  }));
+  graph.parents.forEach(([parent, child]) => nodes[child].parent_ids.push(nodes[parent].id));
+  graph.spouses.forEach(([a, b]) => {
+    nodes[a].spouse ??= nodes[b].id;
+    nodes[b].spouse ??= nodes[a].id;
+  });
+  return nodes;
+};
+
 // ────────────────────────────────────────────────────────────────────────────
 // Auth
 // ────────────────────────────────────────────────────────────────────────────
@@ -116,8 +151,13 @@ export const treeAPI = {
   update: (id, data) => api.patch(`/trees/${id}/`, data),
   delete: (id) => api.delete(`/trees/${id}/`),
 
-  getMembers: (treeId) => api.get(`/trees/${treeId}/members/`),
-  getPermissions: (treeId) => api.get(`/trees/${treeId}/permissions/`),
+  getMembers: (treeId) => getAllPages(`/trees/${treeId}/members/`),
+  // One page of full member rows; pass the previous page's `next` to continue
+  getMembersPage: (treeId, next) => (next
+    ? api.get(next)
+    : api.get(`/trees/${treeId}/members/`, { params: { page_size: 50 } })),
+  getGraph: (treeId) => api.get(`/trees/${treeId}/graph/`),
+  getPermissions: (treeId) => getAllPages(`/trees/${treeId}/permissions/`),
   grantPermission: (treeId, data) => api.post(`/trees/${treeId}/permissions/grant/`, data),
   getUpdates: (treeId) => api.get(`/trees/${treeId}/updates/`),
   getPendingChanges: (treeId) => api.get(`/trees/${treeId}/pending_changes/`),
@@ -149,16 +189,7 @@ export const memberAPI = {
   getPrivacy: (id) => api.get(`/members/${id}/privacy/`),
   updatePrivacy: (id, data) => api.patch(`/members/${id}/privacy/`, data),
 
-  getValidators: (id) => api.get(`/members/${id}/validators/`),
-};
-
-// ────────────────────────────────────────────────────────────────────────────
-// FuzzyDates
-// ────────────────────────────────────────────────────────────────────────────
-export const fuzzyDateAPI = {
-  create: (data) => api.post('/fuzzy-dates/', data),
-  get: (id) => api.get(`/fuzzy-dates/${id}/`),
-  update: (id, data) => api.patch(`/fuzzy-dates/${id}/`, data),
+  getValidators: (id) => getAllPages(`/members/${id}/validators/`),
 };
 
 // ────────────────────────────────────────────────────────────────────────────
@@ -199,6 +230,12 @@ export const notificationAPI = {
   getUnreadCount: () => api.get('/notifications/unread-count/'),
   markRead: (id) => api.patch(`/notifications/${id}/read/`),
   markAllRead: () => api.post('/notifications/mark-all-read/'),
+  // EventSource cannot send headers, so the access token goes in the query
+  stream: (lastEventId) => {
+    const params = new URLSearchParams({ token: localStorage.getItem('access_token') || '' });
+    if (lastEventId) params.set('last_event_id', lastEventId);
+    return new EventSource(`${API_BASE_URL}/notifications/stream/?${params}`);
+  },
 };
 
 // ────────────────────────────────────────────────────────────────────────────
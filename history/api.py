@@ -5,29 +5,47 @@ history/api.py — Life Events & Audit Log API
 from rest_framework import viewsets, permissions, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from tree.access import accessible_tree_ids
+from tree.dates import range_q
 from .models import LifeEvent, HistoryEvent, AuditLog
 from .serializers import LifeEventSerializer, HistoryEventSerializer, AuditLogSerializer
 
 
+class LifeEventTimelineFilter(filters.BaseFilterBackend):
+    """
+    ?member= plus ?date_after= / ?date_before= / ?date_overlaps= over the
+    indexed day-number range of each event (tree/dates.py).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        member = request.query_params.get('member')
+        if member:
+            if not member.isdigit():
+                raise ValidationError({'member': 'Must be an integer.'})
+            queryset = queryset.filter(member_id=int(member))
+        try:
+            match = range_q(request.query_params, 'date', 'date_low', 'date_high')
+        except ValueError as exc:
+            raise ValidationError({'date': str(exc)})
+        return queryset if match is None else queryset.filter(match)
+
+
 class LifeEventViewSet(viewsets.ModelViewSet):
     """Life events / timeline entries for family members."""
     serializer_class = LifeEventSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [LifeEventTimelineFilter, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'location', 'event_type']
-    ordering_fields = ['date', 'created_at']
+    ordering_fields = ['date', 'date_low', 'created_at']
+    ordering = ['created_at']
 
     def get_queryset(self):
         user = self.request.user
         qs = LifeEvent.objects.select_related('member', 'added_by')
         if user.is_staff:
             return qs
-        return qs.filter(
-            Q(member__tree__created_by=user) |
-            Q(member__tree__permissions__user=user,
-              member__tree__permissions__status='active')
-        ).distinct()
+        return qs.filter(member__tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         serializer.save(added_by=self.request.user)
@@ -40,6 +58,7 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['model_name', 'action', 'user__username']
     ordering_fields = ['timestamp']
+    ordering = ['-timestamp']
 
     def get_queryset(self):
         user = self.request.user
@@ -57,16 +76,13 @@ class HistoryEventViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['event_type', 'description']
     ordering_fields = ['date']
+    ordering = ['-date']
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return super().get_queryset()
-        return HistoryEvent.objects.filter(
-            Q(member__tree__created_by=user) |
-            Q(member__tree__permissions__user=user,
-              member__tree__permissions__status='active')
-        ).distinct()
+        return HistoryEvent.objects.filter(member__tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         # HistoryEvent (legacy) has no added_by field; nothing extra to inject
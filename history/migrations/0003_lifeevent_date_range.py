@@ -0,0 +1,52 @@
+"""
+Earliest/latest day numbers on LifeEvent for date-range timeline filters.
+"""
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_date_range(apps, schema_editor):
+    from tree.dates import fuzzy_range
+    LifeEvent = apps.get_model('history', 'LifeEvent')
+    last_pk = 0
+    while True:
+        batch = list(LifeEvent.objects.filter(pk__gt=last_pk, date__isnull=False).order_by('pk')[:BATCH_SIZE])
+        if not batch:
+            break
+        for event in batch:
+            precision = 'approximate' if event.date_is_approximate else 'exact'
+            event.date_low = fuzzy_range(event.date, precision)[0]
+            event.date_high = fuzzy_range(event.end_date or event.date, precision)[1]
+        LifeEvent.objects.bulk_update(batch, ['date_low', 'date_high'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0002_alter_auditlog_action'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lifeevent',
+            name='date_low',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lifeevent',
+            name='date_high',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_date_range, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='lifeevent',
+            index=models.Index(fields=['date_low'], name='history_event_low_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lifeevent',
+            index=models.Index(fields=['date_high'], name='history_event_high_idx'),
+        ),
+    ]
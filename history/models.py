@@ -90,6 +90,11 @@ class LifeEvent(models.Model):
     # End date (for events with duration)
     end_date = models.DateField(null=True, blank=True)
 
+    # Earliest/latest day number the event may cover (tree/dates.py), from
+    # date, end_date and date_is_approximate; derived on save
+    date_low = models.IntegerField(null=True, blank=True, editable=False)
+    date_high = models.IntegerField(null=True, blank=True, editable=False)
+
     # Location
     location = models.CharField(max_length=255, blank=True)
     location_lat = models.FloatField(null=True, blank=True)
@@ -123,8 +128,27 @@ class LifeEvent(models.Model):
         indexes = [
             models.Index(fields=['member', 'date']),
             models.Index(fields=['event_type']),
+            # Date-range filtering of timelines
+            models.Index(fields=['date_low'], name='history_event_low_idx'),
+            models.Index(fields=['date_high'], name='history_event_high_idx'),
         ]
 
+    def derive_date_range(self):
+        """Set date_low/date_high from the event's dates."""
+        from tree.dates import fuzzy_range
+        precision = 'approximate' if self.date_is_approximate else 'exact'
+        self.date_low = fuzzy_range(self.date, precision)[0]
+        self.date_high = fuzzy_range(self.end_date or self.date, precision)[1]
+        if self.date_low is None:
+            self.date_high = None
+
+    def save(self, *args, **kwargs):
+        self.derive_date_range()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'date_low', 'date_high'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         date_str = self.date_display or (
             str(self.date) if self.date else 'Unknown date'
@@ -146,6 +170,7 @@ class AuditLog(models.Model):
         ('reject', 'Rejected'),
         ('invite', 'Invited'),
         ('login', 'Logged In'),
+        ('merge', 'Merged'),
     ]
 
     user = models.ForeignKey(
@@ -0,0 +1,27 @@
+"""
+Celery application for TASK_BACKEND = 'celery' (see core/tasks.py).
+
+Start a worker with:
+
+    celery -A la_racine.celery worker -l info
+
+Every task goes through the one Celery task below, which runs the
+registered core.tasks function and schedules its retries, so tasks behave
+the same on every backend.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'la_racine.settings')
+
+app = Celery('la_racine')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@app.task(name='core.run_task')
+def run_task(name, args, kwargs, key=None, attempt=0):
+    from core.tasks import run
+    return run(name, args, kwargs, key, attempt)
@@ -65,6 +65,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tree.access.TreeRoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -158,6 +159,8 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 # CORS settings for frontend communication
@@ -168,6 +171,76 @@ CORS_ALLOWED_ORIGINS = [o for o in os.environ.get('DJANGO_CORS_ORIGINS', '').spl
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Shared cache: per-tree versioned entries (tree/cache.py) and task
+# idempotency keys (core/tasks.py) must be seen by every web and task
+# process, so anything but a single DEBUG process uses Redis.
+CACHE_URL = os.environ.get('CACHE_URL', '' if DEBUG else 'redis://localhost:6379/2')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Background tasks (core/tasks.py): 'eager' runs them right after commit,
+# 'thread' in an in-process pool, 'celery' on a worker (la_racine/celery.py)
+TASK_BACKEND = os.environ.get('TASK_BACKEND', 'eager' if DEBUG else 'thread')
+TASK_THREADS = int(os.environ.get('TASK_THREADS', '4'))
+TASK_RETRY_DELAY = 2
+TASK_IDEMPOTENCY_TTL = 24 * 3600
+
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'send-email-notifications': {
+        'task': 'core.run_task',
+        'schedule': 60.0,
+        'args': ('notifications.tasks.send_pending_emails', [], {}),
+    },
+    'build-digests': {
+        'task': 'core.run_task',
+        'schedule': 3600.0,
+        'args': ('notifications.tasks.build_digests', [], {}),
+    },
+    'prune-notifications': {
+        'task': 'core.run_task',
+        'schedule': 24 * 3600.0,
+        'args': ('notifications.tasks.prune_notifications', [], {}),
+    },
+    'scan-duplicates': {
+        'task': 'core.run_task',
+        'schedule': 3600.0,
+        'args': ('tree.tasks.scan_tree_duplicates', [], {}),
+    },
+}
+
+# Live notification stream (notifications/pubsub.py): empty for in-process
+# delivery, or a Redis URL when several processes write or serve notifications
+NOTIFICATION_STREAM_URL = os.environ.get('NOTIFICATION_STREAM_URL', '')
+
+# Notification retention policies (notifications/retention.py); unset keeps
+# read in-app rows 90 days (then archived) and sent or failed emails 30 days
+# NOTIFICATION_RETENTION = [...]
+
+# Email notifications (notifications/outbox.py)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', (
+    'django.core.mail.backends.console.EmailBackend' if DEBUG
+    else 'django.core.mail.backends.smtp.EmailBackend'
+))
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = 30
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'La Racine <no-reply@localhost>')
+FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
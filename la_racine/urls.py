@@ -27,11 +27,11 @@ from tree.api import (
     FamilyUpdateViewSet,
     TreeInvitationViewSet,
     UpdateViewSet,
-    FuzzyDateViewSet,
 )
 
 # Notifications
 from notifications.api import NotificationViewSet
+from notifications.stream import notification_stream
 
 # History
 from history.api import HistoryEventViewSet, LifeEventViewSet, AuditLogViewSet
@@ -60,9 +60,9 @@ def api_root(request):
                 'updates':         '/api/family-updates/',
                 'invitations':     '/api/invitations/',
                 'notifications':   '/api/notifications/',
+                'notification_stream': '/api/notifications/stream/',
                 'life_events':     '/api/life-events/',
                 'audit_log':       '/api/audit-log/',
-                'fuzzy_dates':     '/api/fuzzy-dates/',
             }
         }
     })
@@ -77,7 +77,6 @@ router.register(r'userprofiles', UserProfileViewSet, basename='userprofile')
 router.register(r'trees', TreeViewSet, basename='tree')
 router.register(r'members', FamilyMemberViewSet, basename='familymember')
 router.register(r'relationships', FamilyRelationshipViewSet, basename='relationship')
-router.register(r'fuzzy-dates', FuzzyDateViewSet, basename='fuzzydate')
 
 # Change governance
 router.register(r'change-requests', ChangeRequestViewSet, basename='changerequest')
@@ -103,6 +102,8 @@ urlpatterns = [
     path('', api_root, name='api_root'),
     path('admin/', admin.site.urls),
     path('favicon.ico', RedirectView.as_view(url=static('core/logo.png'), permanent=True)),
+    # Before the router, whose notifications/<pk>/ route would match it
+    path('api/notifications/stream/', notification_stream, name='notification_stream'),
     path('api/', include(router.urls)),
 
     # Auth
@@ -5,7 +5,7 @@ notifications/admin.py — Notification Management Admin
 Full notification content management:
 - Per-channel breakdown (in-app, email, push)
 - Delivery status badges
-- Bulk send / resend / mark-read actions
+- Bulk send / resend / mark-read actions (emails go through notifications/outbox.py)
 - Linked objects (member, tree, change request)
 """
 
@@ -14,7 +14,7 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.contrib import messages
 
-from .models import Notification, NotificationBatch
+from .models import Notification, NotificationArchive, NotificationBatch
 
 STATUS_COLOURS = {
     'pending':   '#f59e0b',
@@ -39,10 +39,14 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter   = ('event_type', 'channel', 'is_read', 'status')
     search_fields = ('recipient__username', 'recipient__email', 'title', 'body')
     raw_id_fields = ('recipient', 'related_member', 'related_tree', 'related_change_request')
-    readonly_fields = ('created_at', 'sent_at', 'read_at', 'related_links')
+    readonly_fields = (
+        'created_at', 'sent_at', 'read_at', 'related_links',
+        'attempts', 'next_attempt_at', 'locked_until',
+    )
     date_hierarchy  = 'created_at'
     ordering        = ('-created_at',)
-    actions         = ['action_mark_read', 'action_mark_unread', 'action_mark_sent']
+    actions         = ['action_mark_read', 'action_mark_unread', 'action_mark_sent',
+                       'action_retry_email', 'action_send_emails']
 
     fieldsets = (
         ('Recipient & Channel', {
@@ -56,7 +60,8 @@ class NotificationAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
         ('State & Delivery', {
-            'fields': ('is_read', 'read_at', 'status', 'sent_at', 'error_message', 'created_at'),
+            'fields': ('is_read', 'read_at', 'status', 'sent_at', 'error_message',
+                       'attempts', 'next_attempt_at', 'locked_until', 'created_at'),
         }),
     )
 
@@ -95,12 +100,18 @@ class NotificationAdmin(admin.ModelAdmin):
     @admin.action(description='✅ Mark selected as read')
     def action_mark_read(self, request, queryset):
         from django.utils import timezone
+        from .counters import reconcile_unread_counts
+        recipients = set(queryset.values_list('recipient_id', flat=True))
         updated = queryset.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+        reconcile_unread_counts(recipients)
         self.message_user(request, f'{updated} notification(s) marked as read.', messages.SUCCESS)
 
     @admin.action(description='🔄 Mark selected as unread')
     def action_mark_unread(self, request, queryset):
+        from .counters import reconcile_unread_counts
+        recipients = set(queryset.values_list('recipient_id', flat=True))
         updated = queryset.update(is_read=False, read_at=None)
+        reconcile_unread_counts(recipients)
         self.message_user(request, f'{updated} notification(s) marked as unread.', messages.SUCCESS)
 
     @admin.action(description='📤 Mark selected as Sent')
@@ -110,16 +121,36 @@ class NotificationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{updated} notification(s) marked as sent.', messages.SUCCESS)
 
 
+    @admin.action(description='🔁 Retry selected failed emails')
+    def action_retry_email(self, request, queryset):
+        updated = queryset.filter(channel='email', status='failed').update(
+            status='pending', attempts=0, next_attempt_at=None, locked_until=None,
+        )
+        self.message_user(request, f'{updated} email(s) queued again.', messages.SUCCESS)
+
+    @admin.action(description='📧 Send pending emails now')
+    def action_send_emails(self, request, queryset):
+        from .outbox import deliver_pending_emails
+        stats = deliver_pending_emails()
+        self.message_user(
+            request,
+            'Emails delivered: {delivered}, retrying: {retrying}, failed: {failed}.'.format(**stats),
+            messages.SUCCESS,
+        )
+
+
 @admin.register(NotificationBatch)
 class NotificationBatchAdmin(admin.ModelAdmin):
-    list_display    = ('recipient', 'notification_count', 'is_sent', 'created_at', 'sent_at')
-    list_filter     = ('is_sent',)
+    list_display    = ('recipient', 'frequency', 'notification_count', 'is_sent', 'attempts',
+                       'created_at', 'sent_at')
+    list_filter     = ('is_sent', 'frequency')
     search_fields   = ('recipient__username', 'recipient__email')
     raw_id_fields   = ('recipient',)
-    readonly_fields = ('created_at', 'sent_at')
+    readonly_fields = ('created_at', 'sent_at', 'attempts', 'next_attempt_at', 'locked_until',
+                       'error_message')
     date_hierarchy  = 'created_at'
     filter_horizontal = ('notifications',)
-    actions         = ['action_mark_sent']
+    actions         = ['action_mark_sent', 'action_send_digests']
 
     def get_queryset(self, request):
         from django.db.models import Count
@@ -134,3 +165,30 @@ class NotificationBatchAdmin(admin.ModelAdmin):
         from django.utils import timezone
         updated = queryset.filter(is_sent=False).update(is_sent=True, sent_at=timezone.now())
         self.message_user(request, f'{updated} batch(es) marked as sent.', messages.SUCCESS)
+
+    @admin.action(description='📧 Send unsent digests now')
+    def action_send_digests(self, request, queryset):
+        from .outbox import deliver_pending_digests
+        queryset.filter(is_sent=False).update(attempts=0, next_attempt_at=None, locked_until=None)
+        stats = deliver_pending_digests()
+        self.message_user(
+            request,
+            'Digests delivered: {delivered}, retrying: {retrying}, failed: {failed}.'.format(**stats),
+            messages.SUCCESS,
+        )
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display    = ('recipient', 'channel', 'event_type', 'title', 'status', 'is_read',
+                       'created_at', 'archived_at')
+    list_filter     = ('event_type', 'channel', 'status')
+    search_fields   = ('recipient__username', 'title')
+    raw_id_fields   = ('recipient',)
+    date_hierarchy  = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -15,7 +15,7 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
-from django.utils import timezone
+from .counters import bump_unread, unread_count
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -42,6 +42,18 @@ class NotificationViewSet(viewsets.ModelViewSet):
         # Allow PATCH only on is_read field via the dedicated /read/ action
         raise MethodNotAllowed('PATCH', detail='Use /read/ action to mark a notification as read.')
 
+    def perform_destroy(self, instance):
+        if instance.channel != 'in_app':
+            instance.delete()
+            return
+        # Only the request that removes the row while still unread decrements,
+        # so a concurrent mark-read or a second DELETE is not counted twice.
+        deleted, _ = Notification.objects.filter(pk=instance.pk, is_read=False).delete()
+        if deleted:
+            bump_unread({instance.recipient_id: -1})
+        else:
+            Notification.objects.filter(pk=instance.pk).delete()
+
     # --- Queryset ----------------------------------------------------------
 
     def get_queryset(self):
@@ -91,15 +103,9 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='mark-all-read')
     def mark_all_read(self, request):
         """Mark all in-app notifications as read for the current user."""
-        updated = Notification.objects.filter(
-            recipient=request.user, channel='in_app', is_read=False
-        ).update(is_read=True, read_at=timezone.now())
-        return Response({'marked_read': updated})
+        return Response({'marked_read': Notification.mark_all_read(request.user)})
 
     @action(detail=False, methods=['get'], url_path='unread-count')
     def unread_count(self, request):
-        """Return the count of unread in-app notifications."""
-        count = Notification.objects.filter(
-            recipient=request.user, channel='in_app', is_read=False
-        ).count()
-        return Response({'unread_count': count})
+        """Return the count of unread in-app notifications (stored counter)."""
+        return Response({'unread_count': unread_count(request.user.pk)})
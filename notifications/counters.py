@@ -0,0 +1,84 @@
+"""
+notifications/counters.py — Denormalized unread counter per user
+
+UserProfile.unread_in_app_count is adjusted in place with single UPDATE
+statements: the fan-out adds the in-app rows it writes, a post_save signal
+adds rows created one at a time, marking read subtracts exactly the rows it
+flipped, and the API's DELETE subtracts only when its conditional delete
+removed a row that was still unread. The badge endpoint therefore reads
+one row by its unique user id instead of counting notifications. Every
+bump is also pushed to the recipient's open streams as an 'unread' delta
+(notifications/pubsub.py).
+reconcile_unread_counts() recounts in bulk to correct drift from paths that
+skip all of this (queryset updates, raw SQL).
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .pubsub import publish_unread
+
+CHUNK_SIZE = 5000
+
+
+def _profiles():
+    from core.models import UserProfile
+    return UserProfile.objects
+
+
+def bump_unread(user_deltas):
+    """Add {user_id: delta} to the counters, one UPDATE per distinct delta."""
+    by_delta = defaultdict(list)
+    for user_id, delta in user_deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    for delta, user_ids in by_delta.items():
+        _profiles().filter(user_id__in=user_ids).update(
+            unread_in_app_count=Greatest(F('unread_in_app_count') + delta, 0),
+        )
+    publish_unread(user_deltas)
+
+
+def count_new_rows(rows):
+    """{recipient id: unread in-app rows} among Notification objects about to be inserted."""
+    return Counter(row.recipient_id for row in rows if row.channel == 'in_app' and not row.is_read)
+
+
+def unread_count(user_id):
+    """The stored counter; counted and stored once for users without a profile row."""
+    from notifications.models import Notification
+    count = _profiles().filter(user_id=user_id).values_list('unread_in_app_count', flat=True).first()
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, channel='in_app', is_read=False).count()
+        _profiles().get_or_create(user_id=user_id, defaults={'unread_in_app_count': count})
+    return count
+
+
+def reconcile_unread_counts(user_ids=None):
+    """
+    Recount the unread in-app notifications of ``user_ids`` (default: every
+    profile) in user-id chunks, with one grouped subquery per chunk. Returns
+    the number of profiles corrected.
+    """
+    from notifications.models import Notification
+    unread = Coalesce(Subquery(
+        Notification.objects.filter(recipient_id=OuterRef('user_id'), channel='in_app', is_read=False)
+        .order_by().values('recipient_id').annotate(n=Count('pk')).values('n')
+    ), Value(0))
+    profiles = _profiles().all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    corrected, last_id = 0, 0
+    while True:
+        chunk = list(profiles.filter(user_id__gt=last_id).order_by('user_id').values_list(
+            'user_id', flat=True
+        )[:CHUNK_SIZE])
+        if not chunk:
+            return corrected
+        last_id = chunk[-1]
+        corrected += profiles.filter(user_id__in=chunk).filter(
+            ~Q(unread_in_app_count=unread)
+        ).update(unread_in_app_count=unread)
@@ -0,0 +1,119 @@
+"""
+notifications/digests.py — Daily and weekly digest batches
+
+build_digests() runs hourly. A recipient is due when their
+digest_frequency is 'daily' or 'weekly' and it is DIGEST_HOUR in their
+timezone (on DIGEST_WEEKDAY for weekly digests), so each timezone bucket is
+handled once per period. Due recipients are walked in user-id chunks of
+CHUNK_SIZE; per chunk, one query gathers their pending email notifications
+that are not in a batch yet, grouped by recipient, and the
+NotificationBatch rows and their many-to-many links are written with two
+bulk_create calls. Memory is bounded by the chunk, not the user count.
+
+Recipients with a batch built less than MIN_INTERVAL ago are skipped, so a
+rerun within the hour adds no second digest. The batches are then sent by
+the outbox (notifications/outbox.py).
+"""
+
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Notification, NotificationBatch
+from .outbox import DIGEST_FREQUENCIES
+
+DIGEST_HOUR = 8       # local time
+DIGEST_WEEKDAY = 0    # Monday
+CHUNK_SIZE = 1000
+LINK_BATCH_SIZE = 5000
+MIN_INTERVAL = {'daily': timedelta(hours=20), 'weekly': timedelta(days=6)}
+
+
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+
+def due_timezones(frequency, now):
+    """Profile timezones in which the ``frequency`` digest is due at ``now``."""
+    from core.models import UserProfile
+    zones = UserProfile.objects.filter(digest_frequency=frequency).order_by().values_list(
+        'timezone', flat=True
+    ).distinct()
+    due = []
+    for name in zones:
+        local = now.astimezone(_zone(name))
+        if local.hour == DIGEST_HOUR and (frequency == 'daily' or local.weekday() == DIGEST_WEEKDAY):
+            due.append(name)
+    return due
+
+
+def _recipient_chunks(frequency, zones, now):
+    """Due recipient ids in ascending chunks; ``zones`` None means every timezone."""
+    from core.models import UserProfile
+    recent = NotificationBatch.objects.filter(
+        recipient_id=OuterRef('user_id'), frequency=frequency,
+        created_at__gte=now - MIN_INTERVAL[frequency],
+    )
+    profiles = UserProfile.objects.filter(digest_frequency=frequency).filter(~Exists(recent))
+    if zones is not None:
+        profiles = profiles.filter(timezone__in=zones)
+    last_id = 0
+    while True:
+        chunk = list(profiles.filter(user_id__gt=last_id).order_by('user_id').values_list(
+            'user_id', flat=True
+        )[:CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def _build_chunk(recipient_ids, frequency):
+    """Batch the unbatched pending emails of one chunk; returns (batches, notifications)."""
+    pending = Notification.objects.filter(
+        recipient_id__in=recipient_ids, channel='email', status='pending',
+        notificationbatch__isnull=True,
+    ).order_by('recipient_id', 'pk').values_list('recipient_id', 'pk')
+    grouped = [
+        (recipient_id, [pk for _, pk in rows])
+        for recipient_id, rows in groupby(pending.iterator(chunk_size=LINK_BATCH_SIZE), key=itemgetter(0))
+    ]
+    if not grouped:
+        return 0, 0
+    through = NotificationBatch.notifications.through
+    with transaction.atomic():
+        batches = NotificationBatch.objects.bulk_create([
+            NotificationBatch(recipient_id=recipient_id, frequency=frequency)
+            for recipient_id, _ in grouped
+        ])
+        links = through.objects.bulk_create([
+            through(notificationbatch_id=batch.pk, notification_id=pk)
+            for batch, (_, pks) in zip(batches, grouped) for pk in pks
+        ], batch_size=LINK_BATCH_SIZE)
+    return len(batches), len(links)
+
+
+def build_digests(now=None, frequencies=DIGEST_FREQUENCIES, all_timezones=False):
+    """
+    Build the digests due at ``now`` (every timezone with ``all_timezones``).
+    Returns {'batches', 'notifications'} counts.
+    """
+    now = now or timezone.now()
+    stats = {'batches': 0, 'notifications': 0}
+    for frequency in frequencies:
+        zones = None if all_timezones else due_timezones(frequency, now)
+        if zones == []:
+            continue
+        for chunk in _recipient_chunks(frequency, zones, now):
+            batches, notifications = _build_chunk(chunk, frequency)
+            stats['batches'] += batches
+            stats['notifications'] += notifications
+    return stats
@@ -0,0 +1,37 @@
+"""
+notifications/management/commands/build_digests.py
+
+Builds the daily/weekly digest batches due this hour (see
+notifications/digests.py) and sends them. Meant to run hourly:
+
+    python manage.py build_digests
+    python manage.py build_digests --frequency weekly --all-timezones
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.digests import build_digests
+from notifications.outbox import DIGEST_FREQUENCIES, deliver_pending_digests
+
+
+class Command(BaseCommand):
+    help = 'Build and send daily/weekly notification digests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frequency', choices=DIGEST_FREQUENCIES,
+                            help='Only build this frequency (default: both)')
+        parser.add_argument('--all-timezones', action='store_true',
+                            help='Build for every timezone, not only those at the digest hour')
+        parser.add_argument('--no-send', action='store_true', help='Build the batches only')
+
+    def handle(self, *args, **options):
+        frequencies = (options['frequency'],) if options['frequency'] else DIGEST_FREQUENCIES
+        stats = build_digests(frequencies=frequencies, all_timezones=options['all_timezones'])
+        self.stdout.write(self.style.SUCCESS(
+            'Digests built: {batches} ({notifications} notifications)'.format(**stats)
+        ))
+        if not options['no_send']:
+            sent = deliver_pending_digests()
+            self.stdout.write(self.style.SUCCESS(
+                'Digests delivered: {delivered}, retrying: {retrying}, failed: {failed}'.format(**sent)
+            ))
@@ -0,0 +1,40 @@
+"""
+notifications/management/commands/prune_notifications.py
+
+Archive or delete notifications past their retention policy, in small
+batches (see notifications/retention.py), and report what was reclaimed:
+
+    python manage.py prune_notifications --dry-run
+    python manage.py prune_notifications --batch-size 500 --max-batches 100
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.retention import BATCH_SIZE, prune_notifications
+
+
+class Command(BaseCommand):
+    help = 'Archive or delete notifications past their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop each policy after this many batches')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count and measure the expired notifications')
+
+    def handle(self, *args, **options):
+        report = prune_notifications(
+            batch_size=options['batch_size'], max_batches=options['max_batches'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'expired' if options['dry_run'] else 'removed'
+        for name, stats in report.items():
+            self.stdout.write(
+                f'{name}: {stats["rows"]} {verb}, {stats["archived"]} archived, {stats["bytes"]} bytes'
+            )
+        total_rows = sum(stats['rows'] for stats in report.values())
+        total_bytes = sum(stats['bytes'] for stats in report.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Notifications {verb}: {total_rows} ({total_bytes} bytes of row data)'
+        ))
@@ -0,0 +1,27 @@
+"""
+notifications/management/commands/reconcile_unread_counts.py
+
+Recount UserProfile.unread_in_app_count from the notifications, for every
+user or selected users, in bulk (see notifications/counters.py). Run after
+manual data fixes, or periodically to correct drift:
+
+    python manage.py reconcile_unread_counts --user 12
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute unread in-app notification counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only reconcile this user id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        corrected = reconcile_unread_counts(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Unread counters reconciled: {corrected} users corrected'))
@@ -2,13 +2,14 @@
 notifications/management/commands/send_birthday_notifications.py
 
 Command to generate birthday notifications for family members whose birthday is today.
-Updated to match current Notification schema fields.
+All notifications are rendered first and written with one bulk insert.
 """
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from tree.models import FamilyMember
 from notifications.models import Notification
+from notifications.service import deliver, message
 
 
 class Command(BaseCommand):
@@ -17,47 +18,38 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         today = timezone.now().date()
 
-        # Find members born today (month & day match)
+        # Find members born today (indexed month & day of exact birth dates)
         birthday_members = FamilyMember.objects.filter(
-            birth_date__date__month=today.month,
-            birth_date__date__day=today.day,
+            birth_month=today.month,
+            birth_day=today.day,
             is_alive=True,
-        ).select_related('tree', 'tree__created_by', 'birth_date')
+        ).select_related('tree')
 
-        notifications_created = 0
+        # One query for members already notified today, instead of one per member
+        already_notified = set(Notification.objects.filter(
+            event_type='birthday',
+            related_member__in=birthday_members,
+            created_at__date=today,
+        ).values_list('related_member_id', flat=True))
 
+        messages = []
         for member in birthday_members:
-            tree_owner = member.tree.created_by
+            if member.pk in already_notified:
+                continue
             # Calculate age
-            born_year = member.birth_date.date.year if member.birth_date and member.birth_date.date else None
+            born_year = member.birth_date_value.year if member.birth_date_value and not member.birth_date_bce else None
             age_str = f" ({today.year - born_year} years old)" if born_year else ""
-
-            # Check if notification already created today for this member
-            existing = Notification.objects.filter(
-                recipient=tree_owner,
-                event_type='birthday',
-                related_member=member,
-                created_at__date=today,
-            ).exists()
-
-            if not existing:
-                Notification.objects.create(
-                    recipient=tree_owner,
-                    event_type='birthday',
-                    channel='in_app',
-                    title=f'🎂 Birthday Today: {member.display_name}',
-                    body=f'Today is {member.display_name}\'s birthday{age_str} in "{member.tree.name}".',
-                    related_member=member,
-                    related_tree=member.tree,
-                    action_url=f'/members/{member.pk}',
-                    status='sent',
-                    sent_at=timezone.now(),
-                )
-                notifications_created += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'Created birthday notification for {member.display_name}')
-                )
+            messages.append(message(
+                'birthday', [member.tree.created_by_id],
+                {'member': member.display_name, 'age': age_str, 'tree': member.tree.name},
+                related={'member': member, 'tree': member.tree},
+                action_url=f'/members/{member.pk}',
+            ))
+            self.stdout.write(
+                self.style.SUCCESS(f'Created birthday notification for {member.display_name}')
+            )
+        deliver(messages)
 
         self.stdout.write(
-            self.style.SUCCESS(f'Birthday notifications processed: {notifications_created}')
-        )
\ No newline at end of file
+            self.style.SUCCESS(f'Birthday notifications processed: {len(messages)}')
+        )
@@ -0,0 +1,34 @@
+"""
+notifications/management/commands/send_email_notifications.py
+
+Email delivery worker: sends pending channel='email' notifications in leased
+batches (see notifications/outbox.py). Runs once, or keeps polling with --loop:
+
+    python manage.py send_email_notifications --loop --interval 30
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import BATCH_SIZE, deliver_pending_emails
+
+
+class Command(BaseCommand):
+    help = 'Send pending email notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new emails')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = deliver_pending_emails(batch_size=options['batch_size'])
+            if any(stats.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    'Emails delivered: {delivered}, retrying: {retrying}, failed: {failed}'.format(**stats)
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_email_worker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='frequency',
+            field=models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly')], default='daily', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationbatch',
+            name='error_message',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificationbatch',
+            index=models.Index(fields=['recipient', '-created_at'], name='notif_batch_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationbatch',
+            index=models.Index(fields=['is_sent', 'next_attempt_at'], name='notif_digest_outbox_idx'),
+        ),
+    ]
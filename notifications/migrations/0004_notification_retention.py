@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0003_notificationbatch_digest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['channel', 'created_at'], name='notif_retention_idx'),
+        ),
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('birthday', '🎂 Birthday'), ('death_recorded', '⚰️ Death Recorded'), ('new_member', '👶 New Member Added'), ('change_submitted', '📝 Change Request Submitted'), ('change_approved', '✅ Change Request Approved'), ('change_rejected', '❌ Change Request Rejected'), ('change_needs_review', '👀 Change Needs Your Review'), ('photo_uploaded', '🖼️ New Photo Uploaded'), ('photo_tagged', '🏷️ You Were Tagged in a Photo'), ('family_update', '📣 Family Announcement'), ('comment_on_update', '💬 Comment on Update'), ('tree_invitation', '🔗 Invited to Join Tree'), ('invitation_accepted', '🤝 Invitation Accepted'), ('member_claimed', '🔑 Member Profile Claimed'), ('system', '⚙️ System Message')], max_length=30)),
+                ('channel', models.CharField(choices=[('in_app', 'In-App'), ('email', 'Email'), ('push', 'Push')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('failed', 'Failed')], max_length=10)),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('related_tree_id', models.IntegerField(blank=True, null=True)),
+                ('related_member_id', models.IntegerField(blank=True, null=True)),
+                ('is_read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Notification',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx')],
+            },
+        ),
+    ]
@@ -109,6 +109,11 @@ class Notification(models.Model):
     )
     sent_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True)
+    # Email worker state (notifications/email.py): failed sends so far, when
+    # the next try is due, and the lease of the worker holding the row
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -118,6 +123,10 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['recipient', 'is_read', '-created_at']),
             models.Index(fields=['event_type', 'status']),
+            # Email worker queue
+            models.Index(fields=['channel', 'status', 'next_attempt_at'], name='notif_outbox_idx'),
+            # Retention batches (notifications/retention.py)
+            models.Index(fields=['channel', 'created_at'], name='notif_retention_idx'),
         ]
 
     def __str__(self):
@@ -125,25 +134,56 @@ class Notification(models.Model):
 
     def mark_read(self):
         from django.utils import timezone
+        from .counters import bump_unread
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            # Conditional, so two concurrent reads decrement the counter once
+            flipped = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=self.read_at,
+            )
+            if flipped and self.channel == 'in_app':
+                bump_unread({self.recipient_id: -1})
+
+    @classmethod
+    def mark_all_read(cls, user):
+        """Mark every unread in-app notification of ``user`` read; returns how many."""
+        from django.db import transaction
+        from django.utils import timezone
+        from .counters import bump_unread
+        with transaction.atomic():
+            updated = cls.objects.filter(recipient=user, channel='in_app', is_read=False).update(
+                is_read=True, read_at=timezone.now(),
+            )
+            bump_unread({user.pk: -updated})
+        return updated
 
 
 class NotificationBatch(models.Model):
     """
     Groups multiple notifications into a single digest email.
-    Used when digest_frequency is 'daily' or 'weekly'.
+    Used when digest_frequency is 'daily' or 'weekly'; built by
+    notifications/digests.py and sent by notifications/outbox.py.
     """
     recipient = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='notification_batches'
     )
+    FREQUENCY_CHOICES = [
+        ('daily',  'Daily'),
+        ('weekly', 'Weekly'),
+    ]
+
     notifications = models.ManyToManyField(Notification, blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='daily')
     sent_at = models.DateTimeField(null=True, blank=True)
     is_sent = models.BooleanField(default=False)
+    # Email worker state, as on Notification (notifications/outbox.py)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -152,3 +192,41 @@ class NotificationBatch(models.Model):
     class Meta:
         verbose_name = 'Notification Batch'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_batch_recipient_idx'),
+            # Digest outbox
+            models.Index(fields=['is_sent', 'next_attempt_at'], name='notif_digest_outbox_idx'),
+        ]
+
+
+class NotificationArchive(models.Model):
+    """
+    Compact copy of a notification moved out by a retention policy
+    (notifications/retention.py): what was sent, to whom and when, without
+    the body, links or delivery worker state. Keeps the notification id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications'
+    )
+    event_type = models.CharField(max_length=30, choices=Notification.EVENT_TYPES)
+    channel = models.CharField(max_length=10, choices=Notification.CHANNEL_CHOICES)
+    status = models.CharField(max_length=10, choices=Notification.STATUS_CHOICES)
+    title = models.CharField(max_length=255, blank=True, default='')
+    related_tree_id = models.IntegerField(null=True, blank=True)
+    related_member_id = models.IntegerField(null=True, blank=True)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Archived Notification'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f'[{self.channel}] {self.event_type} → {self.recipient_id}: {self.title}'
@@ -0,0 +1,278 @@
+"""
+notifications/outbox.py — Email delivery of channel='email' notifications
+
+deliver_pending_emails() drains pending email rows batch by batch:
+1. claim — one short transaction picks due rows (no retry scheduled for
+   later, no live lease) with SELECT … FOR UPDATE SKIP LOCKED where the
+   database has it, and leases them for LEASE seconds. The lease is set
+   with a conditional UPDATE, so concurrent workers never send the same
+   row even without row locks, and rows of a worker that died are picked
+   up again once the lease runs out;
+2. render — the email template is looked up and compiled once per event
+   type and locale (the recipient's preferred_language), then rendered
+   per row;
+3. send — every message of the batch over one mail connection;
+4. record — sent rows become 'delivered'; failed ones stay 'pending' with
+   the next try RETRY_DELAY × 2^(attempts - 1) seconds away, and become
+   'failed' after MAX_ATTEMPTS (at once when there is no address).
+
+deliver_pending_digests() does the same for NotificationBatch digests
+(notifications/digests.py): one email per batch listing its
+notifications, which all become 'delivered' with it. Emails of recipients
+on a daily or weekly digest, and of notifications already in a batch, are
+left to the digest.
+
+Any EMAIL_BACKEND works, including the locmem and file backends.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.template.loader import select_template
+from django.utils import timezone, translation
+
+from .models import Notification, NotificationBatch
+
+BATCH_SIZE = 100
+LEASE = 300         # seconds a claimed batch stays reserved for its worker
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 60    # seconds before the first retry, doubled after each failure
+
+SUBJECT_PREFIX = '[La Racine] '
+TEMPLATE_DIR = 'notifications/email'
+DIGEST_FREQUENCIES = ('daily', 'weekly')
+
+
+def _ready(queryset, now):
+    """Rows whose retry is due and that no live lease holds."""
+    return queryset.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+    )
+
+
+def _due_emails(now):
+    return _ready(Notification.objects.filter(channel='email', status='pending'), now).exclude(
+        recipient__profile__digest_frequency__in=DIGEST_FREQUENCIES,
+    ).filter(notificationbatch__isnull=True)
+
+
+def _due_digests(now):
+    return _ready(NotificationBatch.objects.filter(is_sent=False, attempts__lt=MAX_ATTEMPTS), now)
+
+
+def _claim(due, limit, now):
+    """Lease up to ``limit`` rows of ``due(now)``; returns (ids, lease end)."""
+    until = now + timedelta(seconds=LEASE)
+    with transaction.atomic():
+        rows = due(now).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            rows = rows.select_for_update(skip_locked=True)
+        ids = list(rows.values_list('pk', flat=True)[:limit])
+        if ids:
+            due(now).filter(pk__in=ids).update(locked_until=until)
+    return ids, until
+
+
+def claim_batch(limit=BATCH_SIZE, now=None):
+    """Lease up to ``limit`` due email notifications to this worker and return them."""
+    ids, until = _claim(_due_emails, limit, now or timezone.now())
+    if not ids:
+        return []
+    return list(
+        Notification.objects.filter(pk__in=ids, locked_until=until)
+        .select_related('recipient__profile').order_by('pk')
+    )
+
+
+def _language(row):
+    profile = getattr(row.recipient, 'profile', None)
+    return getattr(profile, 'preferred_language', None) or settings.LANGUAGE_CODE
+
+
+def _render(rows):
+    """[(row, EmailMessage or None)], None for recipients without an address."""
+    rendered = []
+    site = getattr(settings, 'FRONTEND_URL', '').rstrip('/')
+    key = lambda row: (row.event_type, _language(row))  # noqa: E731
+    for (event_type, language), group in groupby(sorted(rows, key=key), key=key):
+        template = select_template([
+            f'{TEMPLATE_DIR}/{event_type}.txt', f'{TEMPLATE_DIR}/notification.txt',
+        ])
+        with translation.override(language):
+            for row in group:
+                user = row.recipient
+                if not user.email:
+                    rendered.append((row, None))
+                    continue
+                body = template.render({
+                    'recipient_name': user.get_full_name() or user.username,
+                    'title': row.title,
+                    'body': row.body,
+                    'link': f'{site}{row.action_url}' if row.action_url else '',
+                })
+                rendered.append((row, EmailMessage(
+                    SUBJECT_PREFIX + (row.title or row.get_event_type_display()), body, to=[user.email],
+                )))
+    return rendered
+
+
+def _send(rendered):
+    """Send over one connection. Returns (delivered rows, [(row, error, permanent)])."""
+    delivered, failed = [], []
+    for row, email in rendered:
+        if email is None:
+            failed.append((row, 'Recipient has no email address.', True))
+    outgoing = [(row, email) for row, email in rendered if email is not None]
+    if not outgoing:
+        return delivered, failed
+    try:
+        mail = get_connection()
+        mail.open()
+    except Exception as exc:
+        return delivered, failed + [(row, f'Connection failed: {exc}', False) for row, _ in outgoing]
+    try:
+        for row, email in outgoing:
+            email.connection = mail
+            try:
+                email.send()
+                delivered.append(row)
+            except Exception as exc:
+                failed.append((row, str(exc) or exc.__class__.__name__, False))
+    finally:
+        mail.close()
+    return delivered, failed
+
+
+def _record_failures(model, failed, now):
+    """Schedule retries or give up on ``failed`` rows; returns the number given up on."""
+    given_up = 0
+    for row, error, permanent in failed:
+        row.attempts += 1
+        row.error_message = error[:1000]
+        row.locked_until = None
+        if permanent or row.attempts >= MAX_ATTEMPTS:
+            if model is Notification:
+                row.status = 'failed'
+            row.next_attempt_at = None
+            given_up += 1
+        else:
+            row.next_attempt_at = now + timedelta(seconds=RETRY_DELAY * 2 ** (row.attempts - 1))
+    if failed:
+        fields = ['attempts', 'error_message', 'locked_until', 'next_attempt_at']
+        model.objects.bulk_update([row for row, _, _ in failed], fields + (
+            ['status'] if model is Notification else []
+        ))
+    return given_up
+
+
+def _record(delivered, failed, now):
+    """Write the outcome of a batch of emails; returns the number of rows given up on."""
+    if delivered:
+        Notification.objects.filter(pk__in=[row.pk for row in delivered]).update(
+            status='delivered', sent_at=now, locked_until=None, error_message='',
+        )
+    return _record_failures(Notification, failed, now)
+
+
+def _drain(claim, render, record, batch_size, max_batches):
+    stats = {'delivered': 0, 'retrying': 0, 'failed': 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = claim(batch_size)
+        if not rows:
+            break
+        batches += 1
+        delivered, failed = _send(render(rows))
+        given_up = record(delivered, failed, timezone.now())
+        stats['delivered'] += len(delivered)
+        stats['failed'] += given_up
+        stats['retrying'] += len(failed) - given_up
+    return stats
+
+
+def deliver_pending_emails(batch_size=BATCH_SIZE, max_batches=None):
+    """
+    Send due email notifications until none is left (or ``max_batches``).
+    Returns {'delivered', 'retrying', 'failed'} counts.
+    """
+    return _drain(claim_batch, _render, _record, batch_size, max_batches)
+
+
+# ---------------------------------------------------------------------------
+# Digests
+# ---------------------------------------------------------------------------
+
+def claim_digests(limit=BATCH_SIZE, now=None):
+    """Lease up to ``limit`` unsent digests and return them."""
+    ids, until = _claim(_due_digests, limit, now or timezone.now())
+    if not ids:
+        return []
+    return list(
+        NotificationBatch.objects.filter(pk__in=ids, locked_until=until)
+        .select_related('recipient__profile').order_by('pk')
+    )
+
+
+def _digest_items(batches):
+    """{batch id: [notification values]} for ``batches`` in one query."""
+    through = NotificationBatch.notifications.through
+    items = {batch.pk: [] for batch in batches}
+    for row in through.objects.filter(notificationbatch_id__in=items).order_by(
+        'notificationbatch_id', 'notification__created_at', 'notification_id',
+    ).values('notificationbatch_id', 'notification__title', 'notification__body',
+             'notification__action_url'):
+        items[row['notificationbatch_id']].append({
+            'title': row['notification__title'],
+            'body': row['notification__body'],
+            'action_url': row['notification__action_url'],
+        })
+    return items
+
+
+def _render_digests(batches):
+    """[(batch, EmailMessage or None)], compiling the template once per locale."""
+    items = _digest_items(batches)
+    site = getattr(settings, 'FRONTEND_URL', '').rstrip('/')
+    rendered = []
+    for language, group in groupby(sorted(batches, key=_language), key=_language):
+        template = select_template([f'{TEMPLATE_DIR}/digest.txt'])
+        with translation.override(language):
+            for batch in group:
+                user = batch.recipient
+                if not user.email or not items[batch.pk]:
+                    rendered.append((batch, None))
+                    continue
+                body = template.render({
+                    'recipient_name': user.get_full_name() or user.username,
+                    'frequency': batch.frequency,
+                    'items': [
+                        dict(item, link=f'{site}{item["action_url"]}' if item['action_url'] else '')
+                        for item in items[batch.pk]
+                    ],
+                })
+                subject = translation.gettext('Your %(frequency)s digest: %(count)d notifications') % {
+                    'frequency': translation.gettext(batch.get_frequency_display().lower()),
+                    'count': len(items[batch.pk]),
+                }
+                rendered.append((batch, EmailMessage(SUBJECT_PREFIX + subject, body, to=[user.email])))
+    return rendered
+
+
+def _record_digests(delivered, failed, now):
+    if delivered:
+        ids = [batch.pk for batch in delivered]
+        NotificationBatch.objects.filter(pk__in=ids).update(
+            is_sent=True, sent_at=now, locked_until=None, error_message='',
+        )
+        Notification.objects.filter(notificationbatch__in=ids).update(status='delivered', sent_at=now)
+    return _record_failures(NotificationBatch, failed, now)
+
+
+def deliver_pending_digests(batch_size=BATCH_SIZE, max_batches=None):
+    """Send unsent digests; returns {'delivered', 'retrying', 'failed'} counts."""
+    return _drain(claim_digests, _render_digests, _record_digests, batch_size, max_batches)
@@ -0,0 +1,188 @@
+"""
+notifications/pubsub.py — Live notification events for the SSE stream
+
+Writers publish per-user events once their transaction commits:
+- 'notification': a new in-app row (id = notification id, the SSE event id),
+- 'unread': {'delta': n}, a change of the stored unread counter.
+
+Open streams (notifications/stream.py) subscribe per user and wait on an
+asyncio queue, so an idle client costs no database queries. The broker is
+picked by settings.NOTIFICATION_STREAM_URL:
+- empty: LocalBroker, in-process — enough when the web process also runs
+  the tasks that write notifications (TASK_BACKEND 'eager' or 'thread'),
+- 'redis://...': RedisBroker, which relays events between processes (web
+  workers, Celery) over Redis pub/sub; any server speaking the Redis
+  protocol works.
+
+publish() is thread-safe and never blocks on a slow client: a subscriber
+whose queue is full is told to disconnect, and replays what it missed from
+Last-Event-ID when it reconnects.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+CHANNEL_PREFIX = 'notifications:'
+# NotificationSerializer fields sent with a 'notification' event (no joins)
+EVENT_FIELDS = (
+    'id', 'event_type', 'channel', 'title', 'body', 'action_url',
+    'related_member', 'related_tree', 'related_change_request',
+    'is_read', 'read_at', 'status', 'created_at', 'sent_at',
+)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """One open stream: a bounded queue of events for one user."""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def push(self, event):
+        # Runs on the subscriber's loop; None tells the stream to close
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = None
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Fans events out to the subscriptions of this process."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Open a subscription; call from the event loop that will read it."""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, event):
+        self._fan_out(user_id, event)
+
+    def _fan_out(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes to Redis channel notifications:<user id>; each process runs one
+    pattern subscription per event loop and fans messages out locally.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        import redis
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._listeners = {}
+
+    def subscribe(self, user_id):
+        subscription = super().subscribe(user_id)
+        listener = self._listeners.get(subscription.loop)
+        if listener is None or listener.done():
+            self._listeners[subscription.loop] = subscription.loop.create_task(self._listen())
+        return subscription
+
+    def publish(self, user_id, event):
+        self._client.publish(f'{CHANNEL_PREFIX}{user_id}', json.dumps(event, cls=DjangoJSONEncoder))
+
+    async def _listen(self):
+        from redis.asyncio import Redis
+        while True:
+            try:
+                async with Redis.from_url(self.url) as client, client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+                    async for message in pubsub.listen():
+                        if message['type'] != 'pmessage':
+                            continue
+                        user_id = int(message['channel'].rpartition(b':')[2])
+                        self._fan_out(user_id, json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning('Notification stream listener lost Redis, reconnecting', exc_info=True)
+                await asyncio.sleep(1)
+
+
+def get_broker():
+    """The process-wide broker for settings.NOTIFICATION_STREAM_URL."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, 'NOTIFICATION_STREAM_URL', '')
+            _broker = RedisBroker(url) if url else LocalBroker()
+        return _broker
+
+
+def _publish(events):
+    broker = get_broker()
+    for user_id, event in events:
+        try:
+            broker.publish(user_id, event)
+        except Exception:
+            # Live updates are best effort: clients catch up on reconnect
+            logger.warning('Could not publish notification event', exc_info=True)
+
+
+def notification_event(notification):
+    """The 'notification' event of a saved Notification."""
+    opts = notification._meta
+    data = {name: getattr(notification, opts.get_field(name).attname) for name in EVENT_FIELDS}
+    return {'event': 'notification', 'id': notification.pk, 'data': data}
+
+
+def publish_notifications(notifications):
+    """Push new in-app notifications to their recipients after commit."""
+    events = [
+        (n.recipient_id, notification_event(n))
+        for n in notifications if n.channel == 'in_app' and n.pk is not None
+    ]
+    if events:
+        transaction.on_commit(partial(_publish, events))
+
+
+def publish_unread(user_deltas):
+    """Push {user_id: delta} unread-counter changes after commit."""
+    events = [
+        (user_id, {'event': 'unread', 'data': {'delta': delta}})
+        for user_id, delta in user_deltas.items() if delta
+    ]
+    if events:
+        transaction.on_commit(partial(_publish, events))
@@ -0,0 +1,159 @@
+"""
+notifications/retention.py — Archive or delete expired notifications
+
+Each policy picks rows of one channel older than ``days`` (by created_at),
+optionally narrowed to event types, read state and delivery statuses, and
+either moves them to NotificationArchive ('archive') or deletes them
+('delete'). settings.NOTIFICATION_RETENTION replaces DEFAULT_POLICIES:
+
+    NOTIFICATION_RETENTION = [
+        {'name': 'read-in-app', 'channel': 'in_app', 'read': True, 'days': 90},
+        {'name': 'birthdays', 'channel': 'in_app', 'event_types': ['birthday'],
+         'read': True, 'days': 14, 'action': 'delete'},
+        {'name': 'failed-email', 'channel': 'email', 'statuses': ['failed'],
+         'days': 30, 'action': 'delete'},
+    ]
+
+Rows go in batches of BATCH_SIZE, each its own short transaction: pick the
+ids through the (channel, created_at) index, skipping rows another
+transaction has locked where the database can; copy them to the archive
+(ignoring ids already there, so an interrupted run can be repeated); delete
+them by id. No lock outlives a batch, and ``max_batches`` bounds a run.
+Unread in-app rows removed by a policy are subtracted from their
+recipients' unread counters. Email rows still waiting for delivery or for a
+digest are never touched.
+
+Every run reports, per policy, the rows removed, archived, and the bytes of
+row data reclaimed (pg_column_size on PostgreSQL, text lengths plus a fixed
+row size elsewhere). The space itself is reused after the table is vacuumed.
+"""
+
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .counters import bump_unread
+from .models import Notification, NotificationArchive, NotificationBatch
+
+BATCH_SIZE = 1000
+# Approximate size of a row's fixed-width columns and header, for estimates
+ROW_BYTES = 120
+# Email rows a worker or digest may still send
+ACTIVE_STATUSES = ('pending',)
+
+Policy = namedtuple('Policy', 'name channel days event_types read statuses action',
+                    defaults=(None, None, None, 'archive'))
+
+DEFAULT_POLICIES = (
+    {'name': 'read-in-app', 'channel': 'in_app', 'read': True, 'days': 90},
+    {'name': 'failed-email', 'channel': 'email', 'statuses': ['failed'], 'days': 30,
+     'action': 'delete'},
+    {'name': 'delivered-email', 'channel': 'email', 'statuses': ['sent', 'delivered'], 'days': 30,
+     'action': 'delete'},
+)
+
+ARCHIVE_COLUMNS = (
+    'id', 'recipient_id', 'event_type', 'channel', 'status', 'title',
+    'related_tree_id', 'related_member_id', 'is_read', 'created_at',
+)
+
+
+def get_policies():
+    """The configured policies, validated."""
+    policies = []
+    for spec in getattr(settings, 'NOTIFICATION_RETENTION', DEFAULT_POLICIES):
+        policy = spec if isinstance(spec, Policy) else Policy(**spec)
+        if policy.action not in ('archive', 'delete'):
+            raise ValueError(f'Retention policy {policy.name}: unknown action {policy.action!r}.')
+        if policy.days < 1:
+            raise ValueError(f'Retention policy {policy.name}: days must be at least 1.')
+        policies.append(policy)
+    return policies
+
+
+def expired(policy, now=None):
+    """Notifications ``policy`` removes as of ``now``."""
+    rows = Notification.objects.filter(
+        channel=policy.channel,
+        created_at__lt=(now or timezone.now()) - timedelta(days=policy.days),
+    )
+    if policy.channel == 'email':
+        rows = rows.exclude(status__in=ACTIVE_STATUSES)
+    if policy.event_types:
+        rows = rows.filter(event_type__in=policy.event_types)
+    if policy.read is not None:
+        rows = rows.filter(is_read=policy.read)
+    if policy.statuses:
+        rows = rows.filter(status__in=policy.statuses)
+    return rows
+
+
+def _row_bytes(rows):
+    """Bytes of row data of the ``rows`` queryset."""
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(Notification._meta.db_table)
+        size = RawSQL(f'pg_column_size({table}.*)', ())
+    else:
+        size = (Length('title') + Length('body') + Length('action_url') + Length('error_message')
+                + Value(ROW_BYTES))
+    return rows.order_by().aggregate(total=Sum(size))['total'] or 0
+
+
+def _remove_batch(policy, now, batch_size):
+    """Remove one batch; returns (rows, bytes)."""
+    with transaction.atomic():
+        candidates = expired(policy, now).order_by()
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        rows = list(candidates.values(*ARCHIVE_COLUMNS)[:batch_size])
+        if not rows:
+            return 0, 0
+        ids = [row['id'] for row in rows]
+        size = _row_bytes(Notification.objects.filter(pk__in=ids))
+
+        if policy.action == 'archive':
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows], ignore_conflicts=True,
+            )
+        NotificationBatch.notifications.through.objects.filter(notification_id__in=ids).delete()
+        Notification.objects.filter(pk__in=ids).only('pk').delete()
+        bump_unread({
+            user_id: -count for user_id, count in Counter(
+                row['recipient_id'] for row in rows if row['channel'] == 'in_app' and not row['is_read']
+            ).items()
+        })
+    return len(rows), size
+
+
+def prune_notifications(policies=None, batch_size=BATCH_SIZE, max_batches=None, dry_run=False,
+                        now=None):
+    """
+    Apply ``policies`` (default: get_policies()). Returns {policy name:
+    {'rows', 'archived', 'bytes'}}. With ``dry_run`` the expired rows are
+    counted and measured, and nothing is removed.
+    """
+    now = now or timezone.now()
+    report = {}
+    for policy in get_policies() if policies is None else policies:
+        stats = report[policy.name] = {'rows': 0, 'archived': 0, 'bytes': 0}
+        if dry_run:
+            rows = expired(policy, now)
+            stats.update(rows=rows.count(), bytes=_row_bytes(rows))
+            continue
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            removed, size = _remove_batch(policy, now, batch_size)
+            batches += 1
+            stats['rows'] += removed
+            stats['bytes'] += size
+            if policy.action == 'archive':
+                stats['archived'] += removed
+            if removed < batch_size:
+                break
+    return report
@@ -0,0 +1,177 @@
+"""
+notifications/service.py — Bulk notification fan-out
+
+Callers describe a notification once (event type, recipients, template
+context, related objects) and the service:
+- renders the title/body once for all recipients,
+- resolves every recipient's email preference (UserProfile.notify_*) in a
+  single query,
+- writes all in-app and email rows with one bulk_create, and bumps the
+  recipients' unread counters (notifications/counters.py) alongside,
+- pushes the new in-app rows to the recipients' open streams after commit
+  (notifications/pubsub.py),
+- does the writing in a background task (core/tasks.py) enqueued when the
+  surrounding transaction commits, so fan-out never delays the response and
+  a rollback sends nothing. A ``key`` makes the send idempotent.
+
+    notify_many('change_needs_review', validator_ids,
+                {'requester': ..., 'member': ..., 'field': ...},
+                related={'member': cr.member, 'tree': tree, 'change_request': cr},
+                action_url=f'/trees/{tree.pk}/changes/{cr.pk}',
+                key=f'change_needs_review:{cr.pk}')
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import bump_unread, count_new_rows
+from .models import Notification
+from .pubsub import publish_notifications
+
+# (title, body) format strings per event type
+TEMPLATES = {
+    'birthday': (
+        '🎂 Birthday Today: {member}',
+        'Today is {member}\'s birthday{age} in "{tree}".',
+    ),
+    'death_recorded': (
+        '⚰️ Death recorded',
+        'A death has been recorded for {member} in "{tree}".',
+    ),
+    'new_member': (
+        '👶 New member added',
+        '{member} has been added to "{tree}".',
+    ),
+    'change_needs_review': (
+        'Change Request: {field}',
+        '{requester} proposed a change to {member}\'s {field}.',
+    ),
+    'change_approved': (
+        'Change Approved',
+        'Your change to {member}\'s {field} has been approved.',
+    ),
+    'change_rejected': (
+        'Change Rejected',
+        'Your change to {member}\'s {field} was rejected. Reason: {reason}',
+    ),
+    'photo_tagged': (
+        '🏷️ You were tagged in a photo',
+        '{tagger} tagged you in a family photo.',
+    ),
+    'comment_on_update': (
+        '💬 New comment on your update',
+        '{author} commented on "{update}".',
+    ),
+}
+
+# Event type → UserProfile flag that opts the user into an email copy
+EMAIL_PREFERENCES = {
+    'tree_invitation':     'notify_invitations_email',
+    'change_needs_review': 'notify_change_requests_email',
+    'change_submitted':    'notify_change_requests_email',
+    'change_approved':     'notify_change_requests_email',
+    'change_rejected':     'notify_change_requests_email',
+    'birthday':            'notify_birthdays_email',
+    'new_member':          'notify_new_member_email',
+    'photo_tagged':        'notify_photo_tags_email',
+}
+
+_RELATED_FIELDS = {
+    'member': 'related_member_id',
+    'tree': 'related_tree_id',
+    'change_request': 'related_change_request_id',
+}
+
+Message = namedtuple('Message', 'event_type recipient_ids title body related action_url')
+
+
+def message(event_type, recipients, context=None, template=None, related=None, action_url=''):
+    """
+    Render one notification for many recipients (users or user ids).
+    ``related`` maps 'member' / 'tree' / 'change_request' to objects or ids.
+    """
+    title, body = template or TEMPLATES[event_type]
+    context = context or {}
+    return Message(
+        event_type=event_type,
+        recipient_ids=tuple(dict.fromkeys(getattr(r, 'pk', r) for r in recipients if r)),
+        title=title.format(**context),
+        body=body.format(**context),
+        related={
+            _RELATED_FIELDS[key]: getattr(value, 'pk', value)
+            for key, value in (related or {}).items()
+        },
+        action_url=action_url,
+    )
+
+
+def _email_recipients(messages):
+    """
+    User ids that want an email copy, per preference flag (one query).
+    Users whose digest_frequency is 'never' get no email at all; 'daily' and
+    'weekly' copies wait for the digest (notifications/digests.py).
+    """
+    from core.models import UserProfile
+    flags = {EMAIL_PREFERENCES[m.event_type] for m in messages if m.event_type in EMAIL_PREFERENCES}
+    user_ids = {pk for m in messages for pk in m.recipient_ids}
+    if not flags or not user_ids:
+        return {}
+
+    rows = UserProfile.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'digest_frequency', *flags
+    )
+    found, wanted = set(), {flag: set() for flag in flags}
+    for user_id, frequency, *values in rows:
+        found.add(user_id)
+        if frequency == 'never':
+            continue
+        for flag, value in zip(flags, values):
+            if value:
+                wanted[flag].add(user_id)
+    # Users without a profile get the model defaults
+    for flag in flags:
+        if UserProfile._meta.get_field(flag).default:
+            wanted[flag] |= user_ids - found
+    return wanted
+
+
+def deliver(messages):
+    """Write the in-app and opted-in email rows for ``messages`` now. Returns the row count."""
+    messages = [m for m in messages if m.recipient_ids]
+    if not messages:
+        return 0
+    now = timezone.now()
+    wanted = _email_recipients(messages)
+
+    rows = []
+    for m in messages:
+        common = dict(event_type=m.event_type, title=m.title, body=m.body,
+                      action_url=m.action_url, **m.related)
+        email_ids = wanted.get(EMAIL_PREFERENCES.get(m.event_type), set())
+        for user_id in m.recipient_ids:
+            rows.append(Notification(recipient_id=user_id, channel='in_app',
+                                     status='sent', sent_at=now, **common))
+            if user_id in email_ids:
+                rows.append(Notification(recipient_id=user_id, channel='email',
+                                         status='pending', **common))
+    with transaction.atomic():
+        Notification.objects.bulk_create(rows, batch_size=1000)
+        bump_unread(count_new_rows(rows))
+        publish_notifications(rows)
+    return len(rows)
+
+
+def send(messages, key=None):
+    """Deliver ``messages`` in the background once the current transaction commits."""
+    from .tasks import deliver_notifications
+    messages = [m._asdict() for m in messages if m.recipient_ids]
+    if messages:
+        deliver_notifications.enqueue(messages, key=key)
+
+
+def notify_many(event_type, recipients, context=None, template=None, related=None, action_url='',
+                key=None):
+    """Render once and fan out to every recipient after commit."""
+    send([message(event_type, recipients, context, template, related, action_url)], key=key)
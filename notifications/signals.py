@@ -1,17 +1,25 @@
 """
 notifications/signals.py — Auto-create notifications on model events
 
+Notifications are written by a background task after commit (see
+notifications/service.py), keyed by the triggering row so a re-sent signal
+does not notify twice.
+
 Covers:
 - FamilyMember creation & death recording
 - PhotoTag (tagged member receives notification if they have an account)
 - UpdateComment (author of post receives notification when someone comments)
+- Notification rows created one at a time bump the unread counter and are
+  pushed to the recipient's open streams
 """
 
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
-from django.utils import timezone
 from tree.models import FamilyMember, PhotoTag, UpdateComment
+from .counters import bump_unread
 from .models import Notification
+from .pubsub import publish_notifications
+from .service import notify_many
 
 
 @receiver(pre_save, sender=FamilyMember)
@@ -33,72 +41,55 @@ def create_member_notifications(sender, instance, created, **kwargs):
     Fire in-app notifications to the tree owner when a member is added
     or when a death is recorded for a previously living member.
     """
-    tree_owner = instance.tree.created_by
+    tree = instance.tree
+    context = {'member': instance.display_name, 'tree': tree.name}
+    related = {'member': instance, 'tree': tree}
+    action_url = f'/members/{instance.pk}'
 
     if created:
         # Don't notify if the creator is the owner themselves
-        if instance.added_by != tree_owner:
-            Notification.objects.create(
-                recipient=tree_owner,
-                event_type='new_member',
-                channel='in_app',
-                title='👶 New member added',
-                body=f'{instance.display_name} has been added to "{instance.tree.name}".',
-                related_member=instance,
-                related_tree=instance.tree,
-                action_url=f'/members/{instance.pk}',
-                status='sent',
-                sent_at=timezone.now(),
-            )
+        if instance.added_by_id != tree.created_by_id:
+            notify_many('new_member', [tree.created_by_id], context,
+                        related=related, action_url=action_url, key=f'new_member:{instance.pk}')
     else:
         # Detect: was alive before save, now marked deceased
         was_alive = getattr(instance, '_old_is_alive', True)
         if was_alive and not instance.is_alive:
-            Notification.objects.create(
-                recipient=tree_owner,
-                event_type='death_recorded',
-                channel='in_app',
-                title='⚰️ Death recorded',
-                body=f'A death has been recorded for {instance.display_name} in "{instance.tree.name}".',
-                related_member=instance,
-                related_tree=instance.tree,
-                action_url=f'/members/{instance.pk}',
-                status='sent',
-                sent_at=timezone.now(),
-            )
+            notify_many('death_recorded', [tree.created_by_id], context,
+                        related=related, action_url=action_url, key=f'death_recorded:{instance.pk}')
 
 
 @receiver(post_save, sender=PhotoTag)
 def create_photo_tag_notification(sender, instance, created, **kwargs):
     """Notify a tagged member if they have an active user account."""
-    if created and instance.member.user_account and instance.member.user_account != instance.tagged_by:
-        Notification.objects.create(
-            recipient=instance.member.user_account,
-            event_type='photo_tagged',
-            channel='in_app',
-            title='🏷️ You were tagged in a photo',
-            body=f'{instance.tagged_by.username} tagged you in a family photo.',
-            related_member=instance.member,
-            related_tree=instance.photo.tree,
-            action_url=f'/photos/{instance.photo.pk}',
-            status='sent',
-            sent_at=timezone.now(),
+    account_id = instance.member.user_account_id
+    if created and account_id and account_id != instance.tagged_by_id:
+        notify_many(
+            'photo_tagged', [account_id], {'tagger': instance.tagged_by.username},
+            related={'member': instance.member, 'tree': instance.photo.tree_id},
+            action_url=f'/photos/{instance.photo_id}',
+            key=f'photo_tagged:{instance.pk}',
         )
 
 
 @receiver(post_save, sender=UpdateComment)
 def create_comment_notification(sender, instance, created, **kwargs):
     """Notify update author when someone comments on their post."""
-    post_author = instance.update.created_by
-    if created and post_author != instance.author:
-        Notification.objects.create(
-            recipient=post_author,
-            event_type='comment_on_update',
-            channel='in_app',
-            title='💬 New comment on your update',
-            body=f'{instance.author.username} commented on "{instance.update.title}".',
-            related_tree=instance.update.tree,
-            action_url=f'/updates/{instance.update.pk}',
-            status='sent',
-            sent_at=timezone.now(),
-        )
\ No newline at end of file
+    update = instance.update
+    if created and update.created_by_id != instance.author_id:
+        notify_many(
+            'comment_on_update', [update.created_by_id],
+            {'author': instance.author.username, 'update': update.title},
+            related={'tree': update.tree_id},
+            action_url=f'/updates/{update.pk}',
+            key=f'comment_on_update:{instance.pk}',
+        )
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, **kwargs):
+    """Push in-app rows created one at a time and bump the unread counter (fan-out does its own)."""
+    if created and instance.channel == 'in_app':
+        publish_notifications([instance])
+        if not instance.is_read:
+            bump_unread({instance.recipient_id: 1})
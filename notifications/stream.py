@@ -0,0 +1,124 @@
+"""
+notifications/stream.py — Server-Sent Events stream of live notifications
+
+GET /api/notifications/stream/ keeps a text/event-stream response open and
+sends the authenticated user:
+- 'unread' {"unread_count": n} on connect, then {"delta": n} on each change,
+- 'notification' for each new in-app row (NotificationSerializer fields
+  without the related names), with the notification id as the event id,
+- a comment line every KEEPALIVE seconds so proxies keep the line open.
+
+EventSource reconnects by itself and sends the last event id back in the
+Last-Event-ID header (or ?last_event_id= on a fresh connection); in-app
+notifications after that id are replayed first. Opening a stream costs the
+user lookup, the stored unread counter and the replay; after that it only
+waits on its pubsub subscription (notifications/pubsub.py), so idle
+clients cost no database queries.
+
+The view is async and needs an ASGI server (docs/DEPLOYMENT.md): under WSGI
+the response is buffered and never finishes. EventSource cannot send an
+Authorization header, so the JWT access token may be passed as ?token=.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .counters import unread_count
+from .models import Notification
+from .pubsub import get_broker, notification_event
+
+KEEPALIVE = 15
+RETRY_MS = 5000
+REPLAY_LIMIT = 100
+
+
+def _authenticate(request):
+    """The user of the Bearer header, ?token= or the session; None if anonymous."""
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw = auth.get_raw_token(header) if header else request.GET.get('token', '').encode()
+    if not raw:
+        return request.user if request.user.is_authenticated else None
+    try:
+        return auth.get_user(auth.get_validated_token(raw))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _snapshot(user_id, last_id):
+    """(unread count, missed 'notification' events oldest first)."""
+    missed = []
+    if last_id is not None:
+        rows = Notification.objects.filter(
+            recipient_id=user_id, channel='in_app', pk__gt=last_id,
+        ).order_by('-pk')[:REPLAY_LIMIT]
+        missed = [notification_event(n) for n in reversed(rows)]
+    return unread_count(user_id), missed
+
+
+def _format(event):
+    lines = [f"event: {event['event']}"]
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event['data'], cls=DjangoJSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def _events(user_id, last_id):
+    broker = get_broker()
+    # Subscribe before reading the snapshot so nothing falls in between
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        # A delta committed between the two may be counted twice until the next connect
+        count, missed = await sync_to_async(_snapshot)(user_id, last_id)
+        yield _format({'event': 'unread', 'data': {'unread_count': count}})
+        for event in missed:
+            last_id = event['id']
+            yield _format(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if event is None:
+                return  # fell behind: the client reconnects and replays
+            if event['event'] == 'notification':
+                if last_id is not None and event['id'] <= last_id:
+                    continue  # already replayed
+                last_id = event['id']
+            yield _format(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def notification_stream(request):
+    """SSE stream of the authenticated user's notifications and unread count."""
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    response = StreamingHttpResponse(
+        _events(user.pk, _last_event_id(request)), content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: do not buffer the stream
+    return response
@@ -0,0 +1,43 @@
+"""
+notifications/tasks.py — Notification fan-out as a background task
+"""
+
+from core.tasks import task
+
+
+@task(max_retries=3)
+def deliver_notifications(messages):
+    """Write the rows for serialized Messages (see service.send)."""
+    from .service import Message, deliver
+    deliver([Message(**m) for m in messages])
+
+
+@task(max_retries=0)
+def send_pending_emails():
+    """Drain the email outbox (notifications/outbox.py); scheduled by Celery beat."""
+    from .outbox import deliver_pending_emails
+    return deliver_pending_emails()
+
+
+@task(max_retries=0)
+def send_pending_digests():
+    """Send built digests (notifications/outbox.py)."""
+    from .outbox import deliver_pending_digests
+    return deliver_pending_digests()
+
+
+@task(max_retries=1)
+def build_digests():
+    """Build the digests due this hour and hand them to delivery; scheduled by Celery beat."""
+    from .digests import build_digests as build
+    stats = build()
+    if stats['batches']:
+        send_pending_digests.enqueue()
+    return stats
+
+
+@task(max_retries=1)
+def prune_notifications():
+    """Apply the retention policies (notifications/retention.py); scheduled by Celery beat."""
+    from .retention import prune_notifications as prune
+    return prune()
@@ -1,13 +1,23 @@
 """
 notifications/tests/test_api.py — Notification API tests
 """
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from notifications.models import Notification
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Task idempotency keys must not leak between tests (notification ids get reused)."""
+    from django.core.cache import cache
+    cache.clear()
+
+
 @pytest.fixture
 def client():
     return APIClient()
@@ -95,7 +105,7 @@ class TestNotificationList:
         res = auth_client.get('/api/notifications/')
         assert res.status_code == status.HTTP_200_OK
         # Email notification should NOT appear in list
-        ids = [n['id'] for n in res.data]
+        ids = [n['id'] for n in res.data['results']]
         assert email_notif.pk not in ids
 
     def test_detail_works_for_any_channel(self, auth_client, user):
@@ -114,3 +124,405 @@ class TestNotificationList:
             'event_type': 'system', 'channel': 'in_app', 'title': 'hack'
         })
         assert res.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+# ─── Bulk fan-out ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def review_tree(user):
+    from tree.models import Tree, TreePermission, FamilyMember
+    tree = Tree.objects.create(name='Review Tree', created_by=user, require_approval_for_edits=True)
+    TreePermission.objects.create(tree=tree, user=user, role='viewer', status='active')
+    member = FamilyMember.objects.create(tree=tree, first_name='Ada', last_name='Roe', added_by=user)
+    return tree, member
+
+
+def _add_validators(tree, count, start=0):
+    from tree.models import TreePermission
+    users = User.objects.bulk_create([User(username=f'validator{i}') for i in range(start, start + count)])
+    TreePermission.objects.bulk_create([
+        TreePermission(tree=tree, user=u, role='validator', status='active') for u in users
+    ])
+    return users
+
+
+@pytest.mark.django_db
+class TestNotifyMany:
+
+    def test_renders_once_and_honours_email_preferences(self, user, django_capture_on_commit_callbacks):
+        from core.models import UserProfile
+        from notifications.service import notify_many
+        quiet = User.objects.create_user(username='quiet')
+        UserProfile.objects.update_or_create(user=quiet, defaults={'notify_change_requests_email': False})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_many('change_approved', [user, quiet.pk],
+                        {'member': 'Ada Roe', 'field': 'nickname'}, action_url='/members/1')
+
+        rows = Notification.objects.values_list('recipient__username', 'channel', 'body')
+        assert sorted(rows) == [
+            ('notifuser', 'email', "Your change to Ada Roe's nickname has been approved."),
+            ('notifuser', 'in_app', "Your change to Ada Roe's nickname has been approved."),
+            ('quiet', 'in_app', "Your change to Ada Roe's nickname has been approved."),
+        ]
+
+    def test_nothing_is_written_before_commit(self, user, django_capture_on_commit_callbacks):
+        from notifications.service import notify_many
+        with django_capture_on_commit_callbacks() as callbacks:
+            notify_many('change_approved', [user], {'member': 'Ada', 'field': 'bio'})
+        assert len(callbacks) == 1
+        assert not Notification.objects.exists()
+
+    def _propose_queries(self, client, member, django_capture_on_commit_callbacks):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx, django_capture_on_commit_callbacks(execute=True):
+            res = client.post(f'/api/members/{member.pk}/propose-change/', {
+                'field_name': 'first_name', 'new_value': 'Ida',
+            }, format='json')
+        assert res.status_code == status.HTTP_201_CREATED
+        # SQLite caps bound parameters per statement, so bulk_create may split
+        # the one logical insert into several batches; count everything else.
+        return sum(
+            1 for q in ctx.captured_queries
+            if not q['sql'].startswith('INSERT INTO "notifications_notification"')
+        )
+
+    def test_propose_change_fan_out_is_constant(self, auth_client, review_tree,
+                                                django_capture_on_commit_callbacks):
+        tree, member = review_tree
+        _add_validators(tree, 5)
+        few = self._propose_queries(auth_client, member, django_capture_on_commit_callbacks)
+        _add_validators(tree, 45, start=5)
+        many = self._propose_queries(auth_client, member, django_capture_on_commit_callbacks)
+        assert many == few
+        assert Notification.objects.filter(
+            event_type='change_needs_review', channel='in_app'
+        ).count() == 5 + 50
+
+
+# ─── Email outbox ─────────────────────────────────────────────────────────────
+
+def _email(user, **fields):
+    fields = {'title': 'Change Approved', 'body': 'Your change was approved.',
+              'action_url': '/members/1', **fields}
+    return Notification.objects.create(
+        recipient=user, event_type='change_approved', channel='email', status='pending', **fields
+    )
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_delivers_pending_emails(self, user):
+        from django.core import mail
+        from notifications.outbox import deliver_pending_emails
+        first, second = _email(user), _email(user)
+        Notification.objects.create(recipient=user, event_type='system', channel='in_app', status='sent')
+
+        assert deliver_pending_emails() == {'delivered': 2, 'retrying': 0, 'failed': 0}
+        assert [m.to for m in mail.outbox] == [['notif@example.com']] * 2
+        assert mail.outbox[0].subject == '[La Racine] Change Approved'
+        assert 'Your change was approved.' in mail.outbox[0].body
+        assert '/members/1' in mail.outbox[0].body
+        first.refresh_from_db()
+        assert (first.status, first.locked_until) == ('delivered', None)
+        assert deliver_pending_emails()['delivered'] == 0
+
+    def test_claimed_rows_are_leased(self, user):
+        from notifications.outbox import claim_batch
+        _email(user)
+        assert len(claim_batch()) == 1
+        assert claim_batch() == []
+
+    def test_failures_back_off_then_fail(self, user, monkeypatch):
+        from smtplib import SMTPException
+        from django.core.mail.backends.locmem import EmailBackend
+        from notifications import outbox
+
+        def refuse(self, messages):
+            raise SMTPException('421 try later')
+        monkeypatch.setattr(EmailBackend, 'send_messages', refuse)
+        row = _email(user)
+
+        assert outbox.deliver_pending_emails() == {'delivered': 0, 'retrying': 1, 'failed': 0}
+        row.refresh_from_db()
+        assert (row.status, row.attempts, row.error_message) == ('pending', 1, '421 try later')
+        delay = (row.next_attempt_at - timezone.now()).total_seconds()
+        assert outbox.RETRY_DELAY - 5 < delay <= outbox.RETRY_DELAY
+        assert outbox.deliver_pending_emails()['retrying'] == 0  # not due yet
+
+        monkeypatch.setattr(outbox, 'MAX_ATTEMPTS', 2)
+        Notification.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        assert outbox.deliver_pending_emails()['failed'] == 1
+        row.refresh_from_db()
+        assert (row.status, row.attempts) == ('failed', 2)
+
+    def test_recipient_without_address_fails_at_once(self):
+        from notifications.outbox import deliver_pending_emails
+        nobody = User.objects.create_user(username='nomail')
+        row = _email(nobody)
+        assert deliver_pending_emails()['failed'] == 1
+        row.refresh_from_db()
+        assert row.status == 'failed'
+
+
+# ─── Digests ──────────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestDigests:
+
+    def _digest_user(self, user, frequency='daily', tz='Asia/Tokyo'):
+        from core.models import UserProfile
+        UserProfile.objects.update_or_create(
+            user=user, defaults={'digest_frequency': frequency, 'timezone': tz},
+        )
+
+    def test_due_timezones_follow_local_hour(self, user):
+        from datetime import datetime, timezone as dt_timezone
+        from notifications.digests import due_timezones
+        self._digest_user(user)
+        tokyo_morning = datetime(2026, 10, 16, 23, 0, tzinfo=dt_timezone.utc)  # 08:00 in Tokyo
+        assert due_timezones('daily', tokyo_morning) == ['Asia/Tokyo']
+        assert due_timezones('daily', tokyo_morning.replace(hour=12)) == []
+        # Saturday in Tokyo: not the weekly digest day
+        assert due_timezones('weekly', tokyo_morning) == []
+
+    def test_builds_and_sends_one_digest(self, user):
+        from django.core import mail
+        from notifications.digests import build_digests
+        from notifications.models import NotificationBatch
+        from notifications.outbox import deliver_pending_digests, deliver_pending_emails
+        self._digest_user(user)
+        instant = User.objects.create_user(username='instant', email='instant@example.com')
+        first, second = _email(user), _email(user, title='New member')
+        _email(instant)
+
+        assert build_digests(all_timezones=True) == {'batches': 1, 'notifications': 2}
+        assert build_digests(all_timezones=True) == {'batches': 0, 'notifications': 0}
+        batch = NotificationBatch.objects.get()
+        assert set(batch.notifications.values_list('pk', flat=True)) == {first.pk, second.pk}
+
+        # Digest rows are left to the digest; the instant recipient is mailed now
+        assert deliver_pending_emails()['delivered'] == 1
+        assert deliver_pending_digests() == {'delivered': 1, 'retrying': 0, 'failed': 0}
+        assert [m.to for m in mail.outbox] == [['instant@example.com'], ['notif@example.com']]
+        assert 'New member' in mail.outbox[1].body and 'Change Approved' in mail.outbox[1].body
+        batch.refresh_from_db()
+        assert batch.is_sent
+        assert set(batch.notifications.values_list('status', flat=True)) == {'delivered'}
+
+    def test_never_gets_no_email_rows(self, user, django_capture_on_commit_callbacks):
+        from notifications.service import notify_many
+        self._digest_user(user, frequency='never')
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_many('change_approved', [user], {'member': 'Ada', 'field': 'bio'})
+        assert list(Notification.objects.values_list('channel', flat=True)) == ['in_app']
+
+
+# ─── Unread counter ───────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestUnreadCounter:
+
+    def _stored(self, user):
+        from core.models import UserProfile
+        return UserProfile.objects.get(user=user).unread_in_app_count
+
+    def test_fan_out_and_mark_all_read(self, auth_client, user, django_capture_on_commit_callbacks):
+        from notifications.service import message, send
+        with django_capture_on_commit_callbacks(execute=True):
+            send([message('change_approved', [user], {'member': 'Ada', 'field': 'bio'}),
+                  message('change_rejected', [user], {'member': 'Ada', 'field': 'bio', 'reason': '-'})])
+        assert self._stored(user) == 2
+        assert auth_client.get('/api/notifications/unread-count/').data['unread_count'] == 2
+
+        assert auth_client.post('/api/notifications/mark-all-read/').data['marked_read'] == 2
+        assert self._stored(user) == 0
+
+    def test_profile_save_keeps_counter(self, user, notification):
+        profile = user.profile
+        profile.refresh_from_db()
+        Notification.objects.create(recipient=user, event_type='system', channel='in_app')
+        profile.bio = 'Hello'
+        profile.save()
+        assert self._stored(user) == 2
+
+    def test_delete_decrements_only_unread_rows(self, auth_client, user, notification):
+        from notifications.api import NotificationViewSet
+        stale = Notification.objects.get(pk=notification.pk)
+        auth_client.patch(f'/api/notifications/{notification.pk}/read/')
+        assert self._stored(user) == 0
+        NotificationViewSet().perform_destroy(stale)
+        assert not Notification.objects.filter(pk=notification.pk).exists()
+        assert self._stored(user) == 0
+
+        unread = Notification.objects.create(recipient=user, event_type='system', channel='in_app')
+        assert auth_client.delete(f'/api/notifications/{unread.pk}/').status_code == 204
+        assert self._stored(user) == 0
+
+    def test_reconcile(self, user, notification):
+        from core.models import UserProfile
+        from notifications.counters import reconcile_unread_counts
+        UserProfile.objects.filter(user=user).update(unread_in_app_count=7)
+        assert reconcile_unread_counts() == 1
+        assert self._stored(user) == 1
+        assert reconcile_unread_counts() == 0
+
+
+# ─── Live stream ──────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def published(monkeypatch):
+    """Events published after commit, as (user id, event)."""
+    from notifications import pubsub
+    events = []
+
+    class Recorder(pubsub.LocalBroker):
+        def publish(self, user_id, event):
+            events.append((user_id, event))
+
+    monkeypatch.setattr(pubsub, '_broker', Recorder())
+    return events
+
+
+def test_local_broker_fans_out_across_threads():
+    import asyncio
+    from notifications.pubsub import LocalBroker
+    broker = LocalBroker()
+
+    async def scenario():
+        mine, other = broker.subscribe(1), broker.subscribe(2)
+        await asyncio.to_thread(broker.publish, 1, {'event': 'unread', 'data': {'delta': 1}})
+        event = await asyncio.wait_for(mine.get(), 1)
+        broker.unsubscribe(mine)
+        broker.unsubscribe(other)
+        return event, other.queue.empty()
+
+    assert asyncio.run(scenario()) == ({'event': 'unread', 'data': {'delta': 1}}, True)
+
+
+def test_slow_subscriber_is_told_to_reconnect():
+    import asyncio
+    from notifications.pubsub import QUEUE_SIZE, LocalBroker
+    broker = LocalBroker()
+
+    async def scenario():
+        subscription = broker.subscribe(1)
+        for delta in range(QUEUE_SIZE + 1):
+            subscription.push({'event': 'unread', 'data': {'delta': delta}})
+        return await subscription.get()
+
+    assert asyncio.run(scenario()) is None
+
+
+@pytest.mark.django_db
+class TestNotificationStream:
+
+    def test_fan_out_publishes_after_commit(self, user, published, django_capture_on_commit_callbacks):
+        from notifications.service import message, send
+        with django_capture_on_commit_callbacks(execute=True):
+            send([message('change_approved', [user], {'member': 'Ada', 'field': 'bio'})])
+        notif = Notification.objects.get(recipient=user, channel='in_app')
+        assert published == [
+            (user.pk, {'event': 'unread', 'data': {'delta': 1}}),
+            (user.pk, {'event': 'notification', 'id': notif.pk, 'data': published[1][1]['data']}),
+        ]
+        assert published[1][1]['data']['title'] == 'Change Approved'
+
+    def test_mark_read_publishes_delta(self, user, notification, published,
+                                       django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            notification.mark_read()
+            notification.mark_read()
+        assert published == [(user.pk, {'event': 'unread', 'data': {'delta': -1}})]
+
+    def test_snapshot_replays_after_last_event_id(self, user, notification):
+        from notifications.stream import _snapshot
+        later = [Notification.objects.create(recipient=user, event_type='system', channel='in_app')
+                 for _ in range(2)]
+        Notification.objects.create(recipient=user, event_type='system', channel='email')
+        count, missed = _snapshot(user.pk, notification.pk)
+        assert count == 3
+        assert [event['id'] for event in missed] == [n.pk for n in later]
+
+    def test_stream_replays_then_follows(self, user, notification):
+        from asgiref.sync import async_to_sync
+        from notifications.pubsub import get_broker
+        from notifications.stream import _events
+
+        async def read():
+            events = _events(user.pk, 0)
+            chunks = [await anext(events) for _ in range(3)]  # retry, count, replay
+            get_broker().publish(user.pk, {'event': 'unread', 'data': {'delta': -1}})
+            chunks.append(await anext(events))
+            await events.aclose()
+            return chunks
+
+        chunks = async_to_sync(read)()
+        assert chunks[0].startswith('retry:')
+        assert chunks[1] == 'event: unread\ndata: {"unread_count": 1}\n\n'
+        assert chunks[2].startswith(f'event: notification\nid: {notification.pk}\ndata: ')
+        assert chunks[3] == 'event: unread\ndata: {"delta": -1}\n\n'
+
+    def test_requires_authentication(self, client):
+        assert client.get('/api/notifications/stream/').status_code == 401
+
+
+# ─── Retention ────────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestRetention:
+
+    def _aged(self, user, days, **fields):
+        defaults = {'event_type': 'system', 'channel': 'in_app', 'status': 'sent'}
+        notif = Notification.objects.create(recipient=user, **{**defaults, **fields})
+        Notification.objects.filter(pk=notif.pk).update(created_at=timezone.now() - timedelta(days=days))
+        return notif
+
+    def test_archives_read_in_app_in_batches(self, user):
+        from notifications.models import NotificationArchive
+        from notifications.retention import prune_notifications
+        old = [self._aged(user, 100, is_read=True) for _ in range(3)]
+        recent = self._aged(user, 10, is_read=True)
+        unread = self._aged(user, 100)
+
+        stats = prune_notifications(batch_size=2)['read-in-app']
+        assert stats['rows'] == stats['archived'] == 3 and stats['bytes'] > 0
+        assert set(Notification.objects.values_list('pk', flat=True)) == {recent.pk, unread.pk}
+        assert sorted(NotificationArchive.objects.values_list('pk', flat=True)) == [n.pk for n in old]
+        assert prune_notifications()['read-in-app']['rows'] == 0
+
+    def test_email_rows_still_to_send_are_kept(self, user):
+        from notifications.models import NotificationArchive, NotificationBatch
+        from notifications.retention import prune_notifications
+        self._aged(user, 40, channel='email', status='failed')
+        pending = self._aged(user, 40, channel='email', status='pending')
+        delivered = self._aged(user, 40, channel='email', status='delivered')
+        batch = NotificationBatch.objects.create(recipient=user, is_sent=True)
+        batch.notifications.add(delivered)
+
+        report = prune_notifications()
+        assert report['failed-email']['rows'] == report['delivered-email']['rows'] == 1
+        assert list(Notification.objects.values_list('pk', flat=True)) == [pending.pk]
+        assert not NotificationArchive.objects.exists()
+        assert batch.notifications.count() == 0
+
+    def test_custom_policy_adjusts_unread_counter(self, user, settings):
+        from core.models import UserProfile
+        from notifications.retention import prune_notifications
+        settings.NOTIFICATION_RETENTION = [
+            {'name': 'old-birthdays', 'channel': 'in_app', 'event_types': ['birthday'],
+             'days': 7, 'action': 'delete'},
+        ]
+        self._aged(user, 10, event_type='birthday')
+        self._aged(user, 10)
+
+        assert prune_notifications()['old-birthdays']['rows'] == 1
+        assert UserProfile.objects.get(user=user).unread_in_app_count == 1
+
+    def test_dry_run_removes_nothing(self, user):
+        from notifications.retention import prune_notifications
+        self._aged(user, 100, is_read=True)
+        assert prune_notifications(dry_run=True)['read-in-app']['rows'] == 1
+        assert Notification.objects.count() == 1
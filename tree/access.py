@@ -0,0 +1,124 @@
+"""
+tree/access.py — Tree visibility and request-scoped role resolution
+
+The first role check in a request loads all of the requesting user's roles
+(active TreePermission rows, via TreeAccess) with one query into a {tree_id: role} dict; every later
+check in that request (serializer fields, assert_tree_role, review checks)
+is a dict lookup. TreeRoleMiddleware opens and closes the scope. Outside a
+request (shell, management commands) lookups still work, just uncached.
+
+Visibility ("which trees may this user see?") is answered by the TreeAccess
+table, kept in sync with TreePermission and Tree.created_by by signals, so
+list filters are a single ``tree_id IN (subquery)`` instead of an OR over
+joins that needs DISTINCT.
+"""
+
+from contextvars import ContextVar
+
+from django.db import transaction
+
+_roles = ContextVar('tree_roles', default=None)
+
+
+def user_tree_roles(user):
+    """{tree_id: role} for the user's active tree permissions."""
+    scope = _roles.get()
+    if scope is not None and user.pk in scope:
+        return scope[user.pk]
+
+    from .models import TreeAccess
+    roles = dict(
+        TreeAccess.objects.filter(user=user).exclude(role='')
+        .values_list('tree_id', 'role')
+    )
+    if scope is not None:
+        scope[user.pk] = roles
+    return roles
+
+
+def resolve_tree_role(user, tree):
+    """The user's active role on a tree (instance or id), or None. Staff act as owners."""
+    if not user or not user.is_authenticated:
+        return None
+    if user.is_staff:
+        return 'owner'
+    return user_tree_roles(user).get(getattr(tree, 'pk', tree))
+
+
+def forget_tree_roles(user_id):
+    """Drop a user's cached roles so the next check reloads them."""
+    scope = _roles.get()
+    if scope is not None:
+        scope.pop(user_id, None)
+
+
+class TreeRoleMiddleware:
+    """Give each request its own, initially empty, role cache."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _roles.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _roles.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# TreeAccess
+# ---------------------------------------------------------------------------
+
+def accessible_tree_ids(user, roles=None):
+    """
+    Subquery of tree ids the user can see, optionally only those where the
+    user holds one of ``roles``. Use as ``filter(tree_id__in=...)``.
+    """
+    from .models import TreeAccess
+    qs = TreeAccess.objects.filter(user=user)
+    if roles is not None:
+        qs = qs.filter(role__in=roles)
+    return qs.values('tree_id')
+
+
+def sync_tree_access(tree_id, user_id, create=True):
+    """
+    Recompute one (user, tree) TreeAccess row from TreePermission and
+    Tree.created_by. With ``create=False`` the row is only updated or removed.
+    """
+    from .models import Tree, TreeAccess, TreePermission
+    role = TreePermission.objects.filter(
+        tree_id=tree_id, user_id=user_id, status='active'
+    ).values_list('role', flat=True).first()
+    is_creator = Tree.objects.filter(pk=tree_id, created_by_id=user_id).exists()
+
+    rows = TreeAccess.objects.filter(tree_id=tree_id, user_id=user_id)
+    if role is None and not is_creator:
+        rows.delete()
+    elif create:
+        TreeAccess.objects.update_or_create(
+            tree_id=tree_id, user_id=user_id, defaults={'role': role or ''}
+        )
+    else:
+        rows.update(role=role or '')
+
+
+@transaction.atomic
+def rebuild_tree_access():
+    """Recreate the whole TreeAccess table. Returns the row count."""
+    from .models import Tree, TreeAccess, TreePermission
+    access = {
+        (user_id, tree_id): ''
+        for tree_id, user_id in Tree.objects.values_list('pk', 'created_by_id')
+    }
+    for tree_id, user_id, role in TreePermission.objects.filter(
+        status='active'
+    ).values_list('tree_id', 'user_id', 'role'):
+        access[(user_id, tree_id)] = role
+    TreeAccess.objects.all().delete()
+    TreeAccess.objects.bulk_create(
+        [TreeAccess(user_id=u, tree_id=t, role=r) for (u, t), r in access.items()],
+        batch_size=2000,
+    )
+    return len(access)
@@ -26,7 +26,7 @@ from .models import (
     FuzzyDate, Tree, TreePermission, FamilyMember, FamilyRelationship,
     MemberPrivacySettings, ChangeRequest, ChangeRequestValidator,
     FamilyPhoto, PhotoTag, FamilyUpdate, UpdateComment, UpdateLike,
-    TreeInvitation, Update,
+    TreeInvitation, Update, GedcomImport,
 )
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -69,22 +69,6 @@ def coloured_status(value, label=None):
     )
 
 
-# ──────────────────────────────────────────────────────────────────────────────
-# FuzzyDate
-# ──────────────────────────────────────────────────────────────────────────────
-
-@admin.register(FuzzyDate)
-class FuzzyDateAdmin(admin.ModelAdmin):
-    list_display  = ('human_readable', 'precision', 'date', 'bce', 'display_text')
-    list_filter   = ('precision', 'bce')
-    search_fields = ('display_text',)
-    ordering      = ('-date',)
-
-    @admin.display(description='Date')
-    def human_readable(self, obj):
-        return str(obj)
-
-
 # ──────────────────────────────────────────────────────────────────────────────
 # Tree
 # ──────────────────────────────────────────────────────────────────────────────
@@ -117,18 +101,13 @@ class TreeAdmin(admin.ModelAdmin):
         }),
     )
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(
-            _member_count=Count('members', distinct=True)
-        )
-
-    @admin.display(description='Members', ordering='_member_count')
+    @admin.display(description='Members', ordering='member_count')
     def member_count(self, obj):
         url = (
             reverse('admin:tree_familymember_changelist')
             + f'?tree__id__exact={obj.id}'
         )
-        return format_html('<a href="{}">{}</a>', url, obj._member_count)
+        return format_html('<a href="{}">{}</a>', url, obj.member_count)
 
     @admin.display(description='Privacy')
     def privacy_badge(self, obj):
@@ -221,7 +200,7 @@ class FamilyMemberAdmin(admin.ModelAdmin):
     list_filter    = ('gender', 'is_alive', 'privacy_level', 'tree')
     search_fields  = ('first_name', 'last_name', 'nickname', 'maiden_name',
                       'biography', 'birth_location', 'current_location')
-    raw_id_fields  = ('tree', 'birth_date', 'death_date', 'user_account', 'added_by')
+    raw_id_fields  = ('tree', 'user_account', 'added_by')
     readonly_fields = ('created_at', 'updated_at', 'photo_preview', 'display_name')
     inlines        = [FamilyRelationshipFromInline, MemberPrivacyInline, ChangeRequestInline]
     date_hierarchy = 'created_at'
@@ -238,8 +217,11 @@ class FamilyMemberAdmin(admin.ModelAdmin):
         }),
         ('Life Dates', {
             'fields': (
-                ('birth_date', 'birth_location'),
-                ('is_alive', 'death_date', 'death_location'),
+                ('birth_date_value', 'birth_date_precision', 'birth_date_bce', 'birth_date_text'),
+                'birth_location',
+                'is_alive',
+                ('death_date_value', 'death_date_precision', 'death_date_bce', 'death_date_text'),
+                'death_location',
                 'current_location',
             )
         }),
@@ -339,13 +321,16 @@ class MemberPrivacySettingsAdmin(admin.ModelAdmin):
 def _apply_change(change_request):
     """
     Apply a ChangeRequest to its target FamilyMember field.
-    Handles simple text/bool fields; skips FuzzyDate FK fields (handled separately).
+    Handles simple text/bool fields and the inline dates (given as the date's values).
     """
     member = change_request.member
     field  = change_request.field_name
     value  = change_request.new_value
 
-    if hasattr(member, field):
+    if field in ('birth_date', 'death_date'):
+        setattr(member, field, FuzzyDate(**value) if value else None)
+        member.save()
+    elif hasattr(member, field):
         # Unwrap single-key dict if serialized that way
         if isinstance(value, dict) and len(value) == 1:
             value = list(value.values())[0]
@@ -664,6 +649,19 @@ class TreeInvitationAdmin(admin.ModelAdmin):
         self.message_user(request, f'{expired} invitation(s) marked as expired.', messages.WARNING)
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# GedcomImport  — read-only log of background imports
+# ──────────────────────────────────────────────────────────────────────────────
+
+@admin.register(GedcomImport)
+class GedcomImportAdmin(admin.ModelAdmin):
+    list_display    = ('tree', 'status', 'created_by', 'created_at', 'finished_at')
+    list_filter     = ('status',)
+    search_fields   = ('tree__name', 'created_by__username')
+    raw_id_fields   = ('tree', 'created_by')
+    readonly_fields = ('status', 'stats', 'error', 'created_at', 'finished_at')
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Legacy Update model (kept visible but clearly marked)
 # ──────────────────────────────────────────────────────────────────────────────
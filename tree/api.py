@@ -2,8 +2,10 @@
 tree/api.py — ViewSets for all tree-related models
 
 Includes:
-- TreeViewSet (with members, permissions, invitations actions)
-- FamilyMemberViewSet (with relationships, change_requests, validators actions)
+- TreeViewSet (with members, bulk member/relationship writes, graph,
+  duplicates, GEDCOM import, export, permissions, invitations actions)
+- FamilyMemberViewSet (with relationships, ancestors/descendants, kinship,
+  common-ancestors, merge, change_requests, validators actions)
 - FamilyRelationshipViewSet
 - ChangeRequestViewSet (with approve/reject actions)
 - ChangeRequestValidatorViewSet
@@ -13,18 +15,23 @@ Includes:
 - UpdateViewSet (legacy)
 """
 
+import json
+
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, filters, status, renderers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
-from django.db.models import Count, Q
+from django.db.models import Q
+
+from core.pagination import paginated_response
 
 from .models import (
     Tree, TreePermission, FamilyMember, FamilyRelationship,
     MemberPrivacySettings, ChangeRequest, ChangeRequestValidator,
     FamilyPhoto, PhotoTag, FamilyUpdate, UpdateComment, UpdateLike,
-    TreeInvitation, Update, FuzzyDate,
+    TreeInvitation, Update, FuzzyDate, MemberLineage, GedcomImport,
 )
 from .serializers import (
     TreeSerializer, TreePermissionSerializer,
@@ -33,8 +40,23 @@ from .serializers import (
     ChangeRequestSerializer, ChangeRequestValidatorSerializer,
     FamilyPhotoSerializer, PhotoTagSerializer,
     FamilyUpdateSerializer, UpdateCommentSerializer, UpdateLikeSerializer,
-    TreeInvitationSerializer, UpdateSerializer, FuzzyDateSerializer,
+    TreeInvitationSerializer, UpdateSerializer, LineageEntrySerializer,
+    GedcomImportSerializer, InlineFuzzyDateField,
 )
+from .access import accessible_tree_ids, resolve_tree_role
+from .graph import build_tree_graph
+from .lineage import LINEAGE_ORDERING, lineage_entries, set_parents, find_common_ancestors
+from .kinship import describe_kinship
+from .gedcom import iter_records, GedcomError
+from .export import EXPORT_FORMATS, export_tree
+from .bulk import MAX_ITEMS, bulk_write_members, bulk_write_relationships
+from .names import name_like_q
+from .dates import range_q
+from .duplicates import MIN_SCORE, find_duplicates
+from .merge import merge_members
+from .counters import remove_like
+from .tasks import import_gedcom_file
+from .search import search_backend, search_members
 
 
 # ---------------------------------------------------------------------------
@@ -42,14 +64,8 @@ from .serializers import (
 # ---------------------------------------------------------------------------
 
 def get_tree_role(user, tree):
-    """Return the user's active role on a tree, or None."""
-    if user.is_staff:
-        return 'owner'
-    try:
-        perm = TreePermission.objects.get(tree=tree, user=user, status='active')
-        return perm.role
-    except TreePermission.DoesNotExist:
-        return None
+    """Return the user's active role on a tree, or None (cached per request)."""
+    return resolve_tree_role(user, tree)
 
 
 def assert_tree_role(user, tree, allowed_roles, msg=None):
@@ -62,22 +78,90 @@ def assert_tree_role(user, tree, allowed_roles, msg=None):
     return role
 
 
+def _lineage_filters(request):
+    """Parse ?max_depth= and ?biological= for the ancestry actions."""
+    lookups = {}
+    max_depth = request.query_params.get('max_depth')
+    if max_depth:
+        try:
+            lookups['depth__lte'] = int(max_depth)
+        except ValueError:
+            raise ValidationError({'max_depth': 'Must be an integer.'})
+    if request.query_params.get('biological') == 'true':
+        lookups['via_biological'] = True
+    return lookups
+
+
 def accessible_trees_query(user):
-    """Q filter: trees the user can see."""
-    return (
-        Q(created_by=user) |
-        Q(permissions__user=user, permissions__status='active')
-    )
+    """Q filter: trees the user can see (one indexed TreeAccess subquery)."""
+    return Q(pk__in=accessible_tree_ids(user))
 
 
-# ---------------------------------------------------------------------------
-# FuzzyDate ViewSet
-# ---------------------------------------------------------------------------
+class MemberSearchFilter(filters.SearchFilter):
+    """
+    ?search= through the full-text index (tree/search.py), most relevant
+    first unless ?ordering= is given. Falls back to icontains over
+    ``search_fields`` on databases without an index.
+    """
 
-class FuzzyDateViewSet(viewsets.ModelViewSet):
-    queryset = FuzzyDate.objects.all()
-    serializer_class = FuzzyDateSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '')
+        if not term.strip() or not search_backend():
+            return super().filter_queryset(request, queryset, view)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            view.ordering = ['search_rank', 'pk']
+        return search_members(queryset, term)
+
+
+class MemberNameLikeFilter(filters.BaseFilterBackend):
+    """
+    ?name_like= — members whose first, last or maiden name matches every word
+    of the term by accent-insensitive prefix, transliteration or sound
+    (Double Metaphone / Soundex), through the indexed keys of tree/names.py.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        match = name_like_q(request.query_params.get('name_like', ''))
+        return queryset if match is None else queryset.filter(match)
+
+
+class MemberDateRangeFilter(filters.BaseFilterBackend):
+    """
+    ?born_after= / ?born_before= / ?born_overlaps= and the died_* equivalents
+    over the indexed day-number bounds of the inline dates (tree/dates.py).
+    """
+    params = (('born', 'birth_date_low', 'birth_date_high'), ('died', 'death_date_low', 'death_date_high'))
+
+    def filter_queryset(self, request, queryset, view):
+        for prefix, low, high in self.params:
+            try:
+                match = range_q(request.query_params, prefix, low, high)
+            except ValueError as exc:
+                raise ValidationError({prefix: str(exc)})
+            if match is not None:
+                queryset = queryset.filter(match)
+        return queryset
+
+
+class _ExportRenderer(renderers.BaseRenderer):
+    """
+    Lets ?format=gedcom|jsonl pass DRF content negotiation. Exports stream
+    past the renderer; only error payloads are rendered, as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class GedcomRenderer(_ExportRenderer):
+    media_type = 'text/x-gedcom'
+    format = 'gedcom'
+
+
+class JSONLinesRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
 
 
 # ---------------------------------------------------------------------------
@@ -89,17 +173,15 @@ class TreeViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'created_by__username']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'member_count']
+    ordering = ['name']
 
     def get_queryset(self):
         user = self.request.user
-        qs = Tree.objects.annotate(
-            member_count=Count('members', distinct=True),
-            relationship_count=Count('members__relationships_from', distinct=True),
-        )
+        qs = Tree.objects.select_related('created_by')
         if user.is_staff:
             return qs
-        return qs.filter(accessible_trees_query(user)).distinct()
+        return qs.filter(accessible_trees_query(user))
 
     def perform_create(self, serializer):
         tree = serializer.save(created_by=self.request.user)
@@ -127,9 +209,128 @@ class TreeViewSet(viewsets.ModelViewSet):
     def members(self, request, pk=None):
         """List all members in a tree."""
         tree = self.get_object()
-        members = FamilyMember.objects.filter(tree=tree).select_related('birth_date', 'death_date')
-        serializer = FamilyMemberSerializer(members, many=True, context={'request': request})
-        return Response(serializer.data)
+        members = MemberDateRangeFilter().filter_queryset(
+            request, FamilyMember.objects.filter(tree=tree), self
+        )
+        return paginated_response(
+            request, members, ['last_name', 'first_name', 'pk'], FamilyMemberSerializer
+        )
+
+    def _bulk_write(self, request, writer):
+        tree = self.get_object()
+        assert_tree_role(request.user, tree, ['owner', 'editor'])
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Send a non-empty JSON array of items.')
+        if len(items) > MAX_ITEMS:
+            raise ValidationError(f'At most {MAX_ITEMS} items per request.')
+        results, written = writer(tree, items, user=request.user)
+        if not written:
+            raise ValidationError({'results': results})
+        created = any(result['status'] == 'created' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=['post'], url_path='members/bulk')
+    def members_bulk(self, request, pk=None):
+        """
+        Create or update many members at once (JSON array; items with an "id"
+        are updates, dates inline as FuzzyDate objects). All or nothing.
+        """
+        return self._bulk_write(request, bulk_write_members)
+
+    @action(detail=True, methods=['post'], url_path='relationships/bulk')
+    def relationships_bulk(self, request, pk=None):
+        """Create or update many relationships within this tree. All or nothing."""
+        return self._bulk_write(request, bulk_write_relationships)
+
+    @action(detail=True, methods=['get'])
+    def graph(self, request, pk=None):
+        """
+        Compact render graph: parallel member columns plus parent/spouse/sibling
+        edge lists (positions into the member arrays). See tree/graph.py.
+        """
+        tree = self.get_object()
+        return Response(build_tree_graph(tree))
+
+    @action(detail=True, methods=['get'])
+    def duplicates(self, request, pk=None):
+        """
+        Likely duplicate people in this tree, best match first (see
+        tree/duplicates.py). Query params: ?min_score= (default and lowest
+        0.75, the floor the cached scan keeps), ?limit=. Cached until a member
+        or relationship of the tree changes.
+        """
+        tree = self.get_object()
+        assert_tree_role(request.user, tree, ['owner', 'editor', 'validator'])
+        try:
+            min_score = float(request.query_params.get('min_score', MIN_SCORE))
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            raise ValidationError('min_score must be a number and limit an integer.')
+        if min_score < MIN_SCORE:
+            raise ValidationError({'min_score': f'min_score cannot be below {MIN_SCORE}.'})
+        pairs = [pair for pair in find_duplicates(tree.pk) if pair['score'] >= min_score][:max(limit, 0)]
+        members = FamilyMember.objects.in_bulk({pk for pair in pairs for pk in pair['members']})
+        results = [
+            {**pair, 'members': FamilyMemberLightSerializer(
+                [members[pk] for pk in pair['members']], many=True
+            ).data}
+            for pair in pairs
+            if all(pk in members for pk in pair['members'])
+        ]
+        return Response({'count': len(results), 'results': results})
+
+    @action(detail=True, methods=['post'], url_path='import/gedcom')
+    def import_gedcom(self, request, pk=None):
+        """
+        Queue an uploaded GEDCOM file (multipart field ``file``) for import
+        into this tree by a background task. Owner/editor only. Returns 202
+        with the import's status resource; poll GET import/gedcom/<id>/.
+        """
+        tree = self.get_object()
+        assert_tree_role(request.user, tree, ['owner', 'editor'])
+        upload = request.FILES.get('file')
+        if not upload:
+            raise ValidationError({'file': 'Upload a GEDCOM file.'})
+        try:
+            next(iter_records(upload.readlines(1024)), None)  # reject non-GEDCOM early
+        except GedcomError as exc:
+            raise ValidationError({'file': str(exc)})
+        upload.seek(0)
+        job = GedcomImport.objects.create(tree=tree, created_by=request.user, file=upload)
+        import_gedcom_file.enqueue(job.pk, key=f'gedcom_import:{job.pk}')
+        return Response(GedcomImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], url_path=r'import/gedcom/(?P<import_pk>\d+)')
+    def gedcom_import_status(self, request, pk=None, import_pk=None):
+        """Status and running totals of one GEDCOM import into this tree. Owner/editor only."""
+        tree = self.get_object()
+        assert_tree_role(request.user, tree, ['owner', 'editor'])
+        job = GedcomImport.objects.filter(tree=tree, pk=import_pk).first()
+        if job is None:
+            raise NotFound('No such import.')
+        return Response(GedcomImportSerializer(job).data)
+
+    @action(detail=True, methods=['get'], renderer_classes=[
+        renderers.JSONRenderer, JSONLinesRenderer, GedcomRenderer,
+    ])
+    def export(self, request, pk=None):
+        """
+        Stream the whole tree as ?format=jsonl (default) or ?format=gedcom.
+        Owner only. Memory stays flat whatever the tree size (see tree/export.py).
+        """
+        tree = self.get_object()
+        assert_tree_role(request.user, tree, ['owner'], 'Only the owner can export this tree.')
+        fmt = request.query_params.get('format', 'jsonl')
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({'format': f'Choose from: {", ".join(EXPORT_FORMATS)}'})
+        content_type, extension = EXPORT_FORMATS[fmt]
+        response = StreamingHttpResponse(export_tree(tree, fmt), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tree-{tree.pk}.{extension}"'
+        return response
 
     @action(detail=True, methods=['get'])
     def permissions(self, request, pk=None):
@@ -137,7 +338,7 @@ class TreeViewSet(viewsets.ModelViewSet):
         tree = self.get_object()
         assert_tree_role(request.user, tree, ['owner', 'validator', 'editor'])
         perms = TreePermission.objects.filter(tree=tree).select_related('user')
-        return Response(TreePermissionSerializer(perms, many=True).data)
+        return paginated_response(request, perms, ['pk'], TreePermissionSerializer)
 
     @action(detail=True, methods=['post'], url_path='permissions/grant')
     def grant_permission(self, request, pk=None):
@@ -173,8 +374,7 @@ class TreeViewSet(viewsets.ModelViewSet):
         """Get the social feed updates for a tree."""
         tree = self.get_object()
         updates = FamilyUpdate.objects.filter(tree=tree).select_related('created_by')
-        serializer = FamilyUpdateSerializer(updates, many=True, context={'request': request})
-        return Response(serializer.data)
+        return paginated_response(request, updates, ['-created_at', '-pk'], FamilyUpdateSerializer)
 
     @action(detail=True, methods=['get'])
     def pending_changes(self, request, pk=None):
@@ -184,7 +384,7 @@ class TreeViewSet(viewsets.ModelViewSet):
         pending = ChangeRequest.objects.filter(
             member__tree=tree, status='pending'
         ).select_related('member', 'requested_by')
-        return Response(ChangeRequestSerializer(pending, many=True).data)
+        return paginated_response(request, pending, ['-created_at', '-pk'], ChangeRequestSerializer)
 
     @action(detail=True, methods=['patch'])
     def theme(self, request, pk=None):
@@ -237,9 +437,10 @@ class TreeViewSet(viewsets.ModelViewSet):
             if image.size > 2 * 1024 * 1024:
                 raise ValidationError('Crest image must be 2MB or smaller.')
 
-            # Delete old crest if one exists
+            # Delete the old crest from storage after commit, off the request path
             if tree.crest_image:
-                tree.crest_image.delete(save=False)
+                from .tasks import delete_crest_file
+                delete_crest_file.enqueue(tree.crest_image.name)
 
             tree.crest_image = image
 
@@ -268,21 +469,19 @@ class TreeViewSet(viewsets.ModelViewSet):
 class FamilyMemberViewSet(viewsets.ModelViewSet):
     serializer_class = FamilyMemberSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [
+        MemberNameLikeFilter, MemberDateRangeFilter, MemberSearchFilter, filters.OrderingFilter,
+    ]
     search_fields = ['first_name', 'last_name', 'nickname', 'biography', 'current_location']
-    ordering_fields = ['last_name', 'first_name', 'created_at']
+    ordering_fields = ['last_name', 'first_name', 'created_at', 'birth_date_low', 'death_date_low']
+    ordering = ['last_name', 'first_name']
 
     def get_queryset(self):
         user = self.request.user
-        qs = FamilyMember.objects.select_related(
-            'birth_date', 'death_date', 'tree', 'added_by', 'user_account'
-        )
+        qs = FamilyMember.objects.select_related('tree', 'added_by', 'user_account')
         if user.is_staff:
             return qs
-        return qs.filter(
-            Q(tree__created_by=user) |
-            Q(tree__permissions__user=user, tree__permissions__status='active')
-        ).distinct()
+        return qs.filter(tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         tree = serializer.validated_data.get('tree')
@@ -318,6 +517,95 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        """
+        All ancestors of this member from the lineage closure table.
+        Query params: ?max_depth=N (generations), ?biological=true
+        """
+        member = self.get_object()
+        qs = MemberLineage.objects.filter(descendant=member, **_lineage_filters(request))
+        return paginated_response(
+            request, lineage_entries(qs, 'ancestor'), LINEAGE_ORDERING, LineageEntrySerializer
+        )
+
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        """All descendants of this member. Same query params as ancestors."""
+        member = self.get_object()
+        qs = MemberLineage.objects.filter(ancestor=member, **_lineage_filters(request))
+        return paginated_response(
+            request, lineage_entries(qs, 'descendant'), LINEAGE_ORDERING, LineageEntrySerializer
+        )
+
+    def _other_member(self, member, other_pk):
+        """Fetch a second visible member from the same tree, for pairwise actions."""
+        other = self.get_queryset().filter(pk=other_pk).first()
+        if other is None:
+            raise NotFound('Member not found.')
+        if other.tree_id != member.tree_id:
+            raise ValidationError('Both members must belong to the same tree.')
+        return other
+
+    @action(detail=True, methods=['get'], url_path=r'kinship/(?P<other_pk>\d+)')
+    def kinship(self, request, pk=None, other_pk=None):
+        """
+        How is member {other_pk} related to this member?
+        Returns the shortest path and a label such as "second cousin once removed".
+        """
+        member = self.get_object()
+        other = self._other_member(member, other_pk)
+        result = describe_kinship(member.tree_id, member, other)
+
+        names = {
+            pk: FamilyMember.format_display_name(first, preferred, nickname, last)
+            for pk, first, preferred, nickname, last in FamilyMember.objects.filter(
+                pk__in=[step['id'] for step in result['path']]
+            ).values_list('pk', 'first_name', 'preferred_name', 'nickname', 'last_name')
+        }
+        for step in result['path']:
+            step['display_name'] = names.get(step['id'])
+        return Response({'from': member.pk, 'to': other.pk, **result})
+
+    @action(detail=True, methods=['get'], url_path=r'common-ancestors/(?P<other_pk>\d+)')
+    def common_ancestors(self, request, pk=None, other_pk=None):
+        """
+        Nearest common ancestors of this member and member {other_pk}, read from
+        the lineage closure table. ?biological=true ignores adoptive lines.
+        """
+        member = self.get_object()
+        other = self._other_member(member, other_pk)
+        entries = find_common_ancestors(
+            member, other, biological=request.query_params.get('biological') == 'true'
+        )
+        nearest = [
+            e for e in entries
+            if e['depth_a'] + e['depth_b'] == entries[0]['depth_a'] + entries[0]['depth_b']
+        ] if entries else []
+        return Response({
+            'from': member.pk,
+            'to': other.pk,
+            'nearest': nearest,
+            'common_ancestors': entries,
+        })
+
+    @action(detail=True, methods=['post'], url_path=r'merge/(?P<drop_pk>\d+)')
+    def merge(self, request, pk=None, drop_pk=None):
+        """
+        Merge member {drop_pk} into this one: every reference to it is moved
+        here, blank fields are filled from it, then it is deleted. Owner/editor
+        only; one transaction (see tree/merge.py).
+        """
+        member = self.get_object()
+        drop = self._other_member(member, drop_pk)
+        if not request.user.is_staff:
+            assert_tree_role(request.user, member.tree, ['owner', 'editor'])
+        try:
+            summary = merge_members(member, drop, user=request.user)
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+        return Response(summary)
+
     @action(detail=True, methods=['get'])
     def change_requests(self, request, pk=None):
         """Get all change requests for this member."""
@@ -325,7 +613,7 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
         requests = ChangeRequest.objects.filter(member=member).select_related(
             'requested_by', 'reviewed_by'
         )
-        return Response(ChangeRequestSerializer(requests, many=True).data)
+        return paginated_response(request, requests, ['-created_at', '-pk'], ChangeRequestSerializer)
 
     @action(detail=True, methods=['post'], url_path='propose-change')
     def propose_change(self, request, pk=None):
@@ -357,9 +645,18 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
         else:
             category = 'standard'
 
+        # Dates are stored as their values ({date, precision, bce, display_text})
+        if field_name in ('birth_date', 'death_date'):
+            try:
+                new_value = InlineFuzzyDateField().run_validation(new_value).as_value()
+            except ValidationError as exc:
+                raise ValidationError({'new_value': exc.detail})
+
         # BUG #8 FIX: store proper JSON-serialisable value, not str()
         old_raw = getattr(member, field_name, None)
-        if hasattr(old_raw, 'pk'):
+        if isinstance(old_raw, FuzzyDate):
+            old_value = old_raw.as_value()  # inline date — store its values
+        elif hasattr(old_raw, 'pk'):
             old_value = old_raw.pk          # FK — store PK as int
         elif old_raw is None:
             old_value = None                # JSON null, not the string "None"
@@ -431,7 +728,7 @@ class FamilyMemberViewSet(viewsets.ModelViewSet):
         validators = ChangeRequestValidator.objects.filter(
             member=member, is_active=True
         ).select_related('validator')
-        return Response(ChangeRequestValidatorSerializer(validators, many=True).data)
+        return paginated_response(request, validators, ['pk'], ChangeRequestValidatorSerializer)
 
 
 # ---------------------------------------------------------------------------
@@ -442,17 +739,14 @@ class FamilyRelationshipViewSet(viewsets.ModelViewSet):
     serializer_class = FamilyRelationshipSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    ordering = ['pk']
 
     def get_queryset(self):
         user = self.request.user
         qs = FamilyRelationship.objects.select_related('from_member', 'to_member')
         if user.is_staff:
             return qs
-        return qs.filter(
-            Q(from_member__tree__created_by=user) |
-            Q(from_member__tree__permissions__user=user,
-              from_member__tree__permissions__status='active')
-        ).distinct()
+        return qs.filter(from_member__tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         from_member = serializer.validated_data.get('from_member')
@@ -476,6 +770,7 @@ class ChangeRequestViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['field_name', 'member__first_name', 'member__last_name']
     ordering_fields = ['created_at', 'status']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         user = self.request.user
@@ -485,10 +780,8 @@ class ChangeRequestViewSet(viewsets.ModelViewSet):
         # Show: requests the user submitted OR requests the user can validate
         return qs.filter(
             Q(requested_by=user) |
-            Q(member__tree__permissions__user=user,
-              member__tree__permissions__role__in=['owner', 'validator'],
-              member__tree__permissions__status='active')
-        ).distinct()
+            Q(member__tree_id__in=accessible_tree_ids(user, ['owner', 'validator']))
+        )
 
     def perform_create(self, serializer):
         # BUG #9 FIX: verify the requester can access this member's tree
@@ -561,6 +854,7 @@ class ChangeRequestViewSet(viewsets.ModelViewSet):
 class ChangeRequestValidatorViewSet(viewsets.ModelViewSet):
     serializer_class = ChangeRequestValidatorSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['pk']
 
     def get_queryset(self):
         user = self.request.user
@@ -569,10 +863,8 @@ class ChangeRequestValidatorViewSet(viewsets.ModelViewSet):
             return qs
         return qs.filter(
             Q(validator=user) |
-            Q(member__tree__permissions__user=user,
-              member__tree__permissions__role='owner',
-              member__tree__permissions__status='active')
-        ).distinct()
+            Q(member__tree_id__in=accessible_tree_ids(user, ['owner']))
+        )
 
     def perform_create(self, serializer):
         member = serializer.validated_data.get('member')
@@ -590,16 +882,14 @@ class FamilyPhotoViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'location_taken']
     ordering_fields = ['uploaded_at', 'date_taken']
+    ordering = ['-uploaded_at']
 
     def get_queryset(self):
         user = self.request.user
         qs = FamilyPhoto.objects.prefetch_related('tags').select_related('uploaded_by')
         if user.is_staff:
             return qs
-        return qs.filter(
-            Q(tree__created_by=user) |
-            Q(tree__permissions__user=user, tree__permissions__status='active')
-        ).distinct()
+        return qs.filter(tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         tree = serializer.validated_data.get('tree')
@@ -626,16 +916,14 @@ class FamilyUpdateViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'content']
     ordering_fields = ['created_at', 'likes_count']
+    ordering = ['-created_at']
 
     def get_queryset(self):
         user = self.request.user
         qs = FamilyUpdate.objects.prefetch_related('comments', 'related_members')
         if user.is_staff:
             return qs
-        return qs.filter(
-            Q(tree__created_by=user) |
-            Q(tree__permissions__user=user, tree__permissions__status='active')
-        ).distinct()
+        return qs.filter(tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         tree = serializer.validated_data.get('tree')
@@ -644,16 +932,15 @@ class FamilyUpdateViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
+        """
+        Toggle the user's like. likes_count comes back from the counter's own
+        UPDATE … RETURNING (set on the like by the signal), not a re-count.
+        """
         update = self.get_object()
         like, created = UpdateLike.objects.get_or_create(update=update, user=request.user)
         if not created:
-            like.delete()
-            # BUG #2/#18 FIX: fresh count from DB, not stale update object
-            fresh_count = UpdateLike.objects.filter(update=update).count()
-            return Response({'liked': False, 'likes_count': fresh_count})
-        fresh_count = UpdateLike.objects.filter(update=update).count()
-        return Response({'liked': True, 'likes_count': fresh_count}, status=status.HTTP_201_CREATED)
-
+            return Response({'liked': False, 'likes_count': remove_like(like)})
+        return Response({'liked': True, 'likes_count': like.likes_count}, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
     def comment(self, request, pk=None):
@@ -670,7 +957,7 @@ class FamilyUpdateViewSet(viewsets.ModelViewSet):
     def comments(self, request, pk=None):
         update = self.get_object()
         comments = UpdateComment.objects.filter(update=update).select_related('author')
-        return Response(UpdateCommentSerializer(comments, many=True).data)
+        return paginated_response(request, comments, ['created_at', 'pk'], UpdateCommentSerializer)
 
 
 # ---------------------------------------------------------------------------
@@ -680,6 +967,7 @@ class FamilyUpdateViewSet(viewsets.ModelViewSet):
 class TreeInvitationViewSet(viewsets.ModelViewSet):
     serializer_class = TreeInvitationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['-pk']
 
     def get_queryset(self):
         user = self.request.user
@@ -688,10 +976,8 @@ class TreeInvitationViewSet(viewsets.ModelViewSet):
             return qs
         return qs.filter(
             Q(invited_by=user) |
-            Q(tree__permissions__user=user,
-              tree__permissions__role='owner',
-              tree__permissions__status='active')
-        ).distinct()
+            Q(tree_id__in=accessible_tree_ids(user, ['owner']))
+        )
 
     def perform_create(self, serializer):
         tree = serializer.validated_data.get('tree')
@@ -764,16 +1050,13 @@ class UpdateViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['content', 'member__first_name', 'member__last_name']
     ordering_fields = ['timestamp']
+    ordering = ['-timestamp']
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return super().get_queryset()
-        return Update.objects.filter(
-            Q(member__tree__created_by=user) |
-            Q(member__tree__permissions__user=user,
-              member__tree__permissions__status='active')
-        ).distinct()
+        return Update.objects.filter(member__tree_id__in=accessible_tree_ids(user))
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -785,13 +1068,13 @@ class UpdateViewSet(viewsets.ModelViewSet):
 
 def _apply_change(member, field_name, new_value):
     """Apply an approved change to a FamilyMember field."""
-    # Handle ForeignKey date fields specially
+    # Parent links live in FamilyRelationship (the closure follows via signals)
+    if field_name == 'parent_ids':
+        set_parents(member, new_value or [])
+        return
+    # Dates are stored inline; new_value is the date's values or None
     if field_name in ('birth_date', 'death_date'):
-        # new_value should be a FuzzyDate pk or None
-        if new_value is None:
-            setattr(member, field_name + '_id', None)
-        else:
-            setattr(member, field_name + '_id', int(new_value))
+        setattr(member, field_name, FuzzyDate(**new_value) if new_value else None)
         # BUG #4 FIX: is_alive sync was inside wrong branch — moved here
         if field_name == 'death_date':
             member.is_alive = (new_value is None)
@@ -840,71 +1123,43 @@ def _assert_can_review(user, cr):
 
 def _notify_pending_change(cr):
     """Notify tree validators and owner about a new pending change request."""
-    from notifications.models import Notification
-    tree = cr.member.tree
-
-    # Notify all owners and validators
-    validators = TreePermission.objects.filter(
-        tree=tree,
+    from notifications.service import notify_many
+    tree_id = cr.member.tree_id
+    reviewers = TreePermission.objects.filter(
+        tree_id=tree_id,
         role__in=['owner', 'validator'],
         status='active',
-    ).select_related('user')
-
-    for perm in validators:
-        if perm.user == cr.requested_by:
-            continue
-        Notification.objects.create(
-            recipient=perm.user,
-            event_type='change_needs_review',
-            channel='in_app',
-            title=f'Change Request: {cr.field_name}',
-            body=(
-                f'{cr.requested_by.username} proposed a change to '
-                f'{cr.member.display_name}\'s {cr.field_name}.'
-            ),
-            related_member=cr.member,
-            related_tree=tree,
-            related_change_request=cr,
-            action_url=f'/trees/{tree.pk}/changes/{cr.pk}',
-            status='sent',
-            sent_at=timezone.now(),
-        )
+    ).exclude(user_id=cr.requested_by_id).values_list('user_id', flat=True)
+
+    notify_many(
+        'change_needs_review', reviewers,
+        {'requester': cr.requested_by.username, 'member': cr.member.display_name,
+         'field': cr.field_name},
+        related={'member': cr.member, 'tree': tree_id, 'change_request': cr},
+        action_url=f'/trees/{tree_id}/changes/{cr.pk}',
+        key=f'change_needs_review:{cr.pk}',
+    )
 
 
 def _notify_change_approved(cr):
     """Notify the requester that their change was approved."""
-    from notifications.models import Notification
-    Notification.objects.create(
-        recipient=cr.requested_by,
-        event_type='change_approved',
-        channel='in_app',
-        title='Change Approved',
-        body=f'Your change to {cr.member.display_name}\'s {cr.field_name} has been approved.',
-        related_member=cr.member,
-        related_tree=cr.member.tree,
-        related_change_request=cr,
-        action_url=f'/members/{cr.member.pk}',
-        status='sent',
-        sent_at=timezone.now(),
+    from notifications.service import notify_many
+    notify_many(
+        'change_approved', [cr.requested_by_id],
+        {'member': cr.member.display_name, 'field': cr.field_name},
+        related={'member': cr.member, 'tree': cr.member.tree_id, 'change_request': cr},
+        action_url=f'/members/{cr.member_id}',
+        key=f'change_approved:{cr.pk}',
     )
 
 
 def _notify_change_rejected(cr):
     """Notify the requester that their change was rejected."""
-    from notifications.models import Notification
-    Notification.objects.create(
-        recipient=cr.requested_by,
-        event_type='change_rejected',
-        channel='in_app',
-        title='Change Rejected',
-        body=(
-            f'Your change to {cr.member.display_name}\'s {cr.field_name} was rejected. '
-            f'Reason: {cr.review_notes}'
-        ),
-        related_member=cr.member,
-        related_tree=cr.member.tree,
-        related_change_request=cr,
-        action_url=f'/trees/{cr.member.tree.pk}/changes/{cr.pk}',
-        status='sent',
-        sent_at=timezone.now(),
+    from notifications.service import notify_many
+    notify_many(
+        'change_rejected', [cr.requested_by_id],
+        {'member': cr.member.display_name, 'field': cr.field_name, 'reason': cr.review_notes},
+        related={'member': cr.member, 'tree': cr.member.tree_id, 'change_request': cr},
+        action_url=f'/trees/{cr.member.tree_id}/changes/{cr.pk}',
+        key=f'change_rejected:{cr.pk}',
     )
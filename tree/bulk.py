@@ -0,0 +1,256 @@
+"""
+tree/bulk.py — Bulk member and relationship writes
+
+A batch is validated in one pass: item serializers that need no queries,
+then one query per batch for ids, tree membership and uniqueness. If every
+item is valid the batch is written in one transaction with bulk_create /
+bulk_update; otherwise nothing is written. The per-row signals those calls
+skip are replaced by their batch equivalents — one counter bump, one lineage
+refresh, one search-index refresh, one cache version bump and one
+notification per batch. Name keys (tree/names.py) are filled in before the
+insert, as FamilyMember.save() would.
+
+Both writers return ``(results, written)``, with one result per item in
+request order: {'index', 'status': 'created'|'updated'|'valid'|'invalid',
+'id' or 'errors'}.
+"""
+
+from django.db import transaction
+
+from .models import FuzzyDate, FamilyMember, FamilyRelationship, MemberPrivacySettings
+from .names import KEY_FIELDS, NAME_FIELDS, set_name_keys
+from .serializers import BulkFamilyMemberSerializer, BulkFamilyRelationshipSerializer
+
+MAX_ITEMS = 500
+
+DATE_FIELDS = ('birth_date', 'death_date')
+
+
+def _validate(items, serializer_class):
+    """[validated data or None, errors] per item; items with an id validate partially."""
+    checked = []
+    for item in items:
+        partial = isinstance(item, dict) and 'id' in item
+        serializer = serializer_class(data=item, partial=partial)
+        if serializer.is_valid():
+            checked.append([dict(serializer.validated_data), {}])
+        else:
+            checked.append([None, dict(serializer.errors)])
+    return checked
+
+
+def _fail(entry, field, message):
+    entry[1].setdefault(field, []).append(message)
+
+
+def _outcome(checked):
+    """Results for a batch that did not validate."""
+    return [
+        {'index': i, 'status': 'invalid', 'errors': errors} if errors else {'index': i, 'status': 'valid'}
+        for i, (_, errors) in enumerate(checked)
+    ], False
+
+
+def _existing(queryset, checked):
+    """{pk: instance} for the ids the items want to update (one query)."""
+    ids = {data['id'] for data, errors in checked if not errors and 'id' in data}
+    found = queryset.in_bulk(ids) if ids else {}
+    for entry in checked:
+        data, errors = entry
+        if not errors and 'id' in data and data['id'] not in found:
+            _fail(entry, 'id', 'Not found in this tree.')
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Members
+# ---------------------------------------------------------------------------
+
+def bulk_write_members(tree, items, user=None):
+    """Create (no id) or update (with id) members of ``tree``."""
+    checked = _validate(items, BulkFamilyMemberSerializer)
+    existing = _existing(FamilyMember.objects.filter(tree=tree), checked)
+    for entry in checked:
+        data, errors = entry
+        if not errors and 'id' not in data:
+            for field in ('first_name', 'last_name'):
+                if not data.get(field):
+                    _fail(entry, field, 'This field is required.')
+    if any(errors for _, errors in checked):
+        return _outcome(checked)
+
+    with transaction.atomic():
+        results = _write_members(tree, [data for data, _ in checked], existing, user)
+    return results, True
+
+
+def _date_columns(field):
+    """FamilyMember columns holding the inline date ``field`` ('birth_date' / 'death_date')."""
+    side = field.split('_')[0]
+    return [f'{side}_date_{column}' for column in FamilyMember.DATE_COLUMNS] + [
+        f'{side}_{column}' for column in FamilyMember.DERIVED_DATE_COLUMNS
+    ]
+
+
+def _write_members(tree, items, existing, user):
+    from django.utils import timezone
+    from .cache import bump_tree_version
+    from .counters import bump_tree_counters
+    from .search import index_members
+    from notifications.service import message, send
+
+    members, statuses = [], []
+    updated_fields, old_alive = set(), {}
+    for data in items:
+        dates = {field: data.pop(field) for field in DATE_FIELDS if field in data}
+        member_id = data.pop('id', None)
+        if member_id is None:
+            member = FamilyMember(tree=tree, added_by=user, **data)
+            statuses.append('created')
+        else:
+            member = existing[member_id]
+            old_alive[member.pk] = member.is_alive
+            member.updated_at = timezone.now()  # bulk_update skips auto_now
+            statuses.append('updated')
+            for field, value in data.items():
+                setattr(member, field, value)
+            updated_fields.update(data)
+        for field, value in dates.items():
+            # Dates are inline columns; a partial date updates the current one
+            current = getattr(member, field) if member.pk else None
+            if value is not None and current is not None:
+                for key, item in value.items():
+                    setattr(current, key, item)
+                value = current
+            setattr(member, field, FuzzyDate(**value) if isinstance(value, dict) else value)
+            updated_fields.update(_date_columns(field))
+        set_name_keys(member)
+        members.append(member)
+
+    created = [m for m in members if m.pk is None]
+    updated = [m for m in members if m.pk is not None]
+    FamilyMember.objects.bulk_create(created)
+    MemberPrivacySettings.objects.bulk_create(
+        [MemberPrivacySettings(member_id=m.pk) for m in created]
+    )
+    if updated_fields & set(NAME_FIELDS):
+        updated_fields.update(KEY_FIELDS)
+    if updated and updated_fields:
+        FamilyMember.objects.bulk_update(updated, sorted(updated_fields | {'updated_at'}))
+
+    living_delta = sum(m.is_alive for m in created) + sum(
+        int(m.is_alive) - int(old_alive[m.pk]) for m in updated
+    )
+    bump_tree_counters(tree.pk, member_count=len(created), living_count=living_delta)
+    index_members([m.pk for m in members])
+    bump_tree_version(tree.pk, scope='members')
+
+    # The same notifications the per-row signals send, once per batch
+    messages = []
+    if created and getattr(user, 'pk', None) != tree.created_by_id:
+        messages.append(message(
+            'new_member', [tree.created_by_id], {'count': len(created), 'tree': tree.name},
+            template=('👶 New members added', '{count} members have been added to "{tree}".'),
+            related={'tree': tree}, action_url=f'/trees/{tree.pk}',
+        ))
+    for m in updated:
+        if old_alive[m.pk] and not m.is_alive:
+            messages.append(message(
+                'death_recorded', [tree.created_by_id],
+                {'member': m.display_name, 'tree': tree.name},
+                related={'member': m, 'tree': tree}, action_url=f'/members/{m.pk}',
+            ))
+    send(messages)
+
+    return [
+        {'index': i, 'status': result, 'id': m.pk}
+        for i, (m, result) in enumerate(zip(members, statuses))
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Relationships
+# ---------------------------------------------------------------------------
+
+def bulk_write_relationships(tree, items, user=None):
+    """Create (no id) or update (with id) relationships between members of ``tree``."""
+    checked = _validate(items, BulkFamilyRelationshipSerializer)
+    existing = _existing(FamilyRelationship.objects.filter(from_member__tree=tree), checked)
+
+    # Resolve every item to its final endpoints and type
+    finals = {}
+    for i, (data, errors) in enumerate(checked):
+        if errors:
+            continue
+        current = existing.get(data.get('id'))
+        finals[i] = tuple(
+            data[field] if field in data else getattr(current, field)
+            for field in ('from_member_id', 'to_member_id', 'relationship_type')
+        )
+
+    member_ids = {pk for from_id, to_id, _ in finals.values() for pk in (from_id, to_id)}
+    in_tree = set(
+        FamilyMember.objects.filter(tree=tree, pk__in=member_ids).values_list('pk', flat=True)
+    )
+    taken = {
+        (from_id, to_id, rel_type): pk
+        for from_id, to_id, rel_type, pk in FamilyRelationship.objects.filter(
+            from_member_id__in={key[0] for key in finals.values()},
+            to_member_id__in={key[1] for key in finals.values()},
+        ).values_list('from_member_id', 'to_member_id', 'relationship_type', 'pk')
+    }
+    claimed = {}
+    for i, key in finals.items():
+        entry, (from_id, to_id, _) = checked[i], key
+        if from_id not in in_tree or to_id not in in_tree:
+            _fail(entry, 'non_field_errors', 'Both members must belong to this tree.')
+        elif from_id == to_id:
+            _fail(entry, 'non_field_errors', 'A member cannot be related to themselves.')
+        elif taken.get(key, entry[0].get('id')) != entry[0].get('id') or key in claimed:
+            _fail(entry, 'non_field_errors', 'This relationship already exists.')
+        claimed[key] = i
+    if any(errors for _, errors in checked):
+        return _outcome(checked)
+
+    with transaction.atomic():
+        results = _write_relationships(tree, [data for data, _ in checked], existing, user)
+    return results, True
+
+
+def _write_relationships(tree, items, existing, user):
+    from .cache import bump_tree_version
+    from .counters import bump_tree_counters
+    from .lineage import link_child, refresh_lineage
+
+    relationships, statuses, updated_fields, lineage_members = [], [], set(), set()
+    for data in items:
+        rel_id = data.pop('id', None)
+        if rel_id is None:
+            rel = FamilyRelationship(created_by=user, **data)
+            statuses.append('created')
+        else:
+            rel = existing[rel_id]
+            statuses.append('updated')
+            lineage_members.add(link_child(rel.relationship_type, rel.from_member_id, rel.to_member_id))
+            for field, value in data.items():
+                setattr(rel, field, value)
+            updated_fields.update(data)
+        lineage_members.add(link_child(rel.relationship_type, rel.from_member_id, rel.to_member_id))
+        relationships.append(rel)
+    lineage_members.discard(None)
+
+    created = [r for r in relationships if r.pk is None]
+    updated = [r for r in relationships if r.pk is not None]
+    FamilyRelationship.objects.bulk_create(created)
+    if updated and updated_fields:
+        FamilyRelationship.objects.bulk_update(updated, sorted(updated_fields))
+
+    bump_tree_counters(tree.pk, relationship_count=len(created))
+    bump_tree_version(tree.pk)
+    if lineage_members:
+        refresh_lineage(tree.pk, lineage_members)
+
+    return [
+        {'index': i, 'status': result, 'id': r.pk}
+        for i, (r, result) in enumerate(zip(relationships, statuses))
+    ]
@@ -0,0 +1,58 @@
+"""
+tree/cache.py — Versioned per-tree cache keys
+
+Derived structures (kinship index, duplicate scans, …) are cached under a
+key that embeds a per-tree version number. Bumping the version when the
+underlying rows change makes every old entry unreachable at once, without
+having to know which keys exist.
+
+Versions live in the default cache, which must be shared by every web and
+task process (settings.CACHES: Redis unless DEBUG) — with a per-process
+cache, other workers would keep serving entries until they expire.
+"""
+
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(tree_id, scope):
+    return f'tree:{tree_id}:{scope}:version'
+
+
+def tree_version(tree_id, scope='graph'):
+    """Current version for a tree/scope; seeded from the clock if missing."""
+    key = _version_key(tree_id, scope)
+    version = cache.get(key)
+    if version is None:
+        # A clock seed means an evicted counter can never reuse an old number
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_tree_version(tree_id, scope='graph'):
+    """
+    Invalidate every cached entry for this tree/scope: now, so the writing
+    transaction itself reads fresh data, and again once it commits, since a
+    concurrent request may have cached the pre-commit rows under the new
+    version in between.
+    """
+    key = _version_key(tree_id, scope)
+    _bump(key)
+    transaction.on_commit(partial(_bump, key))
+
+
+def tree_cache_key(tree_id, name, scope='graph'):
+    return f'tree:{tree_id}:{scope}:{tree_version(tree_id, scope)}:{name}'
@@ -0,0 +1,162 @@
+"""
+tree/counters.py — Denormalized counters
+
+Tree.member_count, living_count, relationship_count and photo_count, and
+FamilyUpdate.likes_count / comments_count, are adjusted in place with
+single UPDATE statements from the model signals, so neither listing trees
+nor liking a post ever counts rows; the like toggle's unlike goes through
+remove_like, which decrements only when its DELETE removed the row. Paths
+that skip signals (bulk_create, queryset.update) leave drift that
+reconcile_tree_counters and reconcile_update_counters correct from grouped
+counts. Full saves of a Tree or FamilyUpdate leave the counter columns out
+(without_counters), so an instance loaded before a bump never writes a
+stale count back.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+COUNTER_FIELDS = ('member_count', 'living_count', 'relationship_count', 'photo_count')
+UPDATE_COUNTER_FIELDS = ('likes_count', 'comments_count')
+
+
+def without_counters(instance, counters, kwargs):
+    """
+    ``save()`` kwargs that update every concrete field of an existing row
+    except ``counters``. Inserts and saves naming update_fields are left as
+    they are.
+    """
+    if instance._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+        return kwargs
+    return {**kwargs, 'update_fields': [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counters
+    ]}
+
+
+def bump_tree_counters(tree_id, **deltas):
+    """Atomically add ``deltas`` (e.g. member_count=1) to a tree's counters."""
+    from .models import Tree
+    changes = {
+        field: Greatest(F(field) + delta, 0)  # never underflow if out of sync
+        for field, delta in deltas.items() if delta
+    }
+    if tree_id and changes:
+        Tree.objects.filter(pk=tree_id).update(**changes)
+
+
+def bump_counter(model, pk, field, delta):
+    """
+    ``field = max(field + delta, 0)`` for one row in a single UPDATE, and
+    return the new value. Uses UPDATE … RETURNING where the backend has it,
+    so concurrent bumps never read each other's intermediate state.
+    """
+    # MariaDB can RETURN from INSERT but not UPDATE, hence the vendor check.
+    if connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_rows_from_bulk_insert:
+        qn = connection.ops.quote_name
+        meta = model._meta
+        column = qn(meta.get_field(field).column)
+        sql = (
+            f'UPDATE {qn(meta.db_table)} '
+            f'SET {column} = CASE WHEN {column} + %s < 0 THEN 0 ELSE {column} + %s END '
+            f'WHERE {qn(meta.pk.column)} = %s RETURNING {column}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [delta, delta, pk])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    rows = model.objects.filter(pk=pk)
+    rows.update(**{field: Greatest(F(field) + delta, 0)})
+    return rows.values_list(field, flat=True).first()
+
+
+def remove_like(like):
+    """
+    Delete ``like`` and return the post's likes_count. The row goes in one
+    direct DELETE, without the post_delete signal, and the counter drops only
+    if that DELETE removed it: two concurrent unlikes of the same like both
+    get here, but only one of them counts.
+    """
+    from .models import FamilyUpdate, UpdateLike
+    with transaction.atomic():
+        rows = UpdateLike.objects.filter(pk=like.pk)
+        if rows._raw_delete(rows.db):
+            return bump_counter(FamilyUpdate, like.update_id, 'likes_count', -1)
+    return FamilyUpdate.objects.values_list('likes_count', flat=True).get(pk=like.update_id)
+
+
+def _grouped(queryset, tree_field, **extra):
+    return {
+        row[tree_field]: row
+        for row in queryset.values(tree_field).annotate(n=Count('pk'), **extra)
+    }
+
+
+def reconcile_tree_counters(tree_ids=None):
+    """
+    Recompute the counters of ``tree_ids`` (default: every tree) with one
+    grouped query per counter. Returns the number of trees whose stored
+    values were wrong.
+    """
+    from .models import Tree, FamilyMember, FamilyRelationship, FamilyPhoto
+    trees = Tree.objects.all()
+    members = FamilyMember.objects.all()
+    relationships = FamilyRelationship.objects.all()
+    photos = FamilyPhoto.objects.all()
+    if tree_ids is not None:
+        trees = trees.filter(pk__in=tree_ids)
+        members = members.filter(tree_id__in=tree_ids)
+        relationships = relationships.filter(from_member__tree_id__in=tree_ids)
+        photos = photos.filter(tree_id__in=tree_ids)
+
+    member_rows = _grouped(members, 'tree_id', living=Count('pk', filter=Q(is_alive=True)))
+    relationship_rows = _grouped(relationships, 'from_member__tree_id')
+    photo_rows = _grouped(photos, 'tree_id')
+
+    stale = []
+    for tree in trees.only('pk', *COUNTER_FIELDS):
+        member_row = member_rows.get(tree.pk, {})
+        actual = {
+            'member_count': member_row.get('n', 0),
+            'living_count': member_row.get('living', 0),
+            'relationship_count': relationship_rows.get(tree.pk, {}).get('n', 0),
+            'photo_count': photo_rows.get(tree.pk, {}).get('n', 0),
+        }
+        if any(getattr(tree, field) != value for field, value in actual.items()):
+            for field, value in actual.items():
+                setattr(tree, field, value)
+            stale.append(tree)
+    Tree.objects.bulk_update(stale, COUNTER_FIELDS, batch_size=500)
+    return len(stale)
+
+
+def _row_count(queryset, fk):
+    return Coalesce(Subquery(
+        queryset.filter(**{fk: OuterRef('pk')}).order_by()
+        .values(fk).annotate(n=Count('pk')).values('n')
+    ), Value(0))
+
+
+def reconcile_update_counters(tree_ids=None):
+    """
+    Recompute FamilyUpdate.likes_count and comments_count where they have
+    drifted. Returns the number of posts corrected.
+    """
+    from .models import FamilyUpdate, UpdateLike, UpdateComment
+    updates = FamilyUpdate.objects.all()
+    if tree_ids is not None:
+        updates = updates.filter(tree_id__in=tree_ids)
+    stale = list(
+        updates.annotate(
+            actual_likes=_row_count(UpdateLike.objects, 'update_id'),
+            actual_comments=_row_count(UpdateComment.objects, 'update_id'),
+        ).exclude(
+            likes_count=F('actual_likes'), comments_count=F('actual_comments'),
+        ).only('pk', 'likes_count', 'comments_count')
+    )
+    for update in stale:
+        update.likes_count, update.comments_count = update.actual_likes, update.actual_comments
+    FamilyUpdate.objects.bulk_update(stale, UPDATE_COUNTER_FIELDS, batch_size=500)
+    return len(stale)
@@ -0,0 +1,147 @@
+"""
+tree/dates.py — Sortable day numbers for fuzzy genealogical dates
+
+A fuzzy date (date + precision + BCE flag) is turned into the range of day
+numbers it may stand for: 'year' covers the whole year, 'decade' ten years,
+'approximate' a few years either side, 'before'/'after' are open on one
+side. Day numbers are proleptic Gregorian ordinals (1 = 1 January 1 CE);
+BCE days are zero or negative, so one integer column sorts and range-scans
+across the era boundary. Open sides are stored as MIN_DAY / MAX_DAY rather
+than NULL, so every dated row has both bounds and range filters
+(range_q(), for ?born_after= and friends) are plain index range scans;
+NULL bounds only mean "no date".
+"""
+
+import calendar
+import datetime
+import re
+
+from django.db.models import DateField, Q
+
+# Years either side of an 'approximate' date
+APPROXIMATE_YEARS = 5
+
+_DAYS_BEFORE_CE = 366  # one slot per day of year, BCE years stacked below day 1
+
+# Bounds of an open 'before' / 'after' range (32-bit integer column)
+MIN_DAY = -(2 ** 31 - 1)
+MAX_DAY = 2 ** 31 - 1
+
+# Query bound: "1900", "1900-05", "1900-05-17", "-44" or "44 BCE"
+BOUND_RE = re.compile(r'^(-)?(\d{1,4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?(\s*BCE)?$', re.IGNORECASE)
+
+
+def day_number(year, month=1, day=1, bce=False):
+    """Day number of a calendar day; BCE years count back from 1 BCE."""
+    if not bce:
+        return datetime.date(min(year, datetime.MAXYEAR), month, day).toordinal()
+    day_of_year = datetime.date(2000, month, day).timetuple().tm_yday - 1  # leap-safe
+    return day_of_year - year * _DAYS_BEFORE_CE
+
+
+def _year_bounds(year, bce):
+    """First and last day numbers of a year given as (year, bce)."""
+    return day_number(year, 1, 1, bce), day_number(year, 12, 31, bce)
+
+
+def _decade(year, bce):
+    """
+    First and last (year, bce) of the decade holding a year. BCE decades run
+    10–1 BCE, 20–11 BCE, …, CE decades 1–9, 10–19, …: none spans year 0.
+    """
+    if bce:
+        start = -(-year // 10) * 10
+        return (start, True), (start - 9, True)
+    return (max(year - year % 10, 1), False), (year - year % 10 + 9, False)
+
+
+def _shift(year, bce, years):
+    """Move a (year, bce) pair by ``years`` across the era boundary (no year 0)."""
+    signed = (1 - year if bce else year) + years
+    return (1 - signed, True) if signed < 1 else (signed, False)
+
+
+def fuzzy_range(value, precision, bce=False):
+    """
+    (earliest, latest) day numbers for a fuzzy date; MIN_DAY / MAX_DAY on an
+    open side, (None, None) when unknown.
+    """
+    if value is None or precision in ('', 'unknown'):
+        return None, None
+    value = DateField().to_python(value)  # ISO strings from unsaved instances and payloads
+    year, month, day = value.year, value.month, value.day
+    if precision == 'exact':
+        point = day_number(year, month, day, bce)
+        return point, point
+    if precision == 'month_year':
+        last = calendar.monthrange(2000 if bce else year, month)[1]
+        return day_number(year, month, 1, bce), day_number(year, month, last, bce)
+    if precision == 'decade':
+        start, end = _decade(year, bce)
+        return _year_bounds(*start)[0], _year_bounds(*end)[1]
+    if precision == 'approximate':
+        low = _year_bounds(*_shift(year, bce, -APPROXIMATE_YEARS))[0]
+        return low, _year_bounds(*_shift(year, bce, APPROXIMATE_YEARS))[1]
+    if precision == 'before':
+        return MIN_DAY, day_number(year, month, day, bce)
+    if precision == 'after':
+        return day_number(year, month, day, bce), MAX_DAY
+    return _year_bounds(year, bce)  # 'year'
+
+
+def anniversary(value, precision):
+    """(month, day) usable for anniversaries; parts the precision does not give are None."""
+    if value is None or precision not in ('exact', 'month_year'):
+        return None, None
+    value = DateField().to_python(value)
+    return value.month, value.day if precision == 'exact' else None
+
+
+def parse_bound(text, end=False):
+    """
+    Day number of a query bound: the first day of the year, month or day
+    it names, or the last day when ``end``. Raises ValueError.
+    """
+    match = BOUND_RE.match(text.strip())
+    if not match:
+        raise ValueError(f'Invalid date "{text}"; use YYYY, YYYY-MM, YYYY-MM-DD or -YYYY for BCE.')
+    minus, year, month, day, suffix = match.groups()
+    year, bce = int(year), bool(minus or suffix)
+    if year < 1:
+        raise ValueError(f'Invalid year in "{text}".')
+    try:
+        if month is None:
+            return _year_bounds(year, bce)[1 if end else 0]
+        month = int(month)
+        if day is None:
+            last = calendar.monthrange(2000 if bce else year, month)[1]
+            return day_number(year, month, last if end else 1, bce)
+        return day_number(year, month, int(day), bce)
+    except ValueError:
+        raise ValueError(f'Invalid date "{text}".') from None
+
+
+def range_q(params, prefix, low, high):
+    """
+    Filter on the ``low``/``high`` day-number columns from query parameters:
+    - ``{prefix}_after=X``: certainly on or after X (earliest ≥ start of X),
+    - ``{prefix}_before=X``: certainly on or before X (latest ≤ end of X),
+    - ``{prefix}_overlaps=X,Y``: possibly between X and Y (the range overlaps).
+    Bounds are inclusive of the period they name. None when no parameter is
+    given; raises ValueError on malformed ones.
+    """
+    lookups = {}
+    after = params.get(f'{prefix}_after')
+    if after:
+        lookups[f'{low}__gte'] = parse_bound(after)
+    before = params.get(f'{prefix}_before')
+    if before:
+        lookups[f'{high}__lte'] = parse_bound(before, end=True)
+    overlaps = params.get(f'{prefix}_overlaps')
+    if overlaps:
+        start, sep, stop = overlaps.partition(',')
+        if not sep:
+            raise ValueError(f'{prefix}_overlaps expects two dates separated by a comma.')
+        lookups[f'{low}__lte'] = parse_bound(stop, end=True)
+        lookups[f'{high}__gte'] = parse_bound(start)
+    return Q(**lookups) if lookups else None
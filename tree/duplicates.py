@@ -0,0 +1,192 @@
+"""
+tree/duplicates.py — Likely duplicate people within a tree
+
+Comparing every pair of members is quadratic, so members are first split
+into blocks by normalized surname (the Double Metaphone key from
+tree/names.py, or the folded surname when a name has no Latin letters) and
+birth decade. Pairs are only scored within a block and against the next
+decade of the same surname, which catches 1899/1901 style spellings of the
+same birth; members with no birth year are compared against their whole
+surname group. Oversized blocks are further split by first-name Soundex.
+
+Members are read once, sorted by surname key, one surname group at a time,
+with every comparison feature precomputed per member, so scoring a pair is
+a few set and integer operations. Pairs already linked by a relationship
+are skipped. Results are cached per tree until a member or relationship
+changes.
+"""
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations, groupby, product
+
+from django.core.cache import cache
+
+from .cache import CACHE_TIMEOUT, tree_cache_key, tree_version
+from .models import FamilyMember, FamilyRelationship
+from .names import fold_name
+
+MIN_SCORE = 0.75
+MAX_RESULTS = 1000
+MAX_BLOCK_PAIRS = 20000
+CHUNK_SIZE = 2000
+
+# Component weights; a component missing on either side counts as 0.5
+WEIGHTS = {'first_name': 0.4, 'last_name': 0.2, 'birth': 0.25, 'place': 0.15}
+NEUTRAL = 0.5
+
+MEMBER_COLUMNS = (
+    'pk', 'first_name_folded', 'first_name_latin', 'first_name_metaphone',
+    'first_name_metaphone_alt', 'first_name_soundex',
+    'last_name_folded', 'last_name_latin', 'last_name_metaphone', 'last_name_metaphone_alt',
+    'gender', 'birth_location', 'birth_date_value', 'birth_date_precision', 'birth_date_bce',
+)
+
+
+class _Person:
+    """Comparison features of one member."""
+
+    __slots__ = ('pk', 'first', 'last', 'gender', 'places', 'year', 'exact', 'soundex')
+
+    def __init__(self, row):
+        (self.pk, first_folded, first_latin, first_code, first_alt, self.soundex,
+         last_folded, last_latin, last_code, last_alt,
+         self.gender, place, born, precision, bce) = row
+        self.first = (first_folded, first_latin, {first_code, first_alt} - {''})
+        self.last = (last_folded, last_latin, {last_code, last_alt} - {''})
+        self.places = set(fold_name(place).split())
+        known = born is not None and precision not in ('', 'unknown')
+        self.year = (-born.year if bce else born.year) if known else None
+        self.exact = born if known and precision == 'exact' else None
+
+    @property
+    def decade(self):
+        return None if self.year is None else self.year // 10
+
+
+def _name_score(a, b):
+    folded_a, latin_a, codes_a = a
+    folded_b, latin_b, codes_b = b
+    if not folded_a or not folded_b:
+        return NEUTRAL
+    if folded_a == folded_b or latin_a == latin_b:
+        return 1.0
+    if codes_a & codes_b:
+        return 0.9
+    if latin_a.startswith(latin_b) or latin_b.startswith(latin_a):
+        return 0.8  # initials and shortened forms: "J" / "John"
+    return SequenceMatcher(None, latin_a, latin_b).ratio()
+
+
+def _birth_score(a, b):
+    if a.year is None or b.year is None:
+        return NEUTRAL
+    if a.exact and b.exact:
+        return 1.0 if a.exact == b.exact else 0.8 * max(0.0, 1 - abs(a.year - b.year) / 10)
+    return max(0.0, 1 - abs(a.year - b.year) / 10)
+
+
+def _place_score(a, b):
+    if not a.places or not b.places:
+        return NEUTRAL
+    return len(a.places & b.places) / len(a.places | b.places)
+
+
+def score_pair(a, b):
+    """Similarity in [0, 1] of two _Person; 0 when their genders conflict."""
+    if a.gender and b.gender and a.gender != b.gender and 'prefer_not_to_say' not in (a.gender, b.gender):
+        return 0.0, {}
+    parts = {
+        'first_name': _name_score(a.first, b.first),
+        'last_name': _name_score(a.last, b.last),
+        'birth': _birth_score(a, b),
+        'place': _place_score(a, b),
+    }
+    return sum(WEIGHTS[name] * value for name, value in parts.items()), parts
+
+
+# ---------------------------------------------------------------------------
+# Blocking
+# ---------------------------------------------------------------------------
+
+def _block_pairs(left, right=None):
+    """
+    Candidate pairs within ``left`` (or across ``left`` × ``right``), split by
+    first-name Soundex when the block would yield too many pairs.
+    """
+    count = len(left) * (len(left) - 1) // 2 if right is None else len(left) * len(right)
+    if count <= MAX_BLOCK_PAIRS:
+        return combinations(left, 2) if right is None else product(left, right)
+    by_sound = defaultdict(lambda: ([], []))
+    for person in left:
+        by_sound[person.soundex][0].append(person)
+    for person in right or ():
+        by_sound[person.soundex][1].append(person)
+    return (
+        pair
+        for lefts, rights in by_sound.values()
+        for pair in (combinations(lefts, 2) if right is None else product(lefts, rights))
+    )
+
+
+def _surname_pairs(people):
+    """Candidate pairs of one surname group, by birth decade."""
+    decades = defaultdict(list)
+    for person in people:
+        decades[person.decade].append(person)
+    undated = decades.pop(None, [])
+    for decade, block in decades.items():
+        yield from _block_pairs(block)
+        if decade + 1 in decades:
+            yield from _block_pairs(block, decades[decade + 1])
+    if undated:
+        yield from _block_pairs(undated)
+        yield from _block_pairs(undated, [p for block in decades.values() for p in block])
+
+
+def _surname_key(row):
+    # last_name_metaphone, else last_name_folded (names with no Latin letters)
+    return row[8] or row[6]
+
+
+def scan_duplicates(tree_id, min_score=MIN_SCORE):
+    """
+    Score candidate pairs for a tree. Returns up to MAX_RESULTS dicts
+    {'members': [low_id, high_id], 'score', 'scores'} sorted by score.
+    """
+    related = {
+        (min(a, b), max(a, b))
+        for a, b in FamilyRelationship.objects.filter(from_member__tree_id=tree_id).values_list(
+            'from_member_id', 'to_member_id'
+        ).iterator(chunk_size=CHUNK_SIZE)
+    }
+    rows = FamilyMember.objects.filter(tree_id=tree_id).order_by(
+        'last_name_metaphone', 'last_name_folded', 'pk'
+    ).values_list(*MEMBER_COLUMNS).iterator(chunk_size=CHUNK_SIZE)
+
+    found = []
+    for _, group in groupby(rows, key=_surname_key):
+        people = [_Person(row) for row in group]
+        for a, b in _surname_pairs(people):
+            pair = (min(a.pk, b.pk), max(a.pk, b.pk))
+            if pair in related:
+                continue
+            score, parts = score_pair(a, b)
+            if score >= min_score:
+                found.append({
+                    'members': list(pair),
+                    'score': round(score, 3),
+                    'scores': {name: round(value, 3) for name, value in parts.items()},
+                })
+    found.sort(key=lambda entry: (-entry['score'], entry['members']))
+    return found[:MAX_RESULTS]
+
+
+def find_duplicates(tree_id):
+    """Cached scan_duplicates() for a tree; rescanned after member or relationship changes."""
+    key = tree_cache_key(tree_id, f'duplicates:{tree_version(tree_id)}', scope='members')
+    result = cache.get(key)
+    if result is None:
+        result = scan_duplicates(tree_id)
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
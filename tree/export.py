@@ -0,0 +1,356 @@
+"""
+tree/export.py — Streaming whole-tree export (GEDCOM or JSON lines)
+
+Exports are generators of text lines fed by ``.iterator(chunk_size=…)``
+cursors, so a worker holds one chunk of rows at a time however large the
+tree is. Rows that belong together (a member and its life events, a family
+and its children) come from separate cursors sorted on the same key and are
+merged while streaming instead of being collected into dicts first.
+
+A GEDCOM family is a pair of parents (or one). Each child gets one FAMC
+per family it belongs to — its biological parents and, separately, its
+adoptive ones, each with its own PEDI.
+"""
+
+import heapq
+import json
+from collections import defaultdict
+from itertools import groupby, islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Min
+from django.db.models.functions import Greatest, Least
+
+from history.models import LifeEvent
+from .gedcom import SEXES, format_gedcom_date
+from .graph import SPOUSE_TYPES
+from .models import FamilyMember, FamilyRelationship, MemberLineage
+
+CHUNK_SIZE = 2000
+
+# format → (content type, file extension)
+EXPORT_FORMATS = {
+    'gedcom': ('text/x-gedcom; charset=utf-8', 'ged'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+MEMBER_FIELDS = (
+    'id', 'first_name', 'last_name', 'maiden_name', 'nickname', 'preferred_name',
+    'gender', 'birth_location', 'birth_lat', 'birth_lng', 'current_location',
+    'death_location', 'occupation', 'education', 'biography', 'notes',
+    'nationality', 'ethnicity', 'religion', 'privacy_level', 'is_alive',
+    'show_age', 'created_at', 'updated_at',
+)
+# FuzzyDate field → inline FamilyMember column suffix
+DATE_FIELDS = {'date': 'value', 'precision': 'precision', 'bce': 'bce', 'display_text': 'text'}
+RELATIONSHIP_FIELDS = (
+    'id', 'from_member_id', 'to_member_id', 'relationship_type',
+    'start_date', 'end_date', 'is_biological', 'is_current', 'notes',
+)
+EVENT_FIELDS = (
+    'id', 'member_id', 'event_type', 'title', 'description', 'date',
+    'date_is_approximate', 'date_display', 'end_date', 'location',
+    'location_lat', 'location_lng', 'privacy_level',
+)
+
+# LifeEvent.event_type → GEDCOM event tag (anything else is a typed EVEN)
+EVENT_TAGS = {
+    'baptism': 'BAPM', 'graduation': 'GRAD', 'emigrated': 'EMIG',
+    'immigrated': 'IMMI', 'retirement': 'RETI', 'moved': 'RESI',
+}
+SEX_CODES = {gender: code for code, gender in SEXES.items()}
+
+
+def export_tree(tree, fmt):
+    """Line generator for ``tree`` in one of EXPORT_FORMATS."""
+    return iter_gedcom(tree) if fmt == 'gedcom' else iter_jsonl(tree)
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def _members(tree):
+    dates = [f'{side}_{column}' for side in ('birth_date', 'death_date') for column in DATE_FIELDS.values()]
+    return FamilyMember.objects.filter(tree=tree).order_by('pk').values(
+        *MEMBER_FIELDS, *dates
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _events(tree):
+    return LifeEvent.objects.filter(member__tree=tree).order_by('member_id', 'date', 'pk').values(
+        *EVENT_FIELDS
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _parent_links(tree, *ordering):
+    """
+    One row per child and kind of parent (biological or not): the lowest and
+    highest parent id and the parent count, from the direct (depth 1)
+    lineage rows. Up to two parents of one kind are one family.
+    """
+    return MemberLineage.objects.filter(tree=tree, depth=1).values(
+        'descendant_id', 'via_biological',
+    ).annotate(
+        low=Min('ancestor_id'), high=Max('ancestor_id'), parents=Count('pk'),
+    ).order_by(*ordering).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _pair_parents(parent_ids, couples):
+    """Split parents of one kind into (low, high) families: couples first, then singles."""
+    families, left = [], sorted(parent_ids)
+    while left:
+        first = left.pop(0)
+        partner = next((pk for pk in left if (first, pk) in couples), first)
+        if partner != first:
+            left.remove(partner)
+        families.append((first, partner))
+    return families
+
+
+def _crowded_families(tree):
+    """
+    {(child id, biological): [(low, high), ...]} for children with more than
+    two parents of one kind, split along the parents' own couples. Such
+    children are rare, so they are held in memory.
+    """
+    crowded = MemberLineage.objects.filter(tree=tree, depth=1).values(
+        'descendant_id', 'via_biological',
+    ).annotate(parents=Count('pk')).filter(parents__gt=2).values_list('descendant_id', 'via_biological')
+    groups = defaultdict(list)
+    for child, biological, parent in MemberLineage.objects.filter(
+        tree=tree, depth=1, descendant_id__in={child for child, _ in crowded},
+    ).values_list('descendant_id', 'via_biological', 'ancestor_id'):
+        groups[child, biological].append(parent)
+    groups = {key: parents for key, parents in groups.items() if len(parents) > 2}
+    if not groups:
+        return {}
+    ids = {pk for parents in groups.values() for pk in parents}
+    couples = {
+        (min(pair), max(pair)) for pair in FamilyRelationship.objects.filter(
+            relationship_type__in=SPOUSE_TYPES, from_member_id__in=ids, to_member_id__in=ids,
+        ).values_list('from_member_id', 'to_member_id')
+    }
+    return {key: _pair_parents(parents, couples) for key, parents in groups.items()}
+
+
+def _link_families(link, crowded):
+    """The (low, high) families a _parent_links row stands for."""
+    if link['parents'] > 2:
+        return crowded.get((link['descendant_id'], link['via_biological']), [])
+    return [(link['low'], link['high'])]
+
+
+def _couples(tree):
+    return FamilyRelationship.objects.filter(
+        from_member__tree=tree, relationship_type__in=SPOUSE_TYPES,
+    ).annotate(
+        low=Least('from_member_id', 'to_member_id'), high=Greatest('from_member_id', 'to_member_id'),
+    ).order_by('low', 'high', 'pk').values('low', 'high', 'start_date', 'is_current').iterator(
+        chunk_size=CHUNK_SIZE
+    )
+
+
+class _Groups:
+    """A stream of rows sorted by ``key``, taken one key at a time in ascending order."""
+
+    def __init__(self, rows, key):
+        self._groups = groupby(rows, key)
+        self._current = next(self._groups, None)
+
+    def take(self, key):
+        while self._current is not None and self._current[0] < key:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != key:
+            return []
+        rows = list(self._current[1])
+        self._current = next(self._groups, None)
+        return rows
+
+
+def _fuzzy(row, side):
+    """Pop the inline date columns for ``side`` off a member row, as FuzzyDate fields."""
+    fields = {field: row.pop(f'{side}_{column}') for field, column in DATE_FIELDS.items()}
+    return fields if fields['precision'] else None
+
+
+# ---------------------------------------------------------------------------
+# JSON lines
+# ---------------------------------------------------------------------------
+
+def _json_line(kind, row):
+    return json.dumps({'type': kind, **row}, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def iter_jsonl(tree):
+    """
+    One JSON object per line: the tree, then every member (dates inline),
+    relationship and life event, each tagged with its ``type``.
+    """
+    yield _json_line('tree', {
+        'id': tree.pk, 'name': tree.name, 'description': tree.description,
+        'tree_type': tree.tree_type, 'primary_language': tree.primary_language,
+    })
+    for row in _members(tree):
+        row['birth_date'] = _fuzzy(row, 'birth_date')
+        row['death_date'] = _fuzzy(row, 'death_date')
+        yield _json_line('member', row)
+    for row in FamilyRelationship.objects.filter(from_member__tree=tree).order_by('pk').values(
+        *RELATIONSHIP_FIELDS
+    ).iterator(chunk_size=CHUNK_SIZE):
+        yield _json_line('relationship', row)
+    for row in _events(tree):
+        yield _json_line('life_event', row)
+
+
+# ---------------------------------------------------------------------------
+# GEDCOM
+# ---------------------------------------------------------------------------
+
+def _line(level, tag, value=''):
+    """A GEDCOM line; embedded newlines become CONT lines."""
+    first, *rest = str(value).split('\n') if value != '' else ['']
+    text = f'{level} {tag} {first}'.rstrip() + '\n'
+    return text + ''.join(f'{level + 1} CONT {more}'.rstrip() + '\n' for more in rest)
+
+
+def _family_xref(low, high):
+    return f'@F{low}@' if low == high else f'@F{low}_{high}@'
+
+
+def _coordinate(value, positive, negative):
+    return f'{positive if value >= 0 else negative}{abs(value)}'
+
+
+def _gedcom_date(fields):
+    if not fields:
+        return ''
+    return format_gedcom_date(fields['date'], fields['precision'], fields['bce'], fields['display_text'])
+
+
+def _individual(row, families, events):
+    birth, death = _fuzzy(row, 'birth_date'), _fuzzy(row, 'death_date')
+    yield _line(0, f'@I{row["id"]}@', 'INDI')
+    yield _line(1, 'NAME', f'{row["first_name"]} /{row["last_name"]}/')
+    yield _line(2, 'GIVN', row['first_name'])
+    yield _line(2, 'SURN', row['last_name'])
+    if row['nickname']:
+        yield _line(2, 'NICK', row['nickname'])
+    yield _line(1, 'SEX', SEX_CODES.get(row['gender'], 'U'))
+
+    birth_date = _gedcom_date(birth)
+    if birth_date or row['birth_location']:
+        yield _line(1, 'BIRT')
+        if birth_date:
+            yield _line(2, 'DATE', birth_date)
+        if row['birth_location']:
+            yield _line(2, 'PLAC', row['birth_location'])
+            if row['birth_lat'] is not None and row['birth_lng'] is not None:
+                yield _line(3, 'MAP')
+                yield _line(4, 'LATI', _coordinate(row['birth_lat'], 'N', 'S'))
+                yield _line(4, 'LONG', _coordinate(row['birth_lng'], 'E', 'W'))
+
+    death_date = _gedcom_date(death)
+    if not row['is_alive'] or death_date or row['death_location']:
+        yield _line(1, 'DEAT', '' if death_date or row['death_location'] else 'Y')
+        if death_date:
+            yield _line(2, 'DATE', death_date)
+        if row['death_location']:
+            yield _line(2, 'PLAC', row['death_location'])
+
+    for tag, field in (('OCCU', 'occupation'), ('EDUC', 'education'),
+                       ('RELI', 'religion'), ('NATI', 'nationality'), ('NOTE', 'biography')):
+        if row[field]:
+            yield _line(1, tag, row[field])
+
+    for event in events:
+        tag = EVENT_TAGS.get(event['event_type'], 'EVEN')
+        yield _line(1, tag)
+        if tag == 'EVEN':
+            yield _line(2, 'TYPE', event['event_type'])
+        if event['date']:
+            date = format_gedcom_date(
+                event['date'], 'approximate' if event['date_is_approximate'] else 'exact'
+            )
+            yield _line(2, 'DATE', date)
+        if event['location']:
+            yield _line(2, 'PLAC', event['location'])
+        yield _line(2, 'NOTE', event['title'])
+
+    for low, high, biological in families:
+        yield _line(1, 'FAMC', _family_xref(low, high))
+        if not biological:
+            yield _line(2, 'PEDI', 'adopted')
+
+
+def _families(tree, crowded):
+    """(low, high, child ids, couple row or None) per family, in key order."""
+    children = (
+        (row['low'], row['high'], row['descendant_id'])
+        for row in _parent_links(tree, 'low', 'high', 'descendant_id')
+        if row['parents'] <= 2
+    )
+    crowded_children = sorted(
+        (low, high, child) for (child, _), families in crowded.items() for low, high in families
+    )
+    couples = ((row['low'], row['high'], row) for row in _couples(tree))
+    merged = heapq.merge(children, crowded_children, couples, key=lambda entry: entry[:2])
+    for (low, high), entries in groupby(merged, key=lambda entry: entry[:2]):
+        kids, couple = [], None
+        for *_, value in entries:
+            if isinstance(value, dict):
+                couple = couple or value
+            else:
+                kids.append(value)
+        yield low, high, kids, couple
+
+
+def _family_records(tree, crowded):
+    families = _families(tree, crowded)
+    while True:
+        batch = list(islice(families, CHUNK_SIZE))
+        if not batch:
+            return
+        ids = {pk for low, high, _, _ in batch for pk in (low, high)}
+        female = set(FamilyMember.objects.filter(pk__in=ids, gender='female').values_list('pk', flat=True))
+        for low, high, kids, couple in batch:
+            yield _line(0, _family_xref(low, high), 'FAM')
+            spouses = [low] if low == high else [low, high]
+            if len(spouses) == 2 and low in female and high not in female:
+                spouses.reverse()  # HUSB first, WIFE second
+            for position, pk in enumerate(spouses):
+                wife = pk in female if len(spouses) == 1 else position == 1
+                yield _line(1, 'WIFE' if wife else 'HUSB', f'@I{pk}@')
+            if couple and couple['start_date']:
+                yield _line(1, 'MARR')
+                yield _line(2, 'DATE', format_gedcom_date(couple['start_date'], 'exact'))
+            if couple and not couple['is_current']:
+                yield _line(1, 'DIV', 'Y')
+            for child in kids:
+                yield _line(1, 'CHIL', f'@I{child}@')
+
+
+def iter_gedcom(tree):
+    """GEDCOM 5.5.1 (UTF-8, lineage-linked) for a whole tree."""
+    yield _line(0, 'HEAD')
+    yield _line(1, 'SOUR', 'LA_RACINE')
+    yield _line(2, 'NAME', 'La Racine')
+    yield _line(1, 'GEDC')
+    yield _line(2, 'VERS', '5.5.1')
+    yield _line(2, 'FORM', 'LINEAGE-LINKED')
+    yield _line(1, 'CHAR', 'UTF-8')
+
+    crowded = _crowded_families(tree)
+    parents = _Groups(
+        _parent_links(tree, 'descendant_id', '-via_biological', 'low'),
+        key=lambda row: row['descendant_id'],
+    )
+    events = _Groups(_events(tree), key=lambda row: row['member_id'])
+    for row in _members(tree):
+        families = [
+            (low, high, link['via_biological'])
+            for link in parents.take(row['id']) for low, high in _link_families(link, crowded)
+        ]
+        yield from _individual(row, families, events.take(row['id']))
+    yield from _family_records(tree, crowded)
+    yield _line(0, 'TRLR')
@@ -0,0 +1,492 @@
+"""
+tree/gedcom.py — Streaming GEDCOM import and GEDCOM date formatting
+
+A GEDCOM file is read line by line and handed over one level-0 record at a
+time, so memory tracks the current batch rather than the file. Individuals
+are written in fixed-size batches with bulk_create (members with their dates
+inline, then privacy settings); family links are written as soon as both ends exist.
+A family that names someone whose INDI has not been read yet is kept as a
+small dict and linked after the final batch, so FAM records may come first.
+bulk_create skips per-row signals, so the import does the tree-level work
+those signals would have done once at the end: counters, lineage closure,
+the search index and cached graph versions.
+
+Uploads through the API are imported by a background task
+(run_gedcom_import), which reports running totals through the cache.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    FuzzyDate, FamilyMember, FamilyRelationship, GedcomImport, MemberPrivacySettings,
+)
+from .names import set_name_keys
+
+BATCH_SIZE = 2000
+# How long an import's running totals stay cached without an update
+PROGRESS_TIMEOUT = 3600
+# Oldest age at which someone with no death record is still taken to be alive
+MAX_LIFESPAN = 110
+
+MONTHS = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12,
+}
+MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+
+# GEDCOM date qualifier → FuzzyDate.precision
+QUALIFIERS = {
+    'ABT': 'approximate', 'EST': 'approximate', 'CAL': 'approximate',
+    'BEF': 'before', 'TO': 'before',
+    'AFT': 'after', 'FROM': 'after',
+}
+
+SEXES = {'M': 'male', 'F': 'female', 'X': 'other'}
+
+# INDI.FAMC.PEDI → (relationship type, biological)
+PEDIGREES = {
+    'adopted': ('adoptive_parent', False),
+    'foster': ('foster_parent', False),
+}
+
+
+class GedcomError(ValueError):
+    """The input is not a GEDCOM file."""
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+class Record:
+    """One GEDCOM line and the lines nested under it."""
+    __slots__ = ('tag', 'xref', 'value', 'children')
+
+    def __init__(self, tag, xref=None, value=''):
+        self.tag, self.xref, self.value, self.children = tag, xref, value, []
+
+    def first(self, tag):
+        return next((child for child in self.children if child.tag == tag), None)
+
+    def all(self, tag):
+        return [child for child in self.children if child.tag == tag]
+
+    def text(self, tag):
+        child = self.first(tag)
+        return child.value.strip() if child else ''
+
+
+def iter_records(lines):
+    """
+    Yield level-0 Records from an iterable of GEDCOM lines (str or bytes).
+    CONT/CONC continuations are folded into their parent's value.
+    """
+    record, stack = None, []
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        line = line.strip().lstrip('\ufeff')
+        if not line:
+            continue
+        level, _, rest = line.partition(' ')
+        if not level.isdigit():
+            if record is None:
+                raise GedcomError(f'Line {number} is not a GEDCOM line.')
+            continue
+        level = int(level)
+        xref = None
+        if rest.startswith('@'):
+            xref, _, rest = rest.partition(' ')
+        tag, _, value = rest.partition(' ')
+
+        if level == 0:
+            if record is not None:
+                yield record
+            record = Record(tag, xref, value)
+            stack = [record]
+            continue
+        if record is None or level > len(stack):
+            continue  # orphaned or skipped level — ignore the line
+        parent = stack[level - 1]
+        if tag == 'CONT':
+            parent.value += '\n' + value
+            continue
+        if tag == 'CONC':
+            parent.value += value
+            continue
+        node = Record(tag, xref, value)
+        parent.children.append(node)
+        del stack[level:]
+        stack.append(node)
+    if record is not None:
+        yield record
+
+
+def _simple_date(tokens):
+    """(date, precision, bce) for '[[DD] MON] YYYY [B.C.]' tokens, or None."""
+    tokens = [t for t in tokens if not t.startswith('@#D')]  # calendar escapes
+    bce = bool(tokens) and tokens[-1] in ('B.C.', 'BC', '(B.C.)', 'BCE')
+    if bce:
+        tokens = tokens[:-1]
+    if not 1 <= len(tokens) <= 3:
+        return None
+    year = tokens[-1].split('/')[0]  # dual dates: 1750/51
+    month = MONTHS.get(tokens[-2]) if len(tokens) >= 2 else 1
+    day = tokens[0] if len(tokens) == 3 else '1'
+    if not (year.isdigit() and day.isdigit() and month):
+        return None
+    try:
+        value = datetime.date(int(year), month, int(day))
+    except ValueError:
+        return None
+    return value, ('year', 'month_year', 'exact')[len(tokens) - 1], bce
+
+
+def parse_gedcom_date(text):
+    """
+    Map a GEDCOM date value onto FuzzyDate fields. ABT/EST/CAL become
+    'approximate', BEF/TO 'before', AFT/FROM 'after'; BET … AND … (and
+    FROM … TO …) store the midpoint as 'approximate' and keep the range as
+    display text. Anything unreadable is kept verbatim as an 'unknown' date.
+    Returns None for an empty value.
+    """
+    raw = ' '.join(text.split())
+    if not raw:
+        return None
+    tokens = raw.upper().split(' ')
+    if tokens[0] == 'INT':  # interpreted: INT <date> (<phrase>)
+        phrase = next((i for i, t in enumerate(tokens) if t.startswith('(')), len(tokens))
+        tokens = tokens[1:phrase] or ['']
+
+    precision = display_text = None
+    if tokens[0] in ('BET', 'FROM') and ('AND' in tokens or 'TO' in tokens):
+        split = tokens.index('AND' if 'AND' in tokens else 'TO')
+        low, high = _simple_date(tokens[1:split]), _simple_date(tokens[split + 1:])
+        if low and high:
+            midpoint = datetime.date.fromordinal((low[0].toordinal() + high[0].toordinal()) // 2)
+            parsed = (midpoint, 'approximate', low[2] and high[2])
+            lo_text, hi_text = ' '.join(raw.split(' ')[1:split]), ' '.join(raw.split(' ')[split + 1:])
+            display_text = f'Between {lo_text} and {hi_text}'
+        else:
+            parsed = low and (low[0], 'after', low[2])
+    else:
+        if tokens[0] in QUALIFIERS:
+            precision, tokens = QUALIFIERS[tokens[0]], tokens[1:]
+        parsed = _simple_date(tokens)
+
+    if not parsed:
+        return {'date': None, 'precision': 'unknown', 'bce': False, 'display_text': raw[:100]}
+    value, natural, bce = parsed
+    return {
+        'date': value,
+        'precision': precision or natural,
+        'bce': bce,
+        'display_text': (display_text or '')[:100],
+    }
+
+
+def format_gedcom_date(value, precision, bce=False, display_text=''):
+    """
+    The inverse of parse_gedcom_date for one stored date: a GEDCOM date
+    value such as 'ABT 1850', '3 MAR 1880' or '(early 1800s)'. Empty if
+    there is nothing to write.
+    """
+    if value is None or precision == 'unknown':
+        return f'({display_text})' if display_text else ''
+    month = MONTH_NAMES[value.month]
+    era = ' B.C.' if bce else ''
+    if precision == 'exact':
+        return f'{value.day} {month} {value.year}{era}'
+    if precision == 'month_year':
+        return f'{month} {value.year}{era}'
+    if precision == 'decade':
+        start = value.year // 10 * 10
+        return f'BET {start}{era} AND {start + 9}{era}'
+    prefix = {'approximate': 'ABT ', 'before': 'BEF ', 'after': 'AFT '}.get(precision, '')
+    return f'{prefix}{value.year}{era}'
+
+
+def _coordinate(value):
+    """'N48.85' / 'W2.35' / '-2.35' → signed float, or None."""
+    value = value.strip().upper()
+    if not value:
+        return None
+    sign = -1 if value[0] in 'SW' else 1
+    try:
+        return sign * float(value.lstrip('NSEW'))
+    except ValueError:
+        return None
+
+
+def _split_name(record):
+    """(first, last, nickname) from an INDI's first NAME."""
+    name = record.first('NAME')
+    if name is None:
+        return '', '', ''
+    given, _, rest = name.value.partition('/')
+    surname = rest.partition('/')[0]
+    first = name.text('GIVN') or given.strip()
+    last = name.text('SURN') or surname.strip()
+    return first[:255], last[:255], name.text('NICK')[:100]
+
+
+def _event(record, tag):
+    """(date fields, place, lat, lng, present) for a BIRT/DEAT event."""
+    event = record.first(tag)
+    if event is None:
+        return None, '', None, None, False
+    place = event.first('PLAC')
+    map_ = place.first('MAP') if place else None
+    return (
+        parse_gedcom_date(event.text('DATE')),
+        place.value.strip()[:255] if place else '',
+        _coordinate(map_.text('LATI')) if map_ else None,
+        _coordinate(map_.text('LONG')) if map_ else None,
+        True,
+    )
+
+
+def presumed_alive(birth, died, today=None):
+    """
+    Whether an individual is living: not with a DEAT record, otherwise only
+    when a birth date within MAX_LIFESPAN years says so. Undated people
+    are historical far more often than not, so they import as deceased.
+    """
+    if died or not birth or birth['date'] is None or birth['bce']:
+        return False
+    today = today or datetime.date.today()
+    return today.year - birth['date'].year <= MAX_LIFESPAN
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+class _Importer:
+
+    def __init__(self, tree, user, progress, batch_size):
+        self.tree, self.user = tree, user
+        self.progress, self.batch_size = progress, batch_size
+        self.members = {}     # GEDCOM xref → FamilyMember pk
+        self.pedigree = {}    # (child xref, family xref) → PEDI value, non-birth only
+        self.people = []      # pending (xref, FamilyMember, birth, death)
+        self.pending = set()  # xrefs of self.people
+        self.links = []       # pending FamilyRelationship rows
+        self.waiting = []     # families naming people in self.people
+        self.deferred = []    # families naming people whose INDI is still to come
+        self.seen_links = set()
+        self.stats = {'individuals': 0, 'families': 0, 'relationships': 0, 'dates': 0}
+
+    def run(self, lines):
+        for record in iter_records(lines):
+            if record.tag == 'INDI' and record.xref:
+                self.add_person(record)
+            elif record.tag == 'FAM':
+                self.add_family(record)
+        self.flush_people()
+        for family in self.deferred:
+            self.link_family(family)
+        self.flush_links()
+        return self.stats
+
+    def report(self):
+        if self.progress:
+            self.progress(dict(self.stats))
+
+    # --- Individuals ---
+
+    def add_person(self, record):
+        first, last, nickname = _split_name(record)
+        birth, birth_place, lat, lng, _ = _event(record, 'BIRT')
+        death, death_place, _, _, died = _event(record, 'DEAT')
+        member = FamilyMember(
+            tree=self.tree,
+            first_name=first,
+            last_name=last,
+            nickname=nickname,
+            gender=SEXES.get(record.text('SEX').upper()[:1], ''),
+            birth_location=birth_place,
+            birth_lat=lat,
+            birth_lng=lng,
+            death_location=death_place,
+            occupation=record.text('OCCU')[:255],
+            education=record.text('EDUC'),
+            religion=record.text('RELI')[:100],
+            nationality=record.text('NATI')[:100],
+            is_alive=presumed_alive(birth, died),
+            added_by=self.user,
+        )
+        set_name_keys(member)
+        for famc in record.all('FAMC'):
+            pedi = famc.text('PEDI').lower()
+            if pedi in PEDIGREES:
+                self.pedigree[(record.xref, famc.value.strip())] = pedi
+        self.people.append((record.xref, member, birth, death))
+        self.pending.add(record.xref)
+        if len(self.people) >= self.batch_size:
+            self.flush_people()
+
+    def flush_people(self):
+        if not self.people:
+            return
+        dates = 0
+        for _, member, birth, death in self.people:
+            for field, fields in (('birth_date', birth), ('death_date', death)):
+                if fields:
+                    setattr(member, field, FuzzyDate(**fields))  # stored inline
+                    dates += 1
+
+        members = [member for _, member, _, _ in self.people]
+        FamilyMember.objects.bulk_create(members, batch_size=self.batch_size)
+        MemberPrivacySettings.objects.bulk_create(
+            [MemberPrivacySettings(member_id=member.pk) for member in members],
+            batch_size=self.batch_size,
+        )
+        for xref, member, _, _ in self.people:
+            self.members[xref] = member.pk
+        self.stats['individuals'] += len(members)
+        self.stats['dates'] += dates
+        self.people = []
+        self.pending.clear()
+        self.report()
+        waiting, self.waiting = self.waiting, []
+        for family in waiting:
+            self.link_family(family)
+
+    # --- Families ---
+
+    def add_family(self, record):
+        """
+        Queue the family's spouse and parent links. A family naming people
+        of the unwritten batch is linked when that batch is written; one
+        naming someone whose INDI has not been read yet waits for the end.
+        """
+        marriage = record.first('MARR')
+        married = parse_gedcom_date(marriage.text('DATE')) if marriage else None
+        family = {
+            'xref': record.xref,
+            'parents': [r.value.strip() for r in record.children if r.tag in ('HUSB', 'WIFE')],
+            'children': [r.value.strip() for r in record.all('CHIL')],
+            'married': married['date'] if married and married['precision'] == 'exact' else None,
+            'current': record.first('DIV') is None,
+        }
+        refs = family['parents'] + family['children']
+        if any(ref not in self.members and ref not in self.pending for ref in refs):
+            self.deferred.append(family)
+        elif not self.pending.isdisjoint(refs):
+            self.waiting.append(family)
+        else:
+            self.link_family(family)
+
+    def link_family(self, family):
+        """Links between the family's imported people; anyone never seen is skipped."""
+        parents = [self.members[ref] for ref in family['parents'] if ref in self.members]
+        if len(parents) == 2:
+            self.link(
+                parents[0], parents[1], 'spouse',
+                start_date=family['married'], is_current=family['current'],
+            )
+        for child in family['children']:
+            child_pk = self.members.get(child)
+            if not child_pk:
+                continue
+            pedi = self.pedigree.get((child, family['xref']))
+            rel_type, biological = PEDIGREES.get(pedi, ('parent', True))
+            for parent_pk in parents:
+                self.link(parent_pk, child_pk, rel_type, is_biological=biological)
+
+        self.stats['families'] += 1
+        if len(self.links) >= self.batch_size:
+            self.flush_links()
+
+    def link(self, from_pk, to_pk, rel_type, **fields):
+        key = (from_pk, to_pk, rel_type)
+        if from_pk == to_pk or key in self.seen_links:
+            return
+        self.seen_links.add(key)
+        self.links.append(FamilyRelationship(
+            from_member_id=from_pk, to_member_id=to_pk,
+            relationship_type=rel_type, created_by=self.user, **fields,
+        ))
+
+    def flush_links(self):
+        if not self.links:
+            return
+        # Both ends are members of this import and link() drops repeats, so
+        # every row is new: no ignore_conflicts, and the count is exact
+        FamilyRelationship.objects.bulk_create(self.links, batch_size=self.batch_size)
+        self.stats['relationships'] += len(self.links)
+        self.links = []
+        self.report()
+
+
+@transaction.atomic
+def import_gedcom(tree, lines, user=None, progress=None, batch_size=BATCH_SIZE):
+    """
+    Import a GEDCOM stream (any iterable of lines — an open file or an
+    upload) into ``tree``. ``progress`` is called with the running totals
+    after every batch. Returns the final totals:
+    {'individuals', 'families', 'relationships', 'dates'}.
+    """
+    from .cache import bump_tree_version
+    from .counters import reconcile_tree_counters
+    from .lineage import rebuild_tree_lineage
+    from .search import reindex_tree
+
+    stats = _Importer(tree, user, progress, batch_size).run(lines)
+    if stats['individuals']:
+        reconcile_tree_counters([tree.pk])
+        if stats['relationships']:
+            rebuild_tree_lineage(tree.pk)
+        reindex_tree(tree.pk)
+        bump_tree_version(tree.pk)
+        bump_tree_version(tree.pk, scope='members')
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Background imports (GedcomImport)
+# ---------------------------------------------------------------------------
+
+def _progress_key(import_id):
+    return f'gedcom_import:{import_id}:progress'
+
+
+def import_progress(job):
+    """A GedcomImport's running totals while it runs, its final totals after."""
+    if job.status == 'running':
+        return cache.get(_progress_key(job.pk), job.stats)
+    return job.stats
+
+
+def run_gedcom_import(job):
+    """
+    Import a GedcomImport's upload and record the outcome on it. The import
+    is one transaction, so nothing it writes is visible to other connections
+    until it ends; the running totals go to the cache after every batch
+    instead. The upload is deleted once the import is over.
+    """
+    key = _progress_key(job.pk)
+    job.status = 'running'
+    job.save(update_fields=['status'])
+    try:
+        with job.file.open('rb') as upload:
+            job.stats = import_gedcom(
+                job.tree, upload, user=job.created_by,
+                progress=lambda stats: cache.set(key, stats, PROGRESS_TIMEOUT),
+            )
+        job.status = 'done'
+    except GedcomError as exc:
+        job.status, job.error = 'failed', str(exc)
+    except Exception:
+        job.status, job.error = 'failed', 'The import stopped on an unexpected error.'
+        raise
+    finally:
+        job.finished_at = timezone.now()
+        job.file.delete(save=False)
+        job.save(update_fields=['status', 'stats', 'error', 'file', 'finished_at'])
+        cache.delete(key)
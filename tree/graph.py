@@ -0,0 +1,104 @@
+"""
+tree/graph.py — Compact, column-oriented views of a family tree
+
+Rendering a large tree does not need the full FamilyMemberSerializer payload
+for every person. These helpers read members and relationships with one
+``values_list`` query per table and return parallel arrays plus integer edge
+lists, which the frontend can lay out without rebuilding branches itself.
+"""
+
+from .models import FamilyMember, FamilyRelationship
+
+
+# ---------------------------------------------------------------------------
+# Relationship type groups
+# ---------------------------------------------------------------------------
+
+# "from_member is <type> of to_member" — value says whether the link is a
+# biological one (adoptive links never are).
+PARENT_TYPES = {'parent': True, 'adoptive_parent': False}
+CHILD_TYPES = {'child': True, 'adopted_child': False}
+SPOUSE_TYPES = ('spouse', 'partner')
+SIBLING_TYPES = ('sibling', 'half_sibling', 'step_sibling')
+
+GRAPH_RELATIONSHIP_TYPES = (
+    tuple(PARENT_TYPES) + tuple(CHILD_TYPES) + SPOUSE_TYPES + SIBLING_TYPES
+)
+
+
+def parent_edge(relationship_type, from_id, to_id, is_biological=True):
+    """
+    Normalise a relationship row to ``(parent_id, child_id, biological)``.
+    Returns None for rows that are not parent/child links.
+    """
+    if relationship_type in PARENT_TYPES:
+        return from_id, to_id, PARENT_TYPES[relationship_type] and is_biological
+    if relationship_type in CHILD_TYPES:
+        return to_id, from_id, CHILD_TYPES[relationship_type] and is_biological
+    return None
+
+
+def _year(value, bce):
+    if value is None:
+        return None
+    return -value.year if bce else value.year
+
+
+# ---------------------------------------------------------------------------
+# Tree graph
+# ---------------------------------------------------------------------------
+
+def build_tree_graph(tree):
+    """
+    Return a column-oriented snapshot of a tree for rendering.
+
+    Members are returned as parallel arrays ordered by primary key. Edge lists
+    hold positions into those arrays (not member ids), so ``parents`` entries
+    are ``[parent_index, child_index]`` and ``spouses``/``siblings`` entries
+    are unordered pairs with the lower index first.
+    """
+    rows = FamilyMember.objects.filter(tree=tree).order_by('pk').values_list(
+        'pk', 'first_name', 'preferred_name', 'nickname', 'last_name',
+        'birth_date_value', 'birth_date_bce',
+        'death_date_value', 'death_date_bce', 'is_alive',
+    )
+
+    ids, names, birth_years, death_years, living = [], [], [], [], []
+    for pk, first, preferred, nickname, last, born, born_bce, died, died_bce, alive in rows:
+        ids.append(pk)
+        names.append(FamilyMember.format_display_name(first, preferred, nickname, last))
+        birth_years.append(_year(born, born_bce))
+        death_years.append(_year(died, died_bce))
+        living.append(alive)
+
+    position = {pk: i for i, pk in enumerate(ids)}
+
+    edges = FamilyRelationship.objects.filter(
+        from_member__tree=tree,
+        relationship_type__in=GRAPH_RELATIONSHIP_TYPES,
+    ).values_list('from_member_id', 'to_member_id', 'relationship_type', 'is_biological')
+
+    parents, spouses, siblings = set(), set(), set()
+    for from_id, to_id, rel_type, is_biological in edges:
+        a, b = position.get(from_id), position.get(to_id)
+        if a is None or b is None or a == b:
+            continue
+        link = parent_edge(rel_type, a, b, is_biological)
+        if link:
+            parents.add(link[:2])
+        elif rel_type in SPOUSE_TYPES:
+            spouses.add((min(a, b), max(a, b)))
+        else:
+            siblings.add((min(a, b), max(a, b)))
+
+    return {
+        'tree': tree.pk,
+        'ids': ids,
+        'names': names,
+        'birth_years': birth_years,
+        'death_years': death_years,
+        'living': living,
+        'parents': sorted(parents),
+        'spouses': sorted(spouses),
+        'siblings': sorted(siblings),
+    }
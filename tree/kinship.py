@@ -0,0 +1,275 @@
+"""
+tree/kinship.py — "How are these two people related?"
+
+A per-tree adjacency index (CSR-style integer arrays) is built from a single
+relationship query and cached until the tree's relationships change. Kinship
+lookups then run a bidirectional BFS entirely in memory and turn the
+shortest path into a label such as "great-aunt" or "second cousin once
+removed".
+"""
+
+from array import array
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .cache import CACHE_TIMEOUT, tree_cache_key
+from .graph import SPOUSE_TYPES, parent_edge
+from .models import FamilyRelationship
+
+# Edge kinds, read as "the next person is my …"
+PARENT, CHILD, SPOUSE, SIBLING = 0, 1, 2, 3
+STEP_NAMES = {PARENT: 'parent', CHILD: 'child', SPOUSE: 'spouse', SIBLING: 'sibling'}
+_REVERSE = {PARENT: CHILD, CHILD: PARENT, SPOUSE: SPOUSE, SIBLING: SIBLING}
+
+KINSHIP_TYPES = (
+    'parent', 'child', 'adoptive_parent', 'adopted_child',
+    'spouse', 'partner', 'sibling', 'half_sibling',
+)
+
+
+# ---------------------------------------------------------------------------
+# Adjacency index
+# ---------------------------------------------------------------------------
+
+class KinshipIndex:
+    """Compact adjacency lists for one tree, addressed by array position."""
+
+    def __init__(self, ids, offsets, targets, kinds):
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+        self.kinds = kinds
+        self.position = {pk: i for i, pk in enumerate(ids)}
+
+    def __getstate__(self):
+        # The position dict is cheap to rebuild and doubles the pickled size
+        return (self.ids, self.offsets, self.targets, self.kinds)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @classmethod
+    def build(cls, tree_id):
+        rows = FamilyRelationship.objects.filter(
+            from_member__tree_id=tree_id,
+            relationship_type__in=KINSHIP_TYPES,
+        ).values_list('relationship_type', 'from_member_id', 'to_member_id')
+
+        neighbours = defaultdict(set)
+        for rel_type, from_id, to_id in rows:
+            if from_id == to_id:
+                continue
+            link = parent_edge(rel_type, from_id, to_id)
+            if link:
+                parent_id, child_id, _ = link
+                neighbours[child_id].add((PARENT, parent_id))
+                neighbours[parent_id].add((CHILD, child_id))
+            else:
+                kind = SPOUSE if rel_type in SPOUSE_TYPES else SIBLING
+                neighbours[from_id].add((kind, to_id))
+                neighbours[to_id].add((kind, from_id))
+
+        ids = array('q', sorted(neighbours))
+        position = {pk: i for i, pk in enumerate(ids)}
+        offsets, targets, kinds = array('l', [0]), array('l'), array('b')
+        for pk in ids:
+            # Blood links first so ties in the BFS prefer them over marriages
+            for kind, other in sorted(neighbours[pk], key=lambda e: (e[0] == SPOUSE, e[0], e[1])):
+                targets.append(position[other])
+                kinds.append(kind)
+            offsets.append(len(targets))
+        return cls(ids, offsets, targets, kinds)
+
+    def neighbours(self, node):
+        for i in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.targets[i], self.kinds[i]
+
+    def shortest_path(self, source_id, target_id):
+        """
+        Bidirectional BFS. Returns [(member_id, kind_from_previous), ...]
+        starting with (source_id, None), or None if not connected.
+        """
+        a, b = self.position.get(source_id), self.position.get(target_id)
+        if source_id == target_id:
+            return [(source_id, None)]
+        if a is None or b is None:
+            return None
+
+        # prev maps node -> (previous node, kind walking away from that side's root)
+        prev_a, prev_b = {a: None}, {b: None}
+        front_a, front_b = [a], [b]
+        meet = None
+        while front_a and front_b and meet is None:
+            expand_a = len(front_a) <= len(front_b)
+            front, prev, other = (front_a, prev_a, prev_b) if expand_a else (front_b, prev_b, prev_a)
+            next_front = []
+            for node in front:
+                for nxt, kind in self.neighbours(node):
+                    if nxt in prev:
+                        continue
+                    prev[nxt] = (node, kind)
+                    if nxt in other and meet is None:
+                        meet = nxt
+                    next_front.append(nxt)
+            if expand_a:
+                front_a = next_front
+            else:
+                front_b = next_front
+        if meet is None:
+            return None
+
+        left = []
+        node = meet
+        while prev_a[node] is not None:
+            parent, kind = prev_a[node]
+            left.append((self.ids[node], kind))
+            node = parent
+        left.append((self.ids[a], None))
+        left.reverse()
+
+        node = meet
+        while prev_b[node] is not None:
+            parent, kind = prev_b[node]
+            left.append((self.ids[parent], _REVERSE[kind]))
+            node = parent
+        return left
+
+
+def get_kinship_index(tree_id):
+    """Cached KinshipIndex for a tree; rebuilt after relationship changes."""
+    key = tree_cache_key(tree_id, 'kinship')
+    index = cache.get(key)
+    if index is None:
+        index = KinshipIndex.build(tree_id)
+        cache.set(key, index, CACHE_TIMEOUT)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Labels
+# ---------------------------------------------------------------------------
+
+_TERMS = {
+    'parent':       ('parent', 'father', 'mother'),
+    'child':        ('child', 'son', 'daughter'),
+    'sibling':      ('sibling', 'brother', 'sister'),
+    'aunt_uncle':   ('aunt/uncle', 'uncle', 'aunt'),
+    'niece_nephew': ('niece/nephew', 'nephew', 'niece'),
+    'spouse':       ('spouse', 'husband', 'wife'),
+}
+_ORDINALS = ['first', 'second', 'third', 'fourth', 'fifth',
+             'sixth', 'seventh', 'eighth', 'ninth', 'tenth']
+_REMOVED = {1: 'once', 2: 'twice', 3: 'three times'}
+
+
+def _term(base, gender):
+    neutral, male, female = _TERMS[base]
+    return {'male': male, 'female': female}.get(gender, neutral)
+
+
+def _ordinal(n):
+    return _ORDINALS[n - 1] if n <= len(_ORDINALS) else f'{n}th'
+
+
+def blood_label(up, down, gender=''):
+    """Label for someone reached by ``up`` generations up then ``down`` down."""
+    if up == 0 and down == 0:
+        return 'self'
+    if up == 0:
+        if down == 1:
+            return _term('child', gender)
+        return 'great-' * (down - 2) + 'grand' + _term('child', gender)
+    if down == 0:
+        if up == 1:
+            return _term('parent', gender)
+        return 'great-' * (up - 2) + 'grand' + _term('parent', gender)
+    if up == 1 and down == 1:
+        return _term('sibling', gender)
+    if up == 1:
+        return 'great-' * (down - 2) + _term('niece_nephew', gender)
+    if down == 1:
+        return 'great-' * (up - 2) + _term('aunt_uncle', gender)
+    label = f'{_ordinal(min(up, down) - 1)} cousin'
+    removed = abs(up - down)
+    if removed:
+        label += f" {_REMOVED.get(removed, f'{removed} times')} removed"
+    return label
+
+
+def _generations(steps):
+    """Return (up, down) if steps are all ups followed by all downs, else None."""
+    expanded = []
+    for kind in steps:
+        expanded.extend((PARENT, CHILD) if kind == SIBLING else (kind,))
+    up = 0
+    while up < len(expanded) and expanded[up] == PARENT:
+        up += 1
+    rest = expanded[up:]
+    if all(kind == CHILD for kind in rest):
+        return up, len(rest)
+    return None
+
+
+def kinship_label(steps, gender=''):
+    """
+    Describe the person at the end of a path of edge kinds, relative to the
+    person at its start (e.g. [PARENT, SIBLING] → "aunt/uncle").
+    Returns None when the path has no conventional name.
+    """
+    if not steps:
+        return 'self'
+    if steps == [SPOUSE]:
+        return _term('spouse', gender)
+
+    blood = _generations(steps)
+    if blood:
+        return blood_label(*blood, gender)
+
+    # Relative of my spouse
+    if steps[0] == SPOUSE and SPOUSE not in steps[1:]:
+        blood = _generations(steps[1:])
+        if blood == (1, 0):
+            return _term('parent', gender) + '-in-law'
+        if blood == (1, 1):
+            return _term('sibling', gender) + '-in-law'
+        if blood == (0, 1):
+            return 'step' + _term('child', gender)
+        if blood:
+            return f"spouse's {blood_label(*blood, gender)}"
+
+    # Spouse of my relative
+    if steps[-1] == SPOUSE and SPOUSE not in steps[:-1]:
+        blood = _generations(steps[:-1])
+        if blood == (0, 1):
+            return _term('child', gender) + '-in-law'
+        if blood == (1, 1):
+            return _term('sibling', gender) + '-in-law'
+        if blood == (1, 0):
+            return 'step' + _term('parent', gender)
+        if blood and blood[1] == 1:
+            return f"{blood_label(*blood, gender)} by marriage"
+        if blood:
+            return f'spouse of {blood_label(*blood)}'
+    return None
+
+
+def describe_kinship(tree_id, source, target):
+    """
+    Shortest connection between two members of a tree, as
+    ``{'related', 'label', 'distance', 'path'}`` with path entries of
+    ``{'id', 'step'}`` (step = how this person relates to the previous one).
+    """
+    path = get_kinship_index(tree_id).shortest_path(source.pk, target.pk)
+    if path is None:
+        return {'related': False, 'label': None, 'distance': None, 'path': []}
+    steps = [kind for _, kind in path[1:]]
+    return {
+        'related': True,
+        'label': kinship_label(steps, target.gender),
+        'distance': len(steps),
+        'path': [
+            {'id': pk, 'step': STEP_NAMES[kind] if kind is not None else None}
+            for pk, kind in path
+        ],
+    }
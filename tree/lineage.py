@@ -0,0 +1,304 @@
+"""
+tree/lineage.py — Maintenance of the MemberLineage closure table
+
+When a parent link changes, only the closure rows of the members below it
+(the child and its descendants) can change. refresh_lineage finds that
+subtree one generation per query, reads the parent links of just those
+members and the stored closure of the parents outside it, and rewrites the
+subtree's rows — so an edit costs O(affected subtree), not O(tree). Both
+the subtree walk and the closure computation are iterative, so long chains
+never approach Python's recursion limit.
+"""
+
+import heapq
+from collections import defaultdict
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .graph import PARENT_TYPES, CHILD_TYPES, parent_edge
+from .models import FamilyMember, FamilyRelationship, MemberLineage
+
+LINEAGE_TYPES = tuple(PARENT_TYPES) + tuple(CHILD_TYPES)
+BATCH_SIZE = 2000
+
+
+def _parent_links(tree_id, child_ids=None):
+    links = FamilyRelationship.objects.filter(
+        from_member__tree_id=tree_id, relationship_type__in=LINEAGE_TYPES,
+    )
+    if child_ids is not None:
+        links = links.filter(
+            Q(relationship_type__in=PARENT_TYPES, to_member_id__in=child_ids)
+            | Q(relationship_type__in=CHILD_TYPES, from_member_id__in=child_ids)
+        )
+    return links
+
+
+def load_parent_map(tree_id, child_ids=None):
+    """
+    Return {child_id: [(parent_id, biological), ...]} for a tree, or for
+    ``child_ids`` only (one query).
+    """
+    rows = _parent_links(tree_id, child_ids).values_list(
+        'relationship_type', 'from_member_id', 'to_member_id', 'is_biological',
+    )
+    parents = defaultdict(dict)
+    for rel_type, from_id, to_id, is_biological in rows:
+        parent_id, child_id, biological = parent_edge(rel_type, from_id, to_id, is_biological)
+        if parent_id == child_id:
+            continue
+        # Keep the link biological if any row for this pair says so
+        parents[child_id][parent_id] = parents[child_id].get(parent_id, False) or biological
+    return {child: list(ps.items()) for child, ps in parents.items()}
+
+
+def link_child(relationship_type, from_id, to_id):
+    """The child end of a parent/child link; None for other relationship types."""
+    edge = parent_edge(relationship_type, from_id, to_id)
+    return edge and edge[1]
+
+
+def _children_map(parent_map):
+    children = defaultdict(list)
+    for child_id, parents in parent_map.items():
+        for parent_id, _ in parents:
+            children[parent_id].append(child_id)
+    return children
+
+
+def _closure_rows(tree_id, member_ids, parent_map, inherited=None):
+    """
+    Yield closure row tuples for ``member_ids``, parents before children.
+    ``parent_map`` must hold the links of every member in the set; the
+    ancestors of a parent outside it come from ``inherited``
+    ({member_id: {ancestor_id: depth << 1 | via_biological}}).
+
+    Ancestor sets are memoised with depth and the biological flag packed into
+    one small int, and a member's entry is dropped once all of its children
+    have been emitted. Members are taken in primary-key (roughly
+    generational) order among those whose parents are done, so memory
+    tracks about one generation. A cycle (bad data) is cut at its lowest id.
+    """
+    inherited = inherited or {}
+    members = set(member_ids)
+    children = _children_map(parent_map)
+    waiting = {
+        pk: sum(parent_id in members for parent_id, _ in parent_map.get(pk, ()))
+        for pk in members
+    }
+    pending = {pk: sum(child_id in members for child_id in children.get(pk, ())) for pk in members}
+    ready = [pk for pk, count in waiting.items() if not count]
+    heapq.heapify(ready)
+    remaining, memo = set(members), {}
+
+    while remaining:
+        member_id = heapq.heappop(ready) if ready else min(remaining)
+        if member_id not in remaining:
+            continue
+        remaining.discard(member_id)
+
+        result = {}
+        for parent_id, biological in parent_map.get(member_id, ()):
+            link = 1 if biological else 0
+            above = memo.get(parent_id, {}) if parent_id in members else inherited.get(parent_id, {})
+            for ancestor_id, packed in [(parent_id, 1), *above.items()]:
+                if ancestor_id == member_id:
+                    continue
+                depth, bio = (packed >> 1) + 1, packed & link
+                known = result.get(ancestor_id)
+                if known is not None:
+                    depth, bio = min(known >> 1, depth), (known & 1) | bio
+                result[ancestor_id] = depth << 1 | bio
+        for ancestor_id, packed in result.items():
+            yield (tree_id, ancestor_id, member_id, packed >> 1, bool(packed & 1))
+
+        if pending[member_id]:
+            memo[member_id] = result
+        for child_id in children.get(member_id, ()):
+            if child_id in remaining:
+                waiting[child_id] -= 1
+                if not waiting[child_id]:
+                    heapq.heappush(ready, child_id)
+        for parent_id, _ in parent_map.get(member_id, ()):
+            if parent_id in members:
+                pending[parent_id] -= 1
+                if not pending[parent_id]:
+                    memo.pop(parent_id, None)
+
+
+def _bulk_insert(rows):
+    """
+    Insert (tree, ancestor, descendant, depth, via_biological) tuples in
+    fixed-size executemany batches. Closure rebuilds write hundreds of
+    thousands of rows, and skipping model instances makes this ~10x faster
+    than bulk_create while keeping memory bounded.
+    """
+    meta = MemberLineage._meta
+    columns = [meta.get_field(name).column for name in
+               ('tree', 'ancestor', 'descendant', 'depth', 'via_biological')]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(meta.db_table),
+        ', '.join(connection.ops.quote_name(c) for c in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    rows, total = iter(rows), 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                return total
+            cursor.executemany(sql, batch)
+            total += len(batch)
+
+
+def _subtree(tree_id, member_ids, limit):
+    """
+    The given members plus all of their descendants, one query per
+    generation. Returns None once more than ``limit`` members are found.
+    """
+    seen, frontier = set(member_ids), set(member_ids)
+    while frontier:
+        rows = _parent_links(tree_id).filter(
+            Q(relationship_type__in=PARENT_TYPES, from_member_id__in=frontier)
+            | Q(relationship_type__in=CHILD_TYPES, to_member_id__in=frontier)
+        ).values_list('relationship_type', 'from_member_id', 'to_member_id')
+        frontier = {
+            to_id if rel_type in PARENT_TYPES else from_id
+            for rel_type, from_id, to_id in rows
+        } - seen
+        seen |= frontier
+        if len(seen) > limit:
+            return None
+    return seen
+
+
+@transaction.atomic
+def refresh_lineage(tree_id, member_ids):
+    """
+    Recompute the closure rows of ``member_ids`` and everything below them.
+    Call with the child end (link_child) of a parent link that was added,
+    changed or removed.
+    """
+    affected = _subtree(tree_id, member_ids, BATCH_SIZE)
+    if affected is None:
+        # Edits near the root touch most of the tree; a full rebuild is cheaper
+        # than huge IN lists.
+        _rebuild(tree_id)
+        return
+    MemberLineage.objects.filter(tree_id=tree_id, descendant_id__in=affected).delete()
+    existing = set(
+        FamilyMember.objects.filter(pk__in=affected).values_list('pk', flat=True)
+    )
+    parent_map = load_parent_map(tree_id, existing)
+    # Members above the subtree keep their rows; read them instead of walking up
+    outside = {pk for parents in parent_map.values() for pk, _ in parents} - existing
+    inherited = defaultdict(dict)
+    for descendant_id, ancestor_id, depth, bio in MemberLineage.objects.filter(
+        descendant_id__in=outside,
+    ).values_list('descendant_id', 'ancestor_id', 'depth', 'via_biological'):
+        inherited[descendant_id][ancestor_id] = depth << 1 | bio
+    _bulk_insert(_closure_rows(tree_id, existing, parent_map, inherited))
+
+
+@transaction.atomic
+def rebuild_tree_lineage(tree_id):
+    """Drop and rebuild the whole closure for one tree. Returns the row count."""
+    return _rebuild(tree_id)
+
+
+def _rebuild(tree_id):
+    MemberLineage.objects.filter(tree_id=tree_id).delete()
+    member_ids = FamilyMember.objects.filter(tree_id=tree_id).values_list('pk', flat=True)
+    return _bulk_insert(_closure_rows(tree_id, member_ids, load_parent_map(tree_id)))
+
+
+# Sort order of lineage_entries(); pk makes it total, for keyset paging
+LINEAGE_ORDERING = ('depth', 'last_name', 'first_name', 'pk')
+
+
+def lineage_entries(queryset, side):
+    """
+    A MemberLineage queryset as dicts describing the ``side`` ('ancestor'
+    or 'descendant') member, ready to page by LINEAGE_ORDERING
+    (LineageEntrySerializer renders them).
+    """
+    return queryset.values(
+        'pk', 'depth', 'via_biological',
+        member_id=F(f'{side}_id'),
+        first_name=F(f'{side}__first_name'),
+        preferred_name=F(f'{side}__preferred_name'),
+        nickname=F(f'{side}__nickname'),
+        last_name=F(f'{side}__last_name'),
+    )
+
+
+def set_parents(member, parent_ids, user=None):
+    """
+    Make ``parent_ids`` the member's plain 'parent' links, adding and removing
+    FamilyRelationship rows as needed. Adoptive links are left alone.
+    """
+    wanted = {int(pk) for pk in parent_ids or ()}
+    valid = set(
+        FamilyMember.objects.filter(pk__in=wanted, tree_id=member.tree_id)
+        .exclude(pk=member.pk).values_list('pk', flat=True)
+    )
+    current = set(member.relationships_to.filter(
+        relationship_type='parent'
+    ).values_list('from_member_id', flat=True)) | set(member.relationships_from.filter(
+        relationship_type='child'
+    ).values_list('to_member_id', flat=True))
+
+    removed = current - valid
+    if removed:
+        member.relationships_to.filter(
+            relationship_type='parent', from_member_id__in=removed
+        ).delete()
+        member.relationships_from.filter(
+            relationship_type='child', to_member_id__in=removed
+        ).delete()
+    for parent_id in valid - current:
+        FamilyRelationship.objects.create(
+            from_member_id=parent_id, to_member=member,
+            relationship_type='parent', created_by=user,
+        )
+
+
+def find_common_ancestors(member_a, member_b, biological=False):
+    """
+    Common ancestors of two members from the closure table (one query),
+    ordered nearest first. A member counts as its own ancestor at depth 0,
+    so a direct line (e.g. grandparent and grandchild) resolves to the elder.
+    Each entry: {'id', 'display_name', 'depth_a', 'depth_b'}.
+    """
+    qs = MemberLineage.objects.filter(descendant_id__in=(member_a.pk, member_b.pk))
+    if biological:
+        qs = qs.filter(via_biological=True)
+    rows = qs.values_list(
+        'descendant_id', 'ancestor_id', 'depth',
+        'ancestor__first_name', 'ancestor__preferred_name',
+        'ancestor__nickname', 'ancestor__last_name',
+    )
+
+    depths = {member_a.pk: {member_a.pk: 0}, member_b.pk: {member_b.pk: 0}}
+    names = {
+        m.pk: FamilyMember.format_display_name(m.first_name, m.preferred_name, m.nickname, m.last_name)
+        for m in (member_a, member_b)
+    }
+    for descendant_id, ancestor_id, depth, first, preferred, nickname, last in rows:
+        depths[descendant_id][ancestor_id] = depth
+        names[ancestor_id] = FamilyMember.format_display_name(first, preferred, nickname, last)
+
+    shared = depths[member_a.pk].keys() & depths[member_b.pk].keys()
+    entries = [
+        {
+            'id': pk,
+            'display_name': names[pk],
+            'depth_a': depths[member_a.pk][pk],
+            'depth_b': depths[member_b.pk][pk],
+        }
+        for pk in shared
+    ]
+    entries.sort(key=lambda e: (e['depth_a'] + e['depth_b'], max(e['depth_a'], e['depth_b']), e['id']))
+    return entries
@@ -0,0 +1,157 @@
+"""
+tree/management/commands/benchmark_common_ancestors.py
+
+Benchmark nearest-common-ancestor lookups on a synthetic tree:
+the MemberLineage closure query versus the naive walk that issues one
+relationship query per generation. Everything runs inside a transaction
+that is rolled back, so no data is left behind.
+
+    python manage.py benchmark_common_ancestors --members 100000 --pairs 200
+"""
+
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from tree.lineage import BATCH_SIZE, find_common_ancestors, rebuild_tree_lineage
+from tree.models import Tree, FamilyMember, FamilyRelationship
+
+
+def naive_ancestors(member_id):
+    """Today's approach: walk up one generation (one query) at a time."""
+    depths, frontier, depth = {member_id: 0}, {member_id}, 0
+    while frontier:
+        depth += 1
+        rows = FamilyRelationship.objects.filter(
+            Q(to_member_id__in=frontier, relationship_type='parent') |
+            Q(from_member_id__in=frontier, relationship_type='child')
+        ).values_list('relationship_type', 'from_member_id', 'to_member_id')
+        parents = {f if t == 'parent' else to for t, f, to in rows} - depths.keys()
+        for parent_id in parents:
+            depths[parent_id] = depth
+        frontier = parents
+    return depths
+
+
+def naive_nearest(a_id, b_id):
+    """Ids of the nearest common ancestors, via the naive walk."""
+    anc_a, anc_b = naive_ancestors(a_id), naive_ancestors(b_id)
+    sums = {pk: anc_a[pk] + anc_b[pk] for pk in anc_a.keys() & anc_b.keys()}
+    best = min(sums.values(), default=None)
+    return {pk for pk, total in sums.items() if total == best}
+
+
+def closure_nearest(member_a, member_b):
+    entries = find_common_ancestors(member_a, member_b)
+    best = min((e['depth_a'] + e['depth_b'] for e in entries), default=None)
+    return {e['id'] for e in entries if e['depth_a'] + e['depth_b'] == best}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark closure-table common-ancestor queries against the naive recursive walk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=100_000)
+        parser.add_argument('--pairs', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['members'], options['pairs'], random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def timed(self, label, func):
+        start = time.perf_counter()
+        result = func()
+        self.stdout.write(f'{label}: {time.perf_counter() - start:.2f}s')
+        return result
+
+    def run(self, target, pair_count, rng):
+        user = User.objects.create(username=f'benchmark-{time.time_ns()}')
+        tree = Tree.objects.create(name='Benchmark tree', created_by=user)
+
+        generations = self.timed('Seed members', lambda: self.seed(tree, target, rng))
+        total = FamilyMember.objects.filter(tree=tree).count()
+        self.stdout.write(f'{total} members over {len(generations)} generations')
+
+        rows = self.timed('Build closure', lambda: rebuild_tree_lineage(tree.pk))
+        self.stdout.write(f'{rows} lineage rows')
+
+        youngest = generations[-1]
+        pairs = [tuple(rng.sample(youngest, 2)) for _ in range(pair_count)]
+        members = FamilyMember.objects.in_bulk({pk for pair in pairs for pk in pair})
+
+        closure_start = time.perf_counter()
+        closure = [closure_nearest(members[a], members[b]) for a, b in pairs]
+        closure_time = time.perf_counter() - closure_start
+
+        naive_start = time.perf_counter()
+        naive = [naive_nearest(a, b) for a, b in pairs]
+        naive_time = time.perf_counter() - naive_start
+
+        mismatches = sum(1 for c, n in zip(closure, naive) if c != n)
+        per = 1000 / max(pair_count, 1)
+        self.stdout.write(
+            f'Closure: {closure_time * per:.2f} ms/query   '
+            f'Naive walk: {naive_time * per:.2f} ms/query   '
+            f'Speed-up: {naive_time / max(closure_time, 1e-9):.1f}x'
+        )
+        self.stdout.write(f'Nearest-ancestor mismatches: {mismatches}')
+
+    def seed(self, tree, target, rng):
+        """
+        A descendant tree from one founding couple: most people marry someone
+        from outside the tree and each couple has 1–4 children, so ancestor
+        sets grow with generation depth as in a real family tree.
+        """
+        founders = FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name='Founder', last_name='Root', gender=g)
+            for g in ('male', 'female')
+        ])
+        generations = [[m.pk for m in founders]]
+        couples = [(founders[0].pk, founders[1].pk)]
+        count = len(founders)
+
+        while couples and count < target:
+            births = []
+            for couple in couples:
+                for _ in range(rng.randint(1, 4)):
+                    births.append(couple)
+            births = births[:target - count]
+            created = FamilyMember.objects.bulk_create([
+                FamilyMember(tree=tree, first_name=f'G{len(generations)}', last_name='Root')
+                for _ in births
+            ], batch_size=BATCH_SIZE)
+            links = [
+                FamilyRelationship(from_member_id=parent_id, to_member_id=child.pk,
+                                   relationship_type='parent')
+                for child, couple in zip(created, births) for parent_id in couple
+            ]
+            count += len(created)
+
+            married = [m.pk for m in created if rng.random() < 0.9][:max(target - count, 0)]
+            spouses = FamilyMember.objects.bulk_create([
+                FamilyMember(tree=tree, first_name='Spouse', last_name=f'G{len(generations)}')
+                for _ in married
+            ], batch_size=BATCH_SIZE)
+            links += [
+                FamilyRelationship(from_member_id=pk, to_member_id=spouse.pk,
+                                   relationship_type='spouse')
+                for pk, spouse in zip(married, spouses)
+            ]
+            FamilyRelationship.objects.bulk_create(links, batch_size=BATCH_SIZE)
+            count += len(spouses)
+            generations.append([m.pk for m in created])
+            couples = [(pk, spouse.pk) for pk, spouse in zip(married, spouses)]
+        return generations
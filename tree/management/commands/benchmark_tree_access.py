@@ -0,0 +1,94 @@
+"""
+tree/management/commands/benchmark_tree_access.py
+
+Compare the old member-visibility filter (OR over created_by and a
+permissions join, then DISTINCT) with the TreeAccess subquery on a seeded
+dataset. Prints both query plans and per-query timings. Everything runs
+inside a transaction that is rolled back.
+
+    python manage.py benchmark_tree_access --trees 2000 --members 50
+"""
+
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from tree.access import accessible_tree_ids, rebuild_tree_access
+from tree.models import Tree, TreePermission, FamilyMember
+
+
+def legacy_members(user):
+    return FamilyMember.objects.filter(
+        Q(tree__created_by=user) |
+        Q(tree__permissions__user=user, tree__permissions__status='active')
+    ).distinct()
+
+
+def access_members(user):
+    return FamilyMember.objects.filter(tree_id__in=accessible_tree_ids(user))
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark TreeAccess visibility filters against the legacy OR/JOIN/DISTINCT filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--trees', type=int, default=2000)
+        parser.add_argument('--members', type=int, default=50, help='Members per tree')
+        parser.add_argument('--shares', type=int, default=5, help='Extra users per tree')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options, random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def run(self, options, rng):
+        stamp = time.time_ns()
+        users = User.objects.bulk_create([
+            User(username=f'bench-{stamp}-{i}') for i in range(options['users'])
+        ])
+        trees = Tree.objects.bulk_create([
+            Tree(name=f'Bench {i}', created_by=rng.choice(users))
+            for i in range(options['trees'])
+        ], batch_size=2000)
+        perms = {}
+        for tree in trees:
+            perms[(tree.pk, tree.created_by_id)] = 'owner'
+            for user in rng.sample(users, options['shares']):
+                perms.setdefault((tree.pk, user.pk), rng.choice(['viewer', 'editor', 'validator']))
+        TreePermission.objects.bulk_create([
+            TreePermission(tree_id=t, user_id=u, role=role) for (t, u), role in perms.items()
+        ], batch_size=2000)
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name=f'M{i}', last_name='Bench')
+            for tree in trees for i in range(options['members'])
+        ], batch_size=2000)
+        rows = rebuild_tree_access()
+        self.stdout.write(
+            f"{len(users)} users, {len(trees)} trees, {len(perms)} permissions, "
+            f"{len(trees) * options['members']} members, {rows} access rows"
+        )
+
+        user = max(users, key=lambda u: sum(1 for _, uid in perms if uid == u.pk))
+        for label, build in (('Legacy OR/JOIN/DISTINCT', legacy_members), ('TreeAccess subquery', access_members)):
+            qs = build(user)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(qs.explain())
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                count = len(qs.all().values_list('pk', flat=True))
+            elapsed = (time.perf_counter() - start) / options['repeat']
+            self.stdout.write(f'{count} visible members, {elapsed * 1000:.2f} ms/query')
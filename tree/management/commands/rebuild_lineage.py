@@ -0,0 +1,33 @@
+"""
+tree/management/commands/rebuild_lineage.py
+
+Rebuild the MemberLineage ancestor/descendant closure table in bulk,
+for every tree or for selected trees (e.g. after a data import).
+"""
+
+from django.core.management.base import BaseCommand
+from tree.models import Tree
+from tree.lineage import rebuild_tree_lineage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ancestor/descendant closure table (MemberLineage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tree', type=int, action='append', dest='tree_ids',
+            help='Only rebuild this tree id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        trees = Tree.objects.order_by('pk')
+        if options['tree_ids']:
+            trees = trees.filter(pk__in=options['tree_ids'])
+
+        total = 0
+        for tree_id, name in trees.values_list('pk', 'name'):
+            rows = rebuild_tree_lineage(tree_id)
+            total += rows
+            self.stdout.write(f'{name}: {rows} lineage rows')
+
+        self.stdout.write(self.style.SUCCESS(f'Lineage rebuilt: {total} rows'))
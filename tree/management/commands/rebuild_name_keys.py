@@ -0,0 +1,30 @@
+"""
+tree/management/commands/rebuild_name_keys.py
+
+Recompute the normalized name keys (tree/names.py) of every member, or of
+selected trees. Run after changing the key rules or raw SQL edits.
+
+    python manage.py rebuild_name_keys --tree 12 --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+from tree.models import FamilyMember
+from tree.names import backfill_name_keys
+
+
+class Command(BaseCommand):
+    help = 'Recompute the normalized name keys used by ?name_like='
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tree', type=int, action='append', dest='tree_ids',
+            help='Only rebuild this tree id (repeatable)',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        members = FamilyMember.objects.all()
+        if options['tree_ids']:
+            members = members.filter(tree_id__in=options['tree_ids'])
+        count = backfill_name_keys(members, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Name keys rebuilt for {count} members'))
@@ -0,0 +1,30 @@
+"""
+tree/management/commands/rebuild_search_index.py
+
+Rebuild the full-text member search index (tree/search.py), for every tree
+or for selected trees. Run after raw SQL edits or restoring a backup.
+"""
+
+from django.core.management.base import BaseCommand
+from tree.search import rebuild_search_index, reindex_tree, search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text member search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tree', type=int, action='append', dest='tree_ids',
+            help='Only reindex this tree id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        if not search_backend():
+            self.stdout.write(self.style.WARNING('No search index on this database backend'))
+            return
+        if options['tree_ids']:
+            for tree_id in options['tree_ids']:
+                reindex_tree(tree_id)
+        else:
+            rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,17 @@
+"""
+tree/management/commands/rebuild_tree_access.py
+
+Recreate the TreeAccess visibility table from TreePermission and
+Tree.created_by (e.g. after rows were changed with queryset.update()).
+"""
+
+from django.core.management.base import BaseCommand
+from tree.access import rebuild_tree_access
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user tree visibility table (TreeAccess)'
+
+    def handle(self, *args, **options):
+        rows = rebuild_tree_access()
+        self.stdout.write(self.style.SUCCESS(f'Tree access rebuilt: {rows} rows'))
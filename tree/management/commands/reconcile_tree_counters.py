@@ -0,0 +1,28 @@
+"""
+tree/management/commands/reconcile_tree_counters.py
+
+Recompute the denormalized counters from the underlying rows, for every
+tree or for selected trees: Tree members, living members, relationships
+and photos, and FamilyUpdate likes and comments. Run after bulk imports or
+manual data fixes, or periodically (e.g. nightly cron) to correct drift.
+"""
+
+from django.core.management.base import BaseCommand
+from tree.counters import reconcile_tree_counters, reconcile_update_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute Tree and FamilyUpdate counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tree', type=int, action='append', dest='tree_ids',
+            help='Only reconcile this tree id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        trees = reconcile_tree_counters(options['tree_ids'])
+        updates = reconcile_update_counters(options['tree_ids'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Counters reconciled: {trees} trees and {updates} updates corrected'
+        ))
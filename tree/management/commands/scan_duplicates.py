@@ -0,0 +1,37 @@
+"""
+tree/management/commands/scan_duplicates.py
+
+Score likely duplicate members (tree/duplicates.py) and warm the cache the
+duplicates endpoint reads, for every tree or for selected trees. Meant to
+run on a schedule or after large imports; Celery beat runs the same scan hourly
+as the ``tree.tasks.scan_tree_duplicates`` task.
+
+    python manage.py scan_duplicates --tree 12
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from tree.duplicates import find_duplicates
+from tree.models import Tree
+
+
+class Command(BaseCommand):
+    help = 'Scan trees for likely duplicate members and cache the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tree', type=int, action='append', dest='tree_ids',
+            help='Only scan this tree id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        tree_ids = options['tree_ids'] or Tree.objects.order_by('pk').values_list('pk', flat=True)
+        for tree_id in tree_ids:
+            started = time.perf_counter()
+            pairs = find_duplicates(tree_id)
+            self.stdout.write(
+                f'Tree {tree_id}: {len(pairs)} candidate pairs '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+        self.stdout.write(self.style.SUCCESS('Duplicate scan complete'))
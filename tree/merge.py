@@ -0,0 +1,134 @@
+"""
+tree/merge.py — Merge a duplicate member into the record that is kept
+
+Every foreign key that points at FamilyMember — in any installed app,
+including auto-created many-to-many tables — is repointed from the dropped
+member to the kept one with one set-based UPDATE per column. Rows that would
+then break a unique constraint (the same relationship, photo tag or
+validator twice; a second one-to-one link) are resolved first with one
+EXISTS-filtered statement per column: nullable links are cleared, others
+deleted as duplicates. The number of statements depends on the schema, not
+on how many rows reference the dropped member.
+
+Blank fields of the kept member are filled from the dropped one, the
+dropped member is deleted, the lineage below the kept member is refreshed
+and one AuditLog entry records the merge.
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .models import FamilyMember, MemberLineage
+
+# Derived rows, rebuilt after the merge rather than repointed
+SKIP_MODELS = (MemberLineage,)
+# Provenance fields that stay as they are on the kept member
+KEEP_FIELDS = ('id', 'tree', 'added_by', 'created_at', 'updated_at', 'is_alive')
+# Inline date columns, merged per date rather than per column
+DATE_SUFFIXES = tuple(f'_date_{column}' for column in FamilyMember.DATE_COLUMNS)
+
+
+def _references():
+    """(model, field) for every foreign key / one-to-one column pointing at FamilyMember."""
+    for model in apps.get_models(include_auto_created=True):
+        if model in SKIP_MODELS:
+            continue
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model is FamilyMember and model is not FamilyMember:
+                yield model, field
+
+
+def _unique_partners(model, field):
+    """Other column groups that make ``field`` unique: [()] for a unique field."""
+    groups = [()] if field.unique else []
+    for together in model._meta.unique_together:
+        if field.name in together:
+            groups.append(tuple(name for name in together if name != field.name))
+    return groups
+
+
+def _repoint(model, field, keep, drop):
+    """Move ``field`` from ``drop`` to ``keep``; returns (moved, cleared or deleted)."""
+    rows = model._base_manager.filter(**{field.name: drop})
+    resolved = 0
+    for partners in _unique_partners(model, field):
+        clashes = rows.filter(Exists(model._base_manager.filter(
+            **{field.name: keep}, **{name: OuterRef(name) for name in partners}
+        )))
+        if field.null:
+            resolved += clashes.update(**{field.name: None})
+        else:
+            resolved += clashes.delete()[0]
+    return rows.update(**{field.name: keep}), resolved
+
+
+def _fill_blanks(keep, drop):
+    """Copy drop's values into keep's empty fields. Returns the field names."""
+    filled = []
+    for side in FamilyMember.DATE_SIDES:
+        if getattr(keep, f'{side}_date') is None and getattr(drop, f'{side}_date') is not None:
+            setattr(keep, f'{side}_date', getattr(drop, f'{side}_date'))
+            filled.append(f'{side}_date')
+    for field in FamilyMember._meta.concrete_fields:
+        if (field.name in KEEP_FIELDS or not field.editable or field.name.endswith(DATE_SUFFIXES)
+                or field.get_internal_type() == 'BooleanField'):
+            continue
+        if getattr(keep, field.attname) in (None, '') and getattr(drop, field.attname) not in (None, ''):
+            setattr(keep, field.attname, getattr(drop, field.attname))
+            filled.append(field.name)
+    if not drop.is_alive and keep.is_alive:
+        keep.is_alive = False
+        filled.append('is_alive')
+    return filled
+
+
+@transaction.atomic
+def merge_members(keep, drop, user=None):
+    """
+    Merge ``drop`` into ``keep`` (same tree). Returns a summary:
+    {'kept', 'dropped', 'filled': [fields], 'moved': {table.column: rows},
+    'resolved': {table.column: rows}}.
+    """
+    from history.models import AuditLog
+    from .cache import bump_tree_version
+    from .lineage import refresh_lineage
+    from .models import FamilyRelationship
+
+    if keep.pk == drop.pk:
+        raise ValueError('A member cannot be merged into itself.')
+    if keep.tree_id != drop.tree_id:
+        raise ValueError('Both members must belong to the same tree.')
+    keep, drop = (
+        FamilyMember.objects.select_for_update().get(pk=keep.pk),
+        FamilyMember.objects.select_for_update().get(pk=drop.pk),
+    )
+
+    # Links between the two would become self-links
+    FamilyRelationship.objects.filter(from_member=keep, to_member=drop).delete()
+    FamilyRelationship.objects.filter(from_member=drop, to_member=keep).delete()
+
+    moved, resolved = {}, {}
+    for model, field in _references():
+        label = f'{model._meta.db_table}.{field.column}'
+        moved[label], resolved[label] = _repoint(model, field, keep, drop)
+    moved = {label: count for label, count in moved.items() if count}
+    resolved = {label: count for label, count in resolved.items() if count}
+
+    dropped = {'id': drop.pk, 'name': drop.full_name}
+    filled = _fill_blanks(keep, drop)
+    drop.delete()  # first: keep may take over its one-to-one user_account
+    keep.save()
+
+    refresh_lineage(keep.tree_id, [keep.pk])
+    bump_tree_version(keep.tree_id)
+    AuditLog.objects.create(
+        user=user if getattr(user, 'pk', None) else None,
+        action='merge',
+        model_name='FamilyMember',
+        object_id=keep.pk,
+        object_repr=str(keep)[:500],
+        changes={'dropped': dropped, 'filled': filled, 'moved': moved, 'resolved': resolved},
+    )
+    return {'kept': keep.pk, 'dropped': dropped['id'], 'filled': filled,
+            'moved': moved, 'resolved': resolved}
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0003_tree_crest_caption_tree_crest_image_tree_theme_dark_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberLineage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('via_biological', models.BooleanField(default=True)),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='tree.familymember')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='tree.familymember')),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineage', to='tree.tree')),
+            ],
+            options={
+                'verbose_name': 'Member Lineage',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='tree_member_descend_09fc18_idx'), models.Index(fields=['ancestor', 'depth'], name='tree_member_ancesto_95aaa9_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0004_memberlineage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['tree', 'last_name', 'first_name', 'id'], name='tree_family_tree_id_370219_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familyupdate',
+            index=models.Index(fields=['tree', '-created_at'], name='tree_family_tree_id_e8deb2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='updatecomment',
+            index=models.Index(fields=['update', 'created_at'], name='tree_update_update__0a7159_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tree_access(apps, schema_editor):
+    Tree = apps.get_model('tree', 'Tree')
+    TreePermission = apps.get_model('tree', 'TreePermission')
+    TreeAccess = apps.get_model('tree', 'TreeAccess')
+    access = {(user_id, tree_id): '' for tree_id, user_id in Tree.objects.values_list('pk', 'created_by_id')}
+    for tree_id, user_id, role in TreePermission.objects.filter(
+        status='active'
+    ).values_list('tree_id', 'user_id', 'role'):
+        access[(user_id, tree_id)] = role
+    TreeAccess.objects.bulk_create(
+        [TreeAccess(user_id=u, tree_id=t, role=r) for (u, t), r in access.items()],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0005_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TreeAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, max_length=20)),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='tree.tree')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tree_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tree Access',
+                'indexes': [models.Index(fields=['user', 'role', 'tree'], name='tree_treeac_user_id_9f11b5_idx')],
+                'unique_together': {('user', 'tree')},
+            },
+        ),
+        migrations.RunPython(backfill_tree_access, migrations.RunPython.noop),
+    ]
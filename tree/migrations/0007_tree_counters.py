@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, tree_field, **filters):
+    return Coalesce(Subquery(
+        queryset.filter(**{tree_field: OuterRef('pk')}, **filters)
+        .order_by().values(tree_field).annotate(n=Count('pk')).values('n')
+    ), Value(0))
+
+
+def backfill_counters(apps, schema_editor):
+    Tree = apps.get_model('tree', 'Tree')
+    FamilyMember = apps.get_model('tree', 'FamilyMember')
+    FamilyRelationship = apps.get_model('tree', 'FamilyRelationship')
+    FamilyPhoto = apps.get_model('tree', 'FamilyPhoto')
+    Tree.objects.update(
+        member_count=_count(FamilyMember.objects, 'tree_id'),
+        living_count=_count(FamilyMember.objects, 'tree_id', is_alive=True),
+        relationship_count=_count(FamilyRelationship.objects, 'from_member__tree_id'),
+        photo_count=_count(FamilyPhoto.objects, 'tree_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0006_treeaccess'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tree',
+            name='living_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tree',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tree',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tree',
+            name='relationship_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
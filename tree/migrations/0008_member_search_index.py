@@ -0,0 +1,61 @@
+"""
+Full-text member search table (see tree/search.py): an FTS5 virtual table on
+SQLite, a tsvector table with a GIN index on PostgreSQL, nothing elsewhere.
+"""
+
+from django.db import migrations
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE tree_member_search USING fts5("
+    "first_name, last_name, nickname, biography, current_location, tree_id UNINDEXED, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+SQLITE_FILL = (
+    "INSERT INTO tree_member_search "
+    "(rowid, first_name, last_name, nickname, biography, current_location, tree_id) "
+    "SELECT id, first_name, last_name, nickname, biography, current_location, tree_id "
+    "FROM tree_familymember"
+)
+
+POSTGRES_CREATE = (
+    "CREATE TABLE tree_member_search ("
+    "member_id bigint PRIMARY KEY REFERENCES tree_familymember (id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "tree_id bigint NOT NULL, "
+    "document tsvector NOT NULL)"
+)
+POSTGRES_INDEX = "CREATE INDEX tree_member_search_document ON tree_member_search USING GIN (document)"
+POSTGRES_FILL = (
+    "INSERT INTO tree_member_search (member_id, tree_id, document) "
+    "SELECT id, tree_id, "
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')"
+    " || ' ' || coalesce(nickname, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(current_location, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(biography, '')), 'C') "
+    "FROM tree_familymember"
+)
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': [SQLITE_CREATE, SQLITE_FILL],
+        'postgresql': [POSTGRES_CREATE, POSTGRES_INDEX, POSTGRES_FILL],
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS tree_member_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0007_tree_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
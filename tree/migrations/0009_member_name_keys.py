@@ -0,0 +1,98 @@
+"""
+Indexed name keys on FamilyMember (see tree/names.py), backfilled for
+existing members.
+"""
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from tree.names import backfill_name_keys
+    FamilyMember = apps.get_model('tree', 'FamilyMember')
+    backfill_name_keys(FamilyMember.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0008_member_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='familymember',
+            name='first_name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='first_name_latin',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='first_name_metaphone',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='first_name_metaphone_alt',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='first_name_soundex',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='last_name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='last_name_latin',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='last_name_metaphone',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='last_name_metaphone_alt',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='last_name_soundex',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='maiden_name_folded',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='maiden_name_latin',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='maiden_name_metaphone',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='maiden_name_metaphone_alt',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='maiden_name_soundex',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,255 @@
+"""
+Store member birth/death dates inline on FamilyMember instead of through
+FuzzyDate foreign keys. Existing dates are copied in batches, with their
+day-number range and anniversary columns, and the FuzzyDate rows they used
+are deleted unless a pending change request still refers to them.
+
+The day-number computation is copied from tree/dates.py as it stood for
+this migration, so later changes there do not alter what it writes.
+"""
+
+import calendar
+import datetime
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+SIDES = ('birth', 'death')
+APPROXIMATE_YEARS = 5
+DAYS_BEFORE_CE = 366
+
+
+def day_number(year, month=1, day=1, bce=False):
+    if not bce:
+        return datetime.date(min(year, datetime.MAXYEAR), month, day).toordinal()
+    day_of_year = datetime.date(2000, month, day).timetuple().tm_yday - 1
+    return day_of_year - year * DAYS_BEFORE_CE
+
+
+def year_bounds(year, bce):
+    return day_number(year, 1, 1, bce), day_number(year, 12, 31, bce)
+
+
+def shift(year, bce, years):
+    signed = (1 - year if bce else year) + years
+    return (1 - signed, True) if signed < 1 else (signed, False)
+
+
+def fuzzy_range(value, precision, bce):
+    """(earliest, latest) day numbers; None on an open or unknown side."""
+    if value is None or precision in ('', 'unknown'):
+        return None, None
+    year, month, day = value.year, value.month, value.day
+    if precision == 'exact':
+        point = day_number(year, month, day, bce)
+        return point, point
+    if precision == 'month_year':
+        last = calendar.monthrange(2000 if bce else year, month)[1]
+        return day_number(year, month, 1, bce), day_number(year, month, last, bce)
+    if precision == 'decade':
+        if bce:
+            start = -(-year // 10) * 10
+            return year_bounds(start, True)[0], year_bounds(start - 9, True)[1]
+        return year_bounds(max(year - year % 10, 1), False)[0], year_bounds(year - year % 10 + 9, False)[1]
+    if precision == 'approximate':
+        low = year_bounds(*shift(year, bce, -APPROXIMATE_YEARS))[0]
+        return low, year_bounds(*shift(year, bce, APPROXIMATE_YEARS))[1]
+    if precision == 'before':
+        return None, day_number(year, month, day, bce)
+    if precision == 'after':
+        return day_number(year, month, day, bce), None
+    return year_bounds(year, bce)  # 'year'
+
+
+def anniversary(value, precision):
+    if value is None or precision not in ('exact', 'month_year'):
+        return None, None
+    return value.month, value.day if precision == 'exact' else None
+
+
+def _pending_date_ids(ChangeRequest):
+    ids = set()
+    for value in ChangeRequest.objects.filter(
+        status='pending', field_name__in=('birth_date', 'death_date'),
+    ).values_list('new_value', flat=True):
+        if str(value).isdigit():
+            ids.add(int(value))
+    return ids
+
+
+def inline_dates(apps, schema_editor):
+    FamilyMember = apps.get_model('tree', 'FamilyMember')
+    FuzzyDate = apps.get_model('tree', 'FuzzyDate')
+    ChangeRequest = apps.get_model('tree', 'ChangeRequest')
+
+    columns = [
+        f'{side}_{column}' for side in SIDES for column in (
+            'date_value', 'date_precision', 'date_bce', 'date_text',
+            'date_low', 'date_high', 'month', 'day',
+        )
+    ]
+    used, last_pk = set(), 0
+    while True:
+        batch = list(
+            FamilyMember.objects.filter(pk__gt=last_pk).exclude(
+                birth_date__isnull=True, death_date__isnull=True,
+            ).select_related('birth_date', 'death_date').order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for member in batch:
+            for side in SIDES:
+                fuzzy = getattr(member, f'{side}_date')
+                if fuzzy is None:
+                    continue
+                used.add(fuzzy.pk)
+                low, high = fuzzy_range(fuzzy.date, fuzzy.precision, fuzzy.bce)
+                month, day = anniversary(fuzzy.date, fuzzy.precision)
+                for column, value in (
+                    ('date_value', fuzzy.date), ('date_precision', fuzzy.precision or 'exact'),
+                    ('date_bce', fuzzy.bce), ('date_text', fuzzy.display_text),
+                    ('date_low', low), ('date_high', high), ('month', month), ('day', day),
+                ):
+                    setattr(member, f'{side}_{column}', value)
+        FamilyMember.objects.bulk_update(batch, columns)
+        last_pk = batch[-1].pk
+
+    orphaned = sorted(used - _pending_date_ids(ChangeRequest))
+    for start in range(0, len(orphaned), BATCH_SIZE):
+        FuzzyDate.objects.filter(pk__in=orphaned[start:start + BATCH_SIZE]).delete()
+
+
+def restore_foreign_keys(apps, schema_editor):
+    FamilyMember = apps.get_model('tree', 'FamilyMember')
+    FuzzyDate = apps.get_model('tree', 'FuzzyDate')
+    last_pk = 0
+    while True:
+        batch = list(
+            FamilyMember.objects.filter(pk__gt=last_pk).exclude(
+                birth_date_precision='', death_date_precision='',
+            ).order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        links = []
+        for member in batch:
+            for side in SIDES:
+                if getattr(member, f'{side}_date_precision'):
+                    links.append((member, side, FuzzyDate(
+                        date=getattr(member, f'{side}_date_value'),
+                        precision=getattr(member, f'{side}_date_precision'),
+                        bce=getattr(member, f'{side}_date_bce'),
+                        display_text=getattr(member, f'{side}_date_text'),
+                    )))
+        FuzzyDate.objects.bulk_create([fuzzy for _, _, fuzzy in links])
+        for member, side, fuzzy in links:
+            setattr(member, f'{side}_date', fuzzy)
+        FamilyMember.objects.bulk_update(batch, ['birth_date', 'death_date'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0009_member_name_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_value',
+            field=models.DateField(blank=True, null=True, verbose_name='Date of Birth'),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_precision',
+            field=models.CharField(blank=True, choices=[('exact', 'Exact date'), ('month_year', 'Month & Year only'), ('year', 'Year only'), ('decade', 'Decade (e.g. 1940s)'), ('approximate', 'Approximate (~)'), ('before', 'Before a date'), ('after', 'After a date'), ('unknown', 'Unknown')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_bce',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_text',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_low',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_date_high',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='birth_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_value',
+            field=models.DateField(blank=True, null=True, verbose_name='Date of Death'),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_precision',
+            field=models.CharField(blank=True, choices=[('exact', 'Exact date'), ('month_year', 'Month & Year only'), ('year', 'Year only'), ('decade', 'Decade (e.g. 1940s)'), ('approximate', 'Approximate (~)'), ('before', 'Before a date'), ('after', 'After a date'), ('unknown', 'Unknown')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_bce',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_text',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_low',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_date_high',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='familymember',
+            name='death_day',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(inline_dates, restore_foreign_keys),
+        migrations.RemoveField(
+            model_name='familymember',
+            name='birth_date',
+        ),
+        migrations.RemoveField(
+            model_name='familymember',
+            name='death_date',
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['birth_month', 'birth_day'], name='tree_member_birthday_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['tree', 'birth_date_low'], name='tree_member_born_idx'),
+        ),
+    ]
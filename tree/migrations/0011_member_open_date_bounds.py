@@ -0,0 +1,68 @@
+"""
+Open 'before'/'after' member dates bounded by MIN_DAY/MAX_DAY instead of
+NULL, so date-range filters are index range scans.
+
+The day-number computation is copied from tree/dates.py as it stood for
+this migration, so later changes there do not alter what it writes.
+"""
+
+import datetime
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+DAYS_BEFORE_CE = 366
+MIN_DAY = -(2 ** 31 - 1)
+MAX_DAY = 2 ** 31 - 1
+
+
+def day_number(year, month, day, bce):
+    if not bce:
+        return datetime.date(min(year, datetime.MAXYEAR), month, day).toordinal()
+    day_of_year = datetime.date(2000, month, day).timetuple().tm_yday - 1
+    return day_of_year - year * DAYS_BEFORE_CE
+
+
+def bound_open_dates(apps, schema_editor):
+    FamilyMember = apps.get_model('tree', 'FamilyMember')
+    for side in ('birth', 'death'):
+        open_dates = FamilyMember.objects.filter(**{
+            f'{side}_date_precision__in': ('before', 'after'),
+            f'{side}_date_value__isnull': False,
+        })
+        last_pk = 0
+        while True:
+            batch = list(open_dates.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+            if not batch:
+                break
+            for member in batch:
+                value = getattr(member, f'{side}_date_value')
+                point = day_number(value.year, value.month, value.day, getattr(member, f'{side}_date_bce'))
+                before = getattr(member, f'{side}_date_precision') == 'before'
+                setattr(member, f'{side}_date_low', MIN_DAY if before else point)
+                setattr(member, f'{side}_date_high', point if before else MAX_DAY)
+            FamilyMember.objects.bulk_update(batch, [f'{side}_date_low', f'{side}_date_high'])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0010_member_inline_dates'),
+    ]
+
+    operations = [
+        migrations.RunPython(bound_open_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['tree', 'birth_date_high'], name='tree_member_born_high_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['tree', 'death_date_low'], name='tree_member_died_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='familymember',
+            index=models.Index(fields=['tree', 'death_date_high'], name='tree_member_died_high_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0011_member_open_date_bounds'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GedcomImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, upload_to='gedcom/')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gedcom_imports', to=settings.AUTH_USER_MODEL)),
+                ('tree', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gedcom_imports', to='tree.tree')),
+            ],
+            options={
+                'verbose_name': 'GEDCOM Import',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
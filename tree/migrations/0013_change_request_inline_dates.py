@@ -0,0 +1,46 @@
+"""
+Change requests store a proposed birth/death date as its values
+({date, precision, bce, display_text}) instead of a FuzzyDate id. Ids that
+0010 left on pending change requests are replaced by the row's values,
+then the FuzzyDate rows are deleted: nothing refers to them any more.
+"""
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def inline_change_request_dates(apps, schema_editor):
+    ChangeRequest = apps.get_model('tree', 'ChangeRequest')
+    FuzzyDate = apps.get_model('tree', 'FuzzyDate')
+
+    requests = [
+        request for request in ChangeRequest.objects.filter(
+            field_name__in=('birth_date', 'death_date'),
+        ).only('pk', 'new_value')
+        if str(request.new_value).isdigit()
+    ]
+    dates = FuzzyDate.objects.in_bulk({int(request.new_value) for request in requests})
+    # 0010 kept only the rows of pending requests; reviewed ones keep their id
+    requests = [request for request in requests if int(request.new_value) in dates]
+    for request in requests:
+        fuzzy = dates[int(request.new_value)]
+        request.new_value = {
+            'date': fuzzy.date.isoformat() if fuzzy.date else None,
+            'precision': fuzzy.precision,
+            'bce': fuzzy.bce,
+            'display_text': fuzzy.display_text,
+        }
+    ChangeRequest.objects.bulk_update(requests, ['new_value'], batch_size=BATCH_SIZE)
+    FuzzyDate.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tree', '0012_gedcom_import'),
+    ]
+
+    operations = [
+        migrations.RunPython(inline_change_request_dates, migrations.RunPython.noop),
+    ]
@@ -5,17 +5,19 @@ Core models for the family tree system including:
 - FuzzyDate: handles approximate/partial/BCE dates
 - Tree & TreePermission: tree containers and access control
 - FamilyMember & FamilyRelationship: people and their connections
+- MemberLineage: ancestor/descendant closure over parent links
 - ChangeRequest & ChangeRequestValidator: change governance workflow
 - MemberPrivacySettings: field-level privacy controls
 - FamilyPhoto & PhotoTag: media management
 - FamilyUpdate, UpdateComment, UpdateLike: social feed
 - TreeInvitation: invite-by-email flow
+- GedcomImport: background GEDCOM uploads
 """
 
 import secrets
 from django.db import models
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -51,6 +53,29 @@ class FuzzyDate(models.Model):
         max_length=100, blank=True,
         help_text='Optional custom display text, e.g. "circa 1920s"'
     )
+    # Earliest/latest day number the date may stand for (tree/dates.py).
+    # Computed, not stored: queries filter on the member's inline
+    # *_date_low/*_date_high columns, nothing references FuzzyDate rows.
+    # Dates are used as unsaved values only; the table is kept empty.
+    @property
+    def earliest_ordinal(self):
+        from .dates import fuzzy_range
+        return fuzzy_range(self.date, self.precision, self.bce)[0]
+
+    @property
+    def latest_ordinal(self):
+        from .dates import fuzzy_range
+        return fuzzy_range(self.date, self.precision, self.bce)[1]
+
+    def as_value(self):
+        """The date's fields as JSON, the way change requests store a date."""
+        date = models.DateField().to_python(self.date)
+        return {
+            'date': date.isoformat() if date else None,
+            'precision': self.precision,
+            'bce': self.bce,
+            'display_text': self.display_text,
+        }
 
     def __str__(self):
         if self.display_text:
@@ -163,6 +188,16 @@ class Tree(models.Model):
         help_text='Optional family motto or crest description'
     )
 
+    # ── Denormalized counters (see tree/counters.py) ────────────────────────
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    living_count = models.PositiveIntegerField(default=0, editable=False)
+    relationship_count = models.PositiveIntegerField(default=0, editable=False)
+    photo_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        from .counters import COUNTER_FIELDS, without_counters
+        super().save(*args, **without_counters(self, COUNTER_FIELDS, kwargs))
+
     def __str__(self):
         return self.name
 
@@ -213,6 +248,30 @@ class TreePermission(models.Model):
         return f'{self.user.username} — {self.tree.name} ({self.role})'
 
 
+class TreeAccess(models.Model):
+    """
+    Denormalized "who can see which tree": one row per (user, tree) where the
+    user created the tree or holds an active TreePermission. ``role`` is the
+    permission's role, or blank for a creator without one. Maintained by the
+    signals at the bottom of this module; never edit directly.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tree_access'
+    )
+    tree = models.ForeignKey(Tree, on_delete=models.CASCADE, related_name='access')
+    role = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        unique_together = ('user', 'tree')
+        indexes = [
+            models.Index(fields=['user', 'role', 'tree']),
+        ]
+        verbose_name = 'Tree Access'
+
+    def __str__(self):
+        return f'{self.user_id} → {self.tree_id} ({self.role or "creator"})'
+
+
 # ---------------------------------------------------------------------------
 # FamilyMember
 # ---------------------------------------------------------------------------
@@ -254,21 +313,31 @@ class FamilyMember(models.Model):
         max_length=20, choices=GENDER_CHOICES, blank=True
     )
 
-    # Dates using FuzzyDate for genealogical precision
-    birth_date = models.ForeignKey(
-        FuzzyDate,
-        on_delete=models.SET_NULL,
-        null=True, blank=True,
-        related_name='member_births',
-        verbose_name='Date of Birth'
-    )
-    death_date = models.ForeignKey(
-        FuzzyDate,
-        on_delete=models.SET_NULL,
-        null=True, blank=True,
-        related_name='member_deaths',
-        verbose_name='Date of Death'
-    )
+    # Birth and death dates, stored inline in FuzzyDate's shape (read and
+    # written through the birth_date / death_date properties). An empty
+    # precision means no date is recorded. _low/_high are the sortable day
+    # range and month/day the anniversary, both derived on save (tree/dates.py).
+    birth_date_value = models.DateField(null=True, blank=True, verbose_name='Date of Birth')
+    birth_date_precision = models.CharField(
+        max_length=20, choices=FuzzyDate.PRECISION_CHOICES, blank=True
+    )
+    birth_date_bce = models.BooleanField(default=False)
+    birth_date_text = models.CharField(max_length=100, blank=True)
+    birth_date_low = models.IntegerField(null=True, blank=True, editable=False)
+    birth_date_high = models.IntegerField(null=True, blank=True, editable=False)
+    birth_month = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    birth_day = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+
+    death_date_value = models.DateField(null=True, blank=True, verbose_name='Date of Death')
+    death_date_precision = models.CharField(
+        max_length=20, choices=FuzzyDate.PRECISION_CHOICES, blank=True
+    )
+    death_date_bce = models.BooleanField(default=False)
+    death_date_text = models.CharField(max_length=100, blank=True)
+    death_date_low = models.IntegerField(null=True, blank=True, editable=False)
+    death_date_high = models.IntegerField(null=True, blank=True, editable=False)
+    death_month = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    death_day = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
 
     # Location information
     birth_location = models.CharField(max_length=255, blank=True)
@@ -334,6 +403,90 @@ class FamilyMember(models.Model):
         help_text='Whether to show calculated age on this member\'s profile'
     )
 
+    # Normalized name keys for ?name_like= (see tree/names.py) — derived
+    # from the name fields on save, never edited directly
+    first_name_folded = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    first_name_latin = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    first_name_metaphone = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    first_name_metaphone_alt = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    first_name_soundex = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    last_name_folded = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    last_name_latin = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    last_name_metaphone = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    last_name_metaphone_alt = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    last_name_soundex = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    maiden_name_folded = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    maiden_name_latin = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    maiden_name_metaphone = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    maiden_name_metaphone_alt = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+    maiden_name_soundex = models.CharField(max_length=4, blank=True, editable=False, db_index=True)
+
+    DATE_SIDES = ('birth', 'death')
+    DATE_COLUMNS = ('value', 'precision', 'bce', 'text')
+    DERIVED_DATE_COLUMNS = ('date_low', 'date_high', 'month', 'day')
+
+    def _get_date(self, side):
+        precision = getattr(self, f'{side}_date_precision')
+        if not precision:
+            return None
+        return FuzzyDate(
+            date=getattr(self, f'{side}_date_value'), precision=precision,
+            bce=getattr(self, f'{side}_date_bce'), display_text=getattr(self, f'{side}_date_text'),
+        )
+
+    def _set_date(self, side, fuzzy):
+        """Store a FuzzyDate (saved or not) or None inline."""
+        # An unsaved FuzzyDate may still hold its date as an ISO string
+        value = models.DateField().to_python(fuzzy.date) if fuzzy else None
+        setattr(self, f'{side}_date_value', value)
+        setattr(self, f'{side}_date_precision', (fuzzy.precision or 'exact') if fuzzy else '')
+        setattr(self, f'{side}_date_bce', fuzzy.bce if fuzzy else False)
+        setattr(self, f'{side}_date_text', fuzzy.display_text if fuzzy else '')
+        self._derive_date(side)
+
+    def _derive_date(self, side):
+        from .dates import anniversary, fuzzy_range
+        value = getattr(self, f'{side}_date_value')
+        precision = getattr(self, f'{side}_date_precision')
+        low, high = fuzzy_range(value, precision, getattr(self, f'{side}_date_bce'))
+        month, day = anniversary(value, precision)
+        for column, derived in zip(self.DERIVED_DATE_COLUMNS, (low, high, month, day)):
+            setattr(self, f'{side}_{column}', derived)
+
+    @property
+    def birth_date(self):
+        """The birth date as an unsaved FuzzyDate, or None."""
+        return self._get_date('birth')
+
+    @birth_date.setter
+    def birth_date(self, value):
+        self._set_date('birth', value)
+
+    @property
+    def death_date(self):
+        """The death date as an unsaved FuzzyDate, or None."""
+        return self._get_date('death')
+
+    @death_date.setter
+    def death_date(self, value):
+        self._set_date('death', value)
+
+    def save(self, *args, **kwargs):
+        from .names import KEY_FIELDS, NAME_FIELDS, set_name_keys
+        set_name_keys(self)
+        for side in self.DATE_SIDES:
+            self._derive_date(side)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if update_fields & set(NAME_FIELDS):
+                update_fields.update(KEY_FIELDS)
+            for side in self.DATE_SIDES:
+                if update_fields & {f'{side}_date_{column}' for column in self.DATE_COLUMNS}:
+                    update_fields.update(f'{side}_{column}' for column in self.DERIVED_DATE_COLUMNS)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         parts = [self.first_name]
@@ -344,16 +497,35 @@ class FamilyMember(models.Model):
 
     @property
     def display_name(self):
-        name = self.preferred_name or self.first_name
-        if self.nickname:
-            return f"{name} '{self.nickname}' {self.last_name}"
-        return f"{name} {self.last_name}"
+        return self.format_display_name(
+            self.first_name, self.preferred_name, self.nickname, self.last_name
+        )
+
+    @staticmethod
+    def format_display_name(first_name, preferred_name, nickname, last_name):
+        """Build a display name from raw column values (used by values_list readers)."""
+        name = preferred_name or first_name
+        if nickname:
+            return f"{name} '{nickname}' {last_name}"
+        return f"{name} {last_name}"
 
     @property
     def name(self):
         """Backward-compatible alias for full_name."""
         return self.full_name
 
+    @property
+    def parent_ids(self):
+        """PKs of this member's parents, from either direction of the link."""
+        return sorted(
+            set(self.relationships_to.filter(
+                relationship_type__in=('parent', 'adoptive_parent')
+            ).values_list('from_member_id', flat=True)) |
+            set(self.relationships_from.filter(
+                relationship_type__in=('child', 'adopted_child')
+            ).values_list('to_member_id', flat=True))
+        )
+
     @property
     def deceased(self):
         return self.death_date is not None
@@ -387,6 +559,16 @@ class FamilyMember(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Keyset pagination of a tree's member list
+            models.Index(fields=['tree', 'last_name', 'first_name', 'id']),
+            # Birthday lookups and date-range sorting / filtering
+            models.Index(fields=['birth_month', 'birth_day'], name='tree_member_birthday_idx'),
+            models.Index(fields=['tree', 'birth_date_low'], name='tree_member_born_idx'),
+            models.Index(fields=['tree', 'birth_date_high'], name='tree_member_born_high_idx'),
+            models.Index(fields=['tree', 'death_date_low'], name='tree_member_died_idx'),
+            models.Index(fields=['tree', 'death_date_high'], name='tree_member_died_high_idx'),
+        ]
 
 
 # ---------------------------------------------------------------------------
@@ -475,6 +657,42 @@ class FamilyRelationship(models.Model):
         )
 
 
+# ---------------------------------------------------------------------------
+# MemberLineage — ancestor/descendant closure over parent links
+# ---------------------------------------------------------------------------
+
+class MemberLineage(models.Model):
+    """
+    One row per (ancestor, descendant) pair reachable through parent/child
+    relationships, so ancestry questions are a single indexed lookup instead
+    of a recursive walk. Maintained by tree/lineage.py — never edit by hand.
+    """
+    tree = models.ForeignKey(
+        Tree, on_delete=models.CASCADE, related_name='lineage'
+    )
+    ancestor = models.ForeignKey(
+        FamilyMember, on_delete=models.CASCADE, related_name='descendant_links'
+    )
+    descendant = models.ForeignKey(
+        FamilyMember, on_delete=models.CASCADE, related_name='ancestor_links'
+    )
+    # Generations along the shortest path (1 = parent)
+    depth = models.PositiveSmallIntegerField()
+    # True if at least one path uses only biological parent links
+    via_biological = models.BooleanField(default=True)
+
+    class Meta:
+        unique_together = ['ancestor', 'descendant']
+        verbose_name = 'Member Lineage'
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+            models.Index(fields=['ancestor', 'depth']),
+        ]
+
+    def __str__(self):
+        return f'{self.ancestor_id} → {self.descendant_id} ({self.depth})'
+
+
 # ---------------------------------------------------------------------------
 # MemberPrivacySettings — field-level privacy per member
 # ---------------------------------------------------------------------------
@@ -773,6 +991,13 @@ class FamilyUpdate(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Family Update'
+        indexes = [
+            models.Index(fields=['tree', '-created_at']),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .counters import UPDATE_COUNTER_FIELDS, without_counters
+        super().save(*args, **without_counters(self, UPDATE_COUNTER_FIELDS, kwargs))
 
     def __str__(self):
         return f'{self.title} ({self.get_update_type_display()})'
@@ -791,6 +1016,9 @@ class UpdateComment(models.Model):
     class Meta:
         ordering = ['created_at']
         verbose_name = 'Update Comment'
+        indexes = [
+            models.Index(fields=['update', 'created_at']),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} on "{self.update.title}"'
@@ -874,6 +1102,48 @@ class TreeInvitation(models.Model):
         verbose_name = 'Tree Invitation'
 
 
+# ---------------------------------------------------------------------------
+# GedcomImport — an uploaded GEDCOM file imported in the background
+# ---------------------------------------------------------------------------
+
+class GedcomImport(models.Model):
+    """
+    One GEDCOM upload, imported by the ``tree.tasks.import_gedcom_file``
+    task. The upload is kept only until the import finishes; ``stats``
+    holds the final totals (running totals are read from the cache, see
+    tree/gedcom.py).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done',    'Done'),
+        ('failed',  'Failed'),
+    ]
+
+    tree = models.ForeignKey(
+        Tree, on_delete=models.CASCADE, related_name='gedcom_imports'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='gedcom_imports'
+    )
+    file = models.FileField(upload_to='gedcom/', blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='pending'
+    )
+    stats = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'GEDCOM import into {self.tree.name} ({self.status})'
+
+    class Meta:
+        verbose_name = 'GEDCOM Import'
+        ordering = ['-created_at']
+
+
 # ---------------------------------------------------------------------------
 # Legacy Update model (kept for DB compatibility — superseded by FamilyUpdate)
 # ---------------------------------------------------------------------------
@@ -903,32 +1173,228 @@ class Update(models.Model):
 
 @receiver(post_save, sender=FamilyMember)
 def create_member_privacy_settings(sender, instance, created, **kwargs):
-    """Automatically create privacy settings for every new family member."""
+    """Create privacy settings for every new family member, in the background."""
     if created:
-        MemberPrivacySettings.objects.get_or_create(member=instance)
+        from .tasks import create_privacy_settings
+        create_privacy_settings.enqueue(instance.pk, key=f'privacy_settings:{instance.pk}')
+
 
+# Like/comment counters are bumped in one UPDATE each (see tree/counters.py).
+# The new value is left on a created like so the like toggle can return it;
+# the toggle unlikes through counters.remove_like, which skips these signals.
 
 @receiver(post_save, sender=UpdateLike)
 def update_likes_count(sender, instance, created, **kwargs):
+    from .counters import bump_counter
     if created:
-        instance.update.likes_count = instance.update.likes.count()
-        instance.update.save(update_fields=['likes_count'])
+        instance.likes_count = bump_counter(FamilyUpdate, instance.update_id, 'likes_count', 1)
 
 
 @receiver(post_delete, sender=UpdateLike)
 def decrease_likes_count(sender, instance, **kwargs):
-    instance.update.likes_count = instance.update.likes.count()
-    instance.update.save(update_fields=['likes_count'])
+    from .counters import bump_counter
+    instance.likes_count = bump_counter(FamilyUpdate, instance.update_id, 'likes_count', -1)
 
 
 @receiver(post_save, sender=UpdateComment)
 def update_comments_count(sender, instance, created, **kwargs):
+    from .counters import bump_counter
     if created:
-        instance.update.comments_count = instance.update.comments.count()
-        instance.update.save(update_fields=['comments_count'])
+        bump_counter(FamilyUpdate, instance.update_id, 'comments_count', 1)
 
 
 @receiver(post_delete, sender=UpdateComment)
 def decrease_comments_count(sender, instance, **kwargs):
-    instance.update.comments_count = instance.update.comments.count()
-    instance.update.save(update_fields=['comments_count'])
+    from .counters import bump_counter
+    bump_counter(FamilyUpdate, instance.update_id, 'comments_count', -1)
+
+
+# ---------------------------------------------------------------------------
+# Signals — relationship changes: lineage closure & cached graph indexes
+# ---------------------------------------------------------------------------
+
+
+@receiver(pre_save, sender=FamilyRelationship)
+def store_old_relationship(sender, instance, **kwargs):
+    """Remember the previous endpoints so an edited link refreshes both sides."""
+    instance._old_lineage = None
+    if instance.pk:
+        instance._old_lineage = FamilyRelationship.objects.filter(pk=instance.pk).values_list(
+            'relationship_type', 'from_member_id', 'to_member_id'
+        ).first()
+
+
+@receiver(post_save, sender=FamilyRelationship)
+def relationship_saved(sender, instance, **kwargs):
+    from .cache import bump_tree_version
+    from .lineage import link_child, refresh_lineage
+    tree_id = instance.from_member.tree_id
+    bump_tree_version(tree_id)
+
+    # Only the child of a parent link (and those below it) gains or loses ancestors
+    old = getattr(instance, '_old_lineage', None)
+    member_ids = {
+        link_child(instance.relationship_type, instance.from_member_id, instance.to_member_id),
+        old and link_child(*old),
+    } - {None}
+    if member_ids:
+        refresh_lineage(tree_id, member_ids)
+
+
+@receiver(post_delete, sender=FamilyRelationship)
+def relationship_deleted(sender, instance, **kwargs):
+    """
+    The lineage refresh is deferred to commit: when a member is deleted its
+    relationships go first, and the member row must be gone before the
+    closure is recomputed.
+    """
+    from django.db import transaction
+    from .cache import bump_tree_version
+    from .lineage import link_child, refresh_lineage
+    member_ids = (instance.from_member_id, instance.to_member_id)
+    tree_id = FamilyMember.objects.filter(pk__in=member_ids).values_list('tree_id', flat=True).first()
+    if tree_id is None:
+        return
+    bump_tree_version(tree_id)
+    child_id = link_child(instance.relationship_type, *member_ids)
+    if child_id is not None:
+        transaction.on_commit(lambda: refresh_lineage(tree_id, [child_id]))
+
+
+# ---------------------------------------------------------------------------
+# Signals — permission changes: request-scoped role cache
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=TreePermission)
+@receiver(post_delete, sender=TreePermission)
+def tree_permission_changed(sender, instance, **kwargs):
+    from .access import forget_tree_roles
+    forget_tree_roles(instance.user_id)
+
+
+# ---------------------------------------------------------------------------
+# Signals — TreeAccess visibility table
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Tree)
+def store_old_tree_creator(sender, instance, **kwargs):
+    instance._old_created_by_id = (
+        Tree.objects.filter(pk=instance.pk).values_list('created_by_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Tree)
+def tree_creator_access(sender, instance, **kwargs):
+    from .access import sync_tree_access
+    old = getattr(instance, '_old_created_by_id', None)
+    for user_id in {old, instance.created_by_id} - {None}:
+        sync_tree_access(instance.pk, user_id)
+
+
+@receiver(post_save, sender=TreePermission)
+def tree_permission_access(sender, instance, **kwargs):
+    from .access import sync_tree_access
+    sync_tree_access(instance.tree_id, instance.user_id)
+
+
+@receiver(post_delete, sender=TreePermission)
+def tree_permission_access_removed(sender, instance, **kwargs):
+    from .access import sync_tree_access
+    # May run while the tree itself is being deleted: only shrink access here
+    sync_tree_access(instance.tree_id, instance.user_id, create=False)
+
+
+# ---------------------------------------------------------------------------
+# Signals — full-text search index (see tree/search.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=FamilyMember)
+def member_search_saved(sender, instance, **kwargs):
+    from .search import index_members
+    index_members([instance.pk])
+
+
+@receiver(post_delete, sender=FamilyMember)
+def member_search_deleted(sender, instance, **kwargs):
+    from .search import unindex_members
+    unindex_members([instance.pk])
+
+
+# ---------------------------------------------------------------------------
+# Signals — member cache version (duplicate scans, see tree/duplicates.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=FamilyMember)
+@receiver(post_delete, sender=FamilyMember)
+def member_cache_changed(sender, instance, **kwargs):
+    from .cache import bump_tree_version
+    bump_tree_version(instance.tree_id, scope='members')
+
+
+# ---------------------------------------------------------------------------
+# Signals — denormalized Tree counters
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=FamilyMember)
+def store_old_member_state(sender, instance, **kwargs):
+    instance._old_counted = (
+        FamilyMember.objects.filter(pk=instance.pk).values_list('tree_id', 'is_alive').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=FamilyMember)
+def member_counters_saved(sender, instance, created, **kwargs):
+    from .counters import bump_tree_counters
+    old = None if created else getattr(instance, '_old_counted', None)
+    new = (instance.tree_id, instance.is_alive)
+    if old == new:
+        return
+    if old and old[0] == new[0]:
+        bump_tree_counters(new[0], living_count=int(new[1]) - int(old[1]))
+        return
+    if old:
+        bump_tree_counters(old[0], member_count=-1, living_count=-int(old[1]))
+    bump_tree_counters(new[0], member_count=1, living_count=int(new[1]))
+
+
+@receiver(post_delete, sender=FamilyMember)
+def member_counters_deleted(sender, instance, **kwargs):
+    from .counters import bump_tree_counters
+    bump_tree_counters(instance.tree_id, member_count=-1, living_count=-int(instance.is_alive))
+
+
+@receiver(post_save, sender=FamilyRelationship)
+def relationship_counter_saved(sender, instance, created, **kwargs):
+    from .counters import bump_tree_counters
+    old = getattr(instance, '_old_lineage', None)
+    if created:
+        bump_tree_counters(instance.from_member.tree_id, relationship_count=1)
+    elif old and old[1] != instance.from_member_id:
+        old_tree = FamilyMember.objects.filter(pk=old[1]).values_list('tree_id', flat=True).first()
+        if old_tree != instance.from_member.tree_id:
+            bump_tree_counters(old_tree, relationship_count=-1)
+            bump_tree_counters(instance.from_member.tree_id, relationship_count=1)
+
+
+@receiver(post_delete, sender=FamilyRelationship)
+def relationship_counter_deleted(sender, instance, **kwargs):
+    from .counters import bump_tree_counters
+    tree_id = FamilyMember.objects.filter(
+        pk=instance.from_member_id
+    ).values_list('tree_id', flat=True).first()
+    bump_tree_counters(tree_id, relationship_count=-1)
+
+
+@receiver(post_save, sender=FamilyPhoto)
+def photo_counter_saved(sender, instance, created, **kwargs):
+    from .counters import bump_tree_counters
+    if created:
+        bump_tree_counters(instance.tree_id, photo_count=1)
+
+
+@receiver(post_delete, sender=FamilyPhoto)
+def photo_counter_deleted(sender, instance, **kwargs):
+    from .counters import bump_tree_counters
+    bump_tree_counters(instance.tree_id, photo_count=-1)
@@ -0,0 +1,149 @@
+"""
+tree/search.py — Full-text member search index
+
+Members are indexed in a side table built for the database in use:
+- SQLite: an FTS5 virtual table (rowid = member id) with prefix indexes and
+  diacritic folding,
+- PostgreSQL: one weighted ``tsvector`` per member under a GIN index.
+Names weigh most, then location, then biography. Every query term is a
+prefix match, so the same lookup serves autocomplete.
+
+The FamilyMember signals refresh the rows of saved/deleted members; bulk
+writers that bypass signals call index_members / reindex_tree themselves.
+On other backends search_backend() is None and callers fall back to
+``icontains``.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'tree_member_search'
+CHUNK_SIZE = 500
+
+# Keep in step with migration 0008_member_search_index
+SQLITE_COLUMNS = ('first_name', 'last_name', 'nickname', 'biography', 'current_location')
+SQLITE_WEIGHTS = '10.0, 10.0, 5.0, 1.0, 2.0, 0.0'  # per column, tree_id last
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')"
+    " || ' ' || coalesce(nickname, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(current_location, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(biography, '')), 'C')"
+)
+
+
+def search_backend():
+    """'sqlite' / 'postgresql' when the index exists for this database, else None."""
+    return connection.vendor if connection.vendor in ('sqlite', 'postgresql') else None
+
+
+def _names():
+    from .models import FamilyMember
+    qn = connection.ops.quote_name
+    return qn(SEARCH_TABLE), qn(FamilyMember._meta.db_table)
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def _refresh(where, params):
+    """Re-index the members selected by ``where`` (SQL over the member table)."""
+    backend = search_backend()
+    table, members = _names()
+    with connection.cursor() as cursor:
+        if backend == 'sqlite':
+            columns = ', '.join(SQLITE_COLUMNS)
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid IN (SELECT id FROM {members} WHERE {where})', params
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {columns}, tree_id) '
+                f'SELECT id, {columns}, tree_id FROM {members} WHERE {where}', params
+            )
+        elif backend == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {table} (member_id, tree_id, document) '
+                f'SELECT id, tree_id, {POSTGRES_DOCUMENT} FROM {members} WHERE {where} '
+                f'ON CONFLICT (member_id) DO UPDATE '
+                f'SET tree_id = EXCLUDED.tree_id, document = EXCLUDED.document', params
+            )
+
+
+def index_members(member_ids):
+    """(Re)index the given members."""
+    member_ids = list(member_ids)
+    for start in range(0, len(member_ids), CHUNK_SIZE):
+        chunk = member_ids[start:start + CHUNK_SIZE]
+        _refresh(f'id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def unindex_members(member_ids):
+    """Drop index rows for deleted members."""
+    backend = search_backend()
+    if not backend:
+        return
+    table, _ = _names()
+    key = 'rowid' if backend == 'sqlite' else 'member_id'
+    member_ids = list(member_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(member_ids), CHUNK_SIZE):
+            chunk = member_ids[start:start + CHUNK_SIZE]
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {key} IN ({", ".join(["%s"] * len(chunk))})', chunk
+            )
+
+
+def reindex_tree(tree_id):
+    """(Re)index every member of one tree — after imports and other bulk writes."""
+    _refresh('tree_id = %s', [tree_id])
+
+
+def rebuild_search_index():
+    """Rebuild the whole index from the member table."""
+    backend = search_backend()
+    if not backend:
+        return
+    table, _ = _names()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+    _refresh('1 = 1', [])
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def match_query(term):
+    """The backend's query string for ``term``, every word a prefix; None if empty."""
+    words = re.findall(r'\w+', term.lower())
+    if not words:
+        return None
+    if search_backend() == 'sqlite':
+        return ' '.join(f'"{word}"*' for word in words)
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search_members(queryset, term):
+    """
+    Narrow a FamilyMember queryset to index matches for ``term``, annotated
+    with ``search_rank`` (lower is more relevant). Unchanged if the term has
+    no words.
+    """
+    query = match_query(term)
+    if query is None:
+        return queryset
+    table, members = _names()
+    if search_backend() == 'sqlite':
+        matches = f'SELECT rowid FROM {table} WHERE {table} MATCH %s'
+        rank = (f'SELECT bm25({table}, {SQLITE_WEIGHTS}) FROM {table} '
+                f'WHERE {table} MATCH %s AND rowid = {members}.id')
+    else:
+        matches = f"SELECT member_id FROM {table} WHERE document @@ to_tsquery('simple', %s)"
+        rank = (f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {table} "
+                f"WHERE member_id = {members}.id")
+    return queryset.filter(pk__in=RawSQL(matches, [query])).annotate(
+        search_rank=RawSQL(rank, [query], output_field=FloatField())
+    )
@@ -4,7 +4,7 @@ tree/serializers.py — Serializers for all tree-related models
 Covers:
 - FuzzyDate
 - Tree & TreePermission
-- FamilyMember & FamilyRelationship
+- FamilyMember & FamilyRelationship (plus bulk-write item serializers)
 - MemberPrivacySettings
 - ChangeRequest & ChangeRequestValidator
 - FamilyPhoto & PhotoTag
@@ -18,8 +18,10 @@ from .models import (
     FuzzyDate, Tree, TreePermission, FamilyMember, FamilyRelationship,
     MemberPrivacySettings, ChangeRequest, ChangeRequestValidator,
     FamilyPhoto, PhotoTag, FamilyUpdate, UpdateComment, UpdateLike,
-    TreeInvitation, Update,
+    TreeInvitation, Update, GedcomImport,
 )
+from .access import resolve_tree_role
+from .gedcom import import_progress
 
 
 # ---------------------------------------------------------------------------
@@ -28,15 +30,7 @@ from .models import (
 
 def get_user_tree_role(user, tree):
     """Return the user's role string on a given tree, or None."""
-    if not user or not user.is_authenticated:
-        return None
-    if user.is_staff:
-        return 'owner'
-    try:
-        perm = TreePermission.objects.get(tree=tree, user=user, status='active')
-        return perm.role
-    except TreePermission.DoesNotExist:
-        return None
+    return resolve_tree_role(user, tree)
 
 
 # ---------------------------------------------------------------------------
@@ -48,20 +42,47 @@ class FuzzyDateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = FuzzyDate
-        fields = ('id', 'date', 'precision', 'bce', 'display_text', 'display')
-        read_only_fields = ('id',)
+        fields = (
+            'date', 'precision', 'bce', 'display_text', 'display',
+            'earliest_ordinal', 'latest_ordinal',
+        )
 
     def get_display(self, obj):
         return str(obj)
 
 
+class InlineFuzzyDateField(serializers.Field):
+    """
+    A member's inline birth/death date. Reads as the ISO date (or null);
+    accepts a date object {date, precision, bce, display_text} or an exact
+    ISO date. FuzzyDate ids are refused: dates are not stored as rows.
+    """
+    default_error_messages = {
+        'invalid': 'Expected a date object (date, precision, bce, display_text) or an ISO date.',
+    }
+
+    def to_representation(self, value):
+        return value.date.isoformat() if value.date else None
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            serializer = FuzzyDateSerializer(data=data)
+            if not serializer.is_valid():
+                raise serializers.ValidationError(serializer.errors)
+            return FuzzyDate(**serializer.validated_data)
+        if isinstance(data, str):
+            try:
+                return FuzzyDate(date=serializers.DateField().to_internal_value(data), precision='exact')
+            except serializers.ValidationError:
+                pass
+        self.fail('invalid')
+
+
 # ---------------------------------------------------------------------------
 # Tree
 # ---------------------------------------------------------------------------
 
 class TreeSerializer(serializers.ModelSerializer):
-    member_count = serializers.IntegerField(read_only=True, default=0)
-    relationship_count = serializers.IntegerField(read_only=True, default=0)
     role = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     # Computed theme: merges preset defaults with any custom overrides
@@ -73,14 +94,15 @@ class TreeSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'tree_type', 'privacy_level',
             'require_approval_for_edits', 'allow_member_invites', 'primary_language',
             'created_by', 'created_by_username', 'created_at', 'updated_at',
-            'member_count', 'relationship_count', 'role',
+            'member_count', 'living_count', 'relationship_count', 'photo_count', 'role',
             # Theme & identity
             'theme_preset', 'theme_primary', 'theme_mid', 'theme_light', 'theme_dark',
             'crest_image', 'crest_caption',
             'resolved_theme',
         )
         read_only_fields = ('id', 'created_by', 'created_by_username',
-                            'created_at', 'updated_at', 'resolved_theme')
+                            'created_at', 'updated_at', 'resolved_theme',
+                            'member_count', 'living_count', 'relationship_count', 'photo_count')
 
     def get_role(self, obj):
         request = self.context.get('request')
@@ -125,6 +147,8 @@ class TreePermissionSerializer(serializers.ModelSerializer):
 # ---------------------------------------------------------------------------
 
 class FamilyMemberSerializer(serializers.ModelSerializer):
+    birth_date = InlineFuzzyDateField(required=False, allow_null=True)
+    death_date = InlineFuzzyDateField(required=False, allow_null=True)
     birth_date_detail = FuzzyDateSerializer(source='birth_date', read_only=True)
     death_date_detail = FuzzyDateSerializer(source='death_date', read_only=True)
     full_name = serializers.ReadOnlyField()
@@ -187,6 +211,19 @@ class FamilyMemberLightSerializer(serializers.ModelSerializer):
 # FamilyRelationship
 # ---------------------------------------------------------------------------
 
+class LineageEntrySerializer(serializers.Serializer):
+    """A row of tree.lineage.lineage_entries(): one ancestor or descendant."""
+    id = serializers.IntegerField(source='member_id')
+    display_name = serializers.SerializerMethodField()
+    depth = serializers.IntegerField()
+    via_biological = serializers.BooleanField()
+
+    def get_display_name(self, row):
+        return FamilyMember.format_display_name(
+            row['first_name'], row['preferred_name'], row['nickname'], row['last_name'],
+        )
+
+
 class FamilyRelationshipSerializer(serializers.ModelSerializer):
     from_member_name = serializers.CharField(source='from_member.display_name', read_only=True)
     to_member_name = serializers.CharField(source='to_member.display_name', read_only=True)
@@ -205,6 +242,48 @@ class FamilyRelationshipSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'from_member_name', 'to_member_name', 'relationship_display', 'created_at')
 
 
+# ---------------------------------------------------------------------------
+# Bulk writes (see tree/bulk.py)
+# ---------------------------------------------------------------------------
+
+class BulkFamilyMemberSerializer(serializers.ModelSerializer):
+    """
+    One item of a bulk member write. The tree comes from the URL, dates are
+    given inline, and there are no relational fields, so validating a whole
+    batch costs no queries. Items with an ``id`` update that member.
+    """
+    id = serializers.IntegerField(required=False)
+    birth_date = FuzzyDateSerializer(required=False, allow_null=True)
+    death_date = FuzzyDateSerializer(required=False, allow_null=True)
+
+    class Meta:
+        model = FamilyMember
+        fields = (
+            'id',
+            'first_name', 'last_name', 'maiden_name', 'nickname', 'preferred_name', 'gender',
+            'birth_date', 'death_date', 'is_alive', 'show_age',
+            'birth_location', 'birth_lat', 'birth_lng', 'current_location', 'death_location',
+            'occupation', 'education', 'biography', 'nationality', 'ethnicity', 'religion', 'notes',
+            'privacy_level', 'requires_consent', 'consent_given', 'relationship',
+        )
+
+
+class BulkFamilyRelationshipSerializer(serializers.ModelSerializer):
+    """One item of a bulk relationship write; member ids are checked per batch."""
+    id = serializers.IntegerField(required=False)
+    from_member = serializers.IntegerField(source='from_member_id')
+    to_member = serializers.IntegerField(source='to_member_id')
+
+    class Meta:
+        model = FamilyRelationship
+        fields = (
+            'id', 'from_member', 'to_member', 'relationship_type',
+            'start_date', 'end_date', 'is_biological', 'is_current', 'notes',
+        )
+        # Uniqueness is checked for the whole batch at once
+        validators = []
+
+
 # ---------------------------------------------------------------------------
 # MemberPrivacySettings
 # ---------------------------------------------------------------------------
@@ -372,6 +451,23 @@ class TreeInvitationSerializer(serializers.ModelSerializer):
         )
 
 
+# ---------------------------------------------------------------------------
+# GedcomImport
+# ---------------------------------------------------------------------------
+
+class GedcomImportSerializer(serializers.ModelSerializer):
+    """Status of a background GEDCOM import; ``stats`` are running totals until it is done."""
+    stats = serializers.SerializerMethodField()
+
+    class Meta:
+        model = GedcomImport
+        fields = ('id', 'tree', 'status', 'stats', 'error', 'created_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_stats(self, obj):
+        return import_progress(obj)
+
+
 # ---------------------------------------------------------------------------
 # Legacy
 # ---------------------------------------------------------------------------
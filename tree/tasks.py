@@ -0,0 +1,47 @@
+"""
+tree/tasks.py — Background tasks for tree side effects (see core/tasks.py)
+"""
+
+from core.tasks import task
+
+
+@task
+def create_privacy_settings(member_id):
+    """Default privacy settings for a new member (a no-op if they exist or the member is gone)."""
+    from .models import FamilyMember, MemberPrivacySettings
+    if FamilyMember.objects.filter(pk=member_id).exists():
+        MemberPrivacySettings.objects.get_or_create(member_id=member_id)
+
+
+@task
+def delete_crest_file(name):
+    """Remove a replaced crest image from storage."""
+    from .models import Tree
+    Tree._meta.get_field('crest_image').storage.delete(name)
+
+
+@task(max_retries=0)
+def scan_tree_duplicates():
+    """
+    Warm the duplicates endpoint's cache for every tree (tree/duplicates.py);
+    scheduled by Celery beat. Trees unchanged since their last scan are
+    served from the cache, so only changed trees are rescanned.
+    """
+    from .duplicates import find_duplicates
+    from .models import Tree
+    tree_ids = list(Tree.objects.order_by('pk').values_list('pk', flat=True))
+    for tree_id in tree_ids:
+        find_duplicates(tree_id)
+    return len(tree_ids)
+
+
+@task(max_retries=0)
+def import_gedcom_file(import_id):
+    """Import a queued GEDCOM upload (see tree/gedcom.py); one already started is left alone."""
+    from .gedcom import run_gedcom_import
+    from .models import GedcomImport
+    job = GedcomImport.objects.select_related('tree', 'created_by').filter(
+        pk=import_id, status='pending'
+    ).first()
+    if job:
+        run_gedcom_import(job)
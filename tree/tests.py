@@ -1,15 +1,23 @@
 """
 tree/tests/test_api.py — Tree, Member, ChangeRequest, Relationship, Invitation API tests
 """
+import io
 import pytest
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
-from tree.models import Tree, TreePermission, FamilyMember
+from tree.models import Tree, TreePermission, TreeAccess, FamilyMember
 
 
 # ─── Fixtures ─────────────────────────────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached per-tree indexes must not leak between tests (tree ids get reused)."""
+    from django.core.cache import cache
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -91,7 +99,7 @@ class TestTreeCRUD:
         Tree.objects.create(name='Other Tree', created_by=other_user)
         res = owner_client.get('/api/trees/')
         assert res.status_code == status.HTTP_200_OK
-        names = [t['name'] for t in res.data]
+        names = [t['name'] for t in res.data['results']]
         assert 'Test Tree' in names
         assert 'Other Tree' not in names
 
@@ -129,7 +137,7 @@ class TestFamilyMemberCRUD:
     def test_member_age_precision_exact(self, member, owner_client):
         """BUG #3 regression: age should display as exact when precision='exact'."""
         from tree.models import FuzzyDate
-        fd = FuzzyDate.objects.create(date='1980-05-15', precision='exact')
+        fd = FuzzyDate(date='1980-05-15', precision='exact')
         member.birth_date = fd
         member.save()
         res = owner_client.get(f'/api/members/{member.pk}/')
@@ -182,6 +190,25 @@ class TestChangeRequest:
         # old_value should be None (JSON null) not the string "None"
         assert cr.old_value is None or cr.old_value != 'None'
 
+    def test_date_change_stores_values(self, owner_client, member):
+        from tree.models import ChangeRequest, FuzzyDate
+        res = owner_client.post(f'/api/members/{member.pk}/propose-change/', {
+            'field_name': 'birth_date',
+            'new_value': {'date': '1931-01-01', 'precision': 'year'},
+        }, format='json')
+        assert res.status_code == status.HTTP_201_CREATED, res.data
+        cr = ChangeRequest.objects.get(pk=res.data['id'])
+        assert cr.new_value == {'date': '1931-01-01', 'precision': 'year', 'bce': False, 'display_text': ''}
+        member.refresh_from_db()
+        assert (member.birth_date_value.year, member.birth_date_precision) == (1931, 'year')
+        assert not FuzzyDate.objects.exists()
+
+        res = owner_client.post(f'/api/members/{member.pk}/propose-change/', {
+            'field_name': 'death_date', 'new_value': 'last spring',
+        }, format='json')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'new_value' in res.data
+
     def test_stranger_cannot_create_change_request(self, other_client, member):
         """BUG #9: unauthenticated tree users should be blocked."""
         res = other_client.post('/api/change-requests/', {
@@ -240,3 +267,1069 @@ class TestInvitationAccept:
         perm = TreePermission.objects.get(tree=tree, user=other_user)
         assert perm.role == 'editor'
         assert perm.status == 'active'
+
+
+# ─── Compact tree graph ──────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestTreeGraph:
+
+    def test_graph_returns_columns_and_edges(self, owner_client, owner, tree, member):
+        from tree.models import FamilyRelationship, FuzzyDate
+        member.birth_date = FuzzyDate(date='1950-01-01', precision='year')
+        member.save()
+        child = FamilyMember.objects.create(tree=tree, first_name='Amy', last_name='Doe', added_by=owner)
+        spouse = FamilyMember.objects.create(tree=tree, first_name='Ann', last_name='Doe', added_by=owner)
+        FamilyRelationship.objects.create(from_member=member, to_member=child, relationship_type='parent')
+        FamilyRelationship.objects.create(from_member=child, to_member=spouse, relationship_type='child')
+        FamilyRelationship.objects.create(from_member=member, to_member=spouse, relationship_type='spouse')
+
+        res = owner_client.get(f'/api/trees/{tree.pk}/graph/')
+        assert res.status_code == status.HTTP_200_OK
+        ids = res.data['ids']
+        assert ids == [member.pk, child.pk, spouse.pk]
+        assert res.data['names'][0] == 'John Doe'
+        assert res.data['birth_years'] == [1950, None, None]
+        assert res.data['living'] == [True, True, True]
+        pos = {pk: i for i, pk in enumerate(ids)}
+        assert sorted(map(tuple, res.data['parents'])) == sorted([
+            (pos[member.pk], pos[child.pk]), (pos[spouse.pk], pos[child.pk]),
+        ])
+        assert [tuple(e) for e in res.data['spouses']] == [(pos[member.pk], pos[spouse.pk])]
+
+    def test_graph_query_count_is_constant(self, owner_client, owner, tree, django_assert_max_num_queries):
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name=f'P{i}', last_name='Doe') for i in range(30)
+        ])
+        with django_assert_max_num_queries(6):
+            res = owner_client.get(f'/api/trees/{tree.pk}/graph/')
+        assert len(res.data['ids']) == 30
+
+    def test_stranger_cannot_read_graph(self, other_client, tree):
+        res = other_client.get(f'/api/trees/{tree.pk}/graph/')
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+
+# ─── Lineage closure ─────────────────────────────────────────────────────────
+
+@pytest.fixture
+def family(tree, owner, member):
+    """grandparent (member) → parent → child, with an adoptive grandparent."""
+    from tree.models import FamilyRelationship
+    parent = FamilyMember.objects.create(tree=tree, first_name='Paul', last_name='Doe', added_by=owner)
+    child = FamilyMember.objects.create(tree=tree, first_name='Cleo', last_name='Doe', added_by=owner)
+    adoptive = FamilyMember.objects.create(tree=tree, first_name='Ada', last_name='Roe', added_by=owner)
+    FamilyRelationship.objects.create(from_member=member, to_member=parent, relationship_type='parent')
+    FamilyRelationship.objects.create(from_member=child, to_member=parent, relationship_type='child')
+    FamilyRelationship.objects.create(from_member=adoptive, to_member=parent, relationship_type='adoptive_parent')
+    return {'grandparent': member, 'parent': parent, 'child': child, 'adoptive': adoptive}
+
+
+@pytest.mark.django_db
+class TestLineage:
+
+    def test_ancestors_from_closure(self, owner_client, family):
+        res = owner_client.get(f"/api/members/{family['child'].pk}/ancestors/")
+        assert res.status_code == status.HTTP_200_OK
+        depths = {row['id']: (row['depth'], row['via_biological']) for row in res.data['results']}
+        assert depths == {
+            family['parent'].pk: (1, True),
+            family['grandparent'].pk: (2, True),
+            family['adoptive'].pk: (2, False),
+        }
+
+    def test_ancestor_filters(self, owner_client, family):
+        url = f"/api/members/{family['child'].pk}/ancestors/"
+        assert [r['id'] for r in owner_client.get(url, {'max_depth': 1}).data['results']] == [family['parent'].pk]
+        ids = {r['id'] for r in owner_client.get(url, {'biological': 'true'}).data['results']}
+        assert family['adoptive'].pk not in ids
+
+    def test_descendants_single_query(self, owner_client, family, django_assert_max_num_queries):
+        url = f"/api/members/{family['grandparent'].pk}/descendants/"
+        owner_client.get(url)
+        with django_assert_max_num_queries(4):
+            res = owner_client.get(url)
+        assert [r['id'] for r in res.data['results']] == [family['parent'].pk, family['child'].pk]
+
+    def test_deleting_link_prunes_closure(self, family, django_capture_on_commit_callbacks):
+        from tree.models import FamilyRelationship, MemberLineage
+        with django_capture_on_commit_callbacks(execute=True):
+            FamilyRelationship.objects.filter(
+                from_member=family['grandparent'], to_member=family['parent']
+            ).delete()
+        assert not MemberLineage.objects.filter(ancestor=family['grandparent']).exists()
+        assert MemberLineage.objects.filter(
+            ancestor=family['parent'], descendant=family['child']
+        ).exists()
+
+    def test_parent_ids_change_updates_closure(self, owner_client, family, django_capture_on_commit_callbacks):
+        from tree.models import MemberLineage
+        child = family['child']
+        with django_capture_on_commit_callbacks(execute=True):
+            res = owner_client.post(f'/api/members/{child.pk}/propose-change/', {
+                'field_name': 'parent_ids',
+                'new_value': [family['adoptive'].pk],
+            }, format='json')
+        assert res.status_code == status.HTTP_201_CREATED
+        assert res.data['old_value'] == [family['parent'].pk]
+        assert child.parent_ids == [family['adoptive'].pk]
+        ancestors = set(MemberLineage.objects.filter(descendant=child).values_list('ancestor_id', flat=True))
+        assert ancestors == {family['adoptive'].pk}
+
+    def test_rebuild_command(self, family):
+        from django.core.management import call_command
+        from tree.models import MemberLineage
+        MemberLineage.objects.all().delete()
+        call_command('rebuild_lineage', stdout=io.StringIO())
+        assert MemberLineage.objects.filter(descendant=family['child']).count() == 3
+
+    def test_refresh_rewrites_only_the_subtree_below_the_link(self, owner, tree, family):
+        from tree.lineage import rebuild_tree_lineage
+        from tree.models import FamilyRelationship, MemberLineage
+        rows = lambda: set(MemberLineage.objects.values_list('ancestor', 'descendant', 'depth', 'via_biological'))
+        elder = FamilyMember.objects.create(tree=tree, first_name='Eli', last_name='Doe', added_by=owner)
+        FamilyRelationship.objects.create(from_member=elder, to_member=family['grandparent'], relationship_type='parent')
+        untouched = set(MemberLineage.objects.values_list('pk', flat=True))
+
+        uncle = FamilyMember.objects.create(tree=tree, first_name='Ugo', last_name='Doe', added_by=owner)
+        FamilyRelationship.objects.create(from_member=family['grandparent'], to_member=uncle, relationship_type='parent')
+        assert untouched <= set(MemberLineage.objects.values_list('pk', flat=True))
+        assert set(MemberLineage.objects.filter(descendant=uncle).values_list('ancestor', 'depth')) == {
+            (family['grandparent'].pk, 1), (elder.pk, 2),
+        }
+        incremental = rows()
+        rebuild_tree_lineage(tree.pk)
+        assert rows() == incremental
+
+    def test_long_chains_do_not_recurse(self):
+        from tree.lineage import _closure_rows
+        length = 1500
+        parent_map = {pk: [(pk - 1, True)] for pk in range(2, length + 1)}
+        deepest = max(row[3] for row in _closure_rows(1, range(1, length + 1), parent_map))
+        assert deepest == length - 1
+
+
+# ─── Kinship ─────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def cousins(tree, owner, member):
+    """member → (anna, bert); anna → carl; bert → dora → emil."""
+    from tree.models import FamilyRelationship
+
+    def person(first, gender=''):
+        return FamilyMember.objects.create(
+            tree=tree, first_name=first, last_name='Doe', gender=gender, added_by=owner
+        )
+
+    people = {
+        'root': member, 'anna': person('Anna', 'female'), 'bert': person('Bert', 'male'),
+        'carl': person('Carl', 'male'), 'dora': person('Dora', 'female'), 'emil': person('Emil'),
+    }
+    for parent, child in [('root', 'anna'), ('root', 'bert'), ('anna', 'carl'),
+                          ('bert', 'dora'), ('dora', 'emil')]:
+        FamilyRelationship.objects.create(
+            from_member=people[parent], to_member=people[child], relationship_type='parent'
+        )
+    return people
+
+
+@pytest.mark.django_db
+class TestKinship:
+
+    def url(self, a, b):
+        return f'/api/members/{a.pk}/kinship/{b.pk}/'
+
+    def test_cousin_once_removed(self, owner_client, cousins):
+        res = owner_client.get(self.url(cousins['carl'], cousins['emil']))
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['label'] == 'first cousin once removed'
+        assert res.data['distance'] == 5
+        assert res.data['path'][0]['id'] == cousins['carl'].pk
+        assert res.data['path'][-1]['display_name'] == 'Emil Doe'
+
+    def test_gendered_labels(self, owner_client, cousins):
+        assert owner_client.get(self.url(cousins['carl'], cousins['bert'])).data['label'] == 'uncle'
+        assert owner_client.get(self.url(cousins['emil'], cousins['bert'])).data['label'] == 'grandfather'
+        assert owner_client.get(self.url(cousins['emil'], cousins['anna'])).data['label'] == 'great-aunt'
+        assert owner_client.get(self.url(cousins['carl'], cousins['root'])).data['label'] == 'grandparent'
+
+    def test_index_is_cached_and_invalidated(self, owner_client, owner, tree, cousins,
+                                             django_assert_max_num_queries):
+        from tree.models import FamilyRelationship
+        stranger = FamilyMember.objects.create(tree=tree, first_name='Finn', last_name='Roe', added_by=owner)
+        url = self.url(cousins['carl'], stranger)
+        assert owner_client.get(url).data['related'] is False
+
+        FamilyRelationship.objects.create(
+            from_member=cousins['carl'], to_member=stranger, relationship_type='spouse'
+        )
+        res = owner_client.get(self.url(cousins['anna'], stranger))
+        assert res.data['label'] == 'child-in-law'
+        with django_assert_max_num_queries(6):
+            owner_client.get(self.url(cousins['anna'], stranger))
+
+    def test_version_bumps_again_after_commit(self, tree, django_capture_on_commit_callbacks):
+        from tree.cache import bump_tree_version, tree_version
+        before = tree_version(tree.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            bump_tree_version(tree.pk)
+            during = tree_version(tree.pk)
+        assert before < during < tree_version(tree.pk)
+
+    def test_members_must_share_tree(self, owner_client, owner, cousins):
+        other_tree = Tree.objects.create(name='Elsewhere', created_by=owner)
+        outsider = FamilyMember.objects.create(tree=other_tree, first_name='X', last_name='Y', added_by=owner)
+        res = owner_client.get(self.url(cousins['carl'], outsider))
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_blood_labels():
+    from tree.kinship import blood_label
+    assert blood_label(3, 4) == 'second cousin once removed'
+    assert blood_label(2, 2, 'female') == 'first cousin'
+    assert blood_label(3, 1, 'female') == 'great-aunt'
+    assert blood_label(0, 3, 'male') == 'great-grandson'
+    assert blood_label(1, 2) == 'niece/nephew'
+
+
+# ─── Common ancestors ────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestCommonAncestors:
+
+    def test_nearest_common_ancestor_of_cousins(self, owner_client, cousins):
+        res = owner_client.get(f"/api/members/{cousins['carl'].pk}/common-ancestors/{cousins['emil'].pk}/")
+        assert res.status_code == status.HTTP_200_OK
+        assert [e['id'] for e in res.data['nearest']] == [cousins['root'].pk]
+        assert res.data['nearest'][0]['depth_a'] == 2
+        assert res.data['nearest'][0]['depth_b'] == 3
+
+    def test_direct_line_resolves_to_elder(self, owner_client, cousins):
+        res = owner_client.get(f"/api/members/{cousins['emil'].pk}/common-ancestors/{cousins['bert'].pk}/")
+        assert [e['id'] for e in res.data['nearest']] == [cousins['bert'].pk]
+
+    def test_unrelated_members(self, owner_client, owner, tree, cousins):
+        loner = FamilyMember.objects.create(tree=tree, first_name='Lone', last_name='Roe', added_by=owner)
+        res = owner_client.get(f"/api/members/{cousins['carl'].pk}/common-ancestors/{loner.pk}/")
+        assert res.data['nearest'] == []
+        assert res.data['common_ancestors'] == []
+
+
+# ─── Pagination ──────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestPagination:
+
+    def test_members_action_walks_cursor_pages(self, owner_client, owner, tree):
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name=f'Kid{i:02d}', last_name='Same', added_by=owner)
+            for i in range(7)
+        ])
+        seen, url = [], f'/api/trees/{tree.id}/members/?page_size=3'
+        while url:
+            res = owner_client.get(url)
+            assert res.status_code == status.HTTP_200_OK
+            assert len(res.data['results']) <= 3
+            seen += [m['first_name'] for m in res.data['results']]
+            url = res.data['next']
+        assert seen == [f'Kid{i:02d}' for i in range(7)]
+
+    def test_pages_past_many_equal_names_end(self, owner_client, owner, tree):
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name='Same', last_name='Same', added_by=owner)
+            for _ in range(25)
+        ])
+        seen, url = [], f'/api/trees/{tree.id}/members/?page_size=4'
+        while url:
+            res = owner_client.get(url)
+            seen += [m['id'] for m in res.data['results']]
+            url = res.data['next']
+        assert len(seen) == len(set(seen)) == 25
+
+        res = owner_client.get(res.data['previous'])
+        assert [m['id'] for m in res.data['results']] == seen[-5:-1]
+
+    def test_page_size_is_capped(self, owner_client, owner, tree):
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name=f'M{i}', last_name='Bulk', added_by=owner)
+            for i in range(205)
+        ])
+        res = owner_client.get('/api/members/?page_size=1000')
+        assert len(res.data['results']) == 200
+        assert res.data['next']
+
+    def test_nullable_ordering_falls_back_to_default(self, owner_client, owner, member):
+        from history.models import LifeEvent
+        for i, date in enumerate([None, '1950-01-01', None]):
+            LifeEvent.objects.create(member=member, event_type='other', title=f'E{i}',
+                                     date=date, added_by=owner)
+        seen, url = [], '/api/life-events/?ordering=date&page_size=2'
+        while url:
+            res = owner_client.get(url)
+            assert res.status_code == status.HTTP_200_OK
+            seen += [e['title'] for e in res.data['results']]
+            url = res.data['next']
+        assert seen == ['E0', 'E1', 'E2']
+
+
+# ─── Request-scoped roles ────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestRoleResolution:
+
+    def _list_queries(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            res = client.get('/api/trees/')
+        assert res.status_code == status.HTTP_200_OK
+        return len(res.data['results']), len(ctx.captured_queries)
+
+    def _add_trees(self, owner, count):
+        for i in range(count):
+            tree = Tree.objects.create(name=f'Extra {i}', created_by=owner)
+            TreePermission.objects.create(tree=tree, user=owner, role='owner', status='active')
+
+    def test_tree_list_query_count_is_constant(self, owner_client, owner, tree):
+        self._add_trees(owner, 1)
+        few, few_queries = self._list_queries(owner_client)
+        self._add_trees(owner, 5)
+        many, many_queries = self._list_queries(owner_client)
+        assert (few, many) == (2, 7)
+        assert many_queries == few_queries
+
+    def test_role_reflects_grant_within_request(self, owner, other_user, tree):
+        from tree.access import TreeRoleMiddleware, resolve_tree_role
+
+        def view(request):
+            before = resolve_tree_role(other_user, tree)
+            TreePermission.objects.create(tree=tree, user=other_user, role='editor', status='active')
+            return before, resolve_tree_role(other_user, tree)
+
+        assert TreeRoleMiddleware(view)(None) == (None, 'editor')
+
+
+# ─── TreeAccess visibility table ─────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestTreeAccess:
+
+    def _access(self, tree):
+        return dict(TreeAccess.objects.filter(tree=tree).values_list('user__username', 'role'))
+
+    def test_tracks_permission_lifecycle(self, tree, other_user):
+        assert self._access(tree) == {'owner': 'owner'}
+        perm = TreePermission.objects.create(tree=tree, user=other_user, role='viewer', status='pending')
+        assert 'stranger' not in self._access(tree)
+        perm.status = 'active'
+        perm.save()
+        assert self._access(tree)['stranger'] == 'viewer'
+        perm.delete()
+        assert 'stranger' not in self._access(tree)
+
+    def test_creator_keeps_visibility_without_permission(self, tree, owner, owner_client):
+        TreePermission.objects.filter(tree=tree, user=owner).get().delete()
+        assert self._access(tree) == {'owner': ''}
+        res = owner_client.get('/api/trees/')
+        assert [t['id'] for t in res.data['results']] == [tree.id]
+        assert res.data['results'][0]['role'] is None
+
+    def test_tree_delete_and_rebuild(self, tree, other_user):
+        from tree.access import rebuild_tree_access
+        TreePermission.objects.create(tree=tree, user=other_user, role='editor', status='active')
+        TreeAccess.objects.all().delete()
+        assert rebuild_tree_access() == 2
+        tree.delete()
+        assert not TreeAccess.objects.exists()
+
+
+# ─── Denormalized tree counters ──────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestTreeCounters:
+
+    def _counts(self, tree):
+        tree.refresh_from_db()
+        return tree.member_count, tree.living_count, tree.relationship_count
+
+    def test_signals_keep_counters_in_step(self, tree, owner, member):
+        from tree.models import FamilyRelationship
+        assert self._counts(tree) == (1, 1, 0)
+        child = FamilyMember.objects.create(tree=tree, first_name='Kid', last_name='Doe', added_by=owner)
+        FamilyRelationship.objects.create(from_member=member, to_member=child, relationship_type='parent')
+        assert self._counts(tree) == (2, 2, 1)
+        member.is_alive = False
+        member.save()
+        assert self._counts(tree) == (2, 1, 1)
+        member.delete()
+        assert self._counts(tree) == (1, 1, 0)
+
+    def test_tree_list_reads_stored_counters(self, owner_client, tree, member):
+        res = owner_client.get('/api/trees/')
+        row = res.data['results'][0]
+        assert (row['member_count'], row['living_count'], row['relationship_count'], row['photo_count']) == (1, 1, 0, 0)
+
+    def test_reconcile_command_fixes_drift(self, tree, owner, member):
+        FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name='Bulk', last_name='Doe', is_alive=False, added_by=owner)
+        ])
+        Tree.objects.filter(pk=tree.pk).update(relationship_count=7)
+        from django.core.management import call_command
+        out = io.StringIO()
+        call_command('reconcile_tree_counters', stdout=out)
+        assert '1 trees and 0 updates corrected' in out.getvalue()
+        assert self._counts(tree) == (2, 1, 0)
+
+    def test_stale_tree_save_keeps_bumped_counters(self, owner_client, tree, owner, member):
+        stale = Tree.objects.get(pk=tree.pk)
+        FamilyMember.objects.create(tree=tree, first_name='Kid', last_name='Doe', added_by=owner)
+        stale.name = 'Renamed'
+        stale.save()
+        owner_client.patch(f'/api/trees/{tree.pk}/', {'description': 'Updated'}, format='json')
+        assert self._counts(tree) == (2, 2, 0)
+        assert tree.name == 'Renamed'
+
+
+# ─── Like / comment counters ─────────────────────────────────────────────────
+
+@pytest.fixture
+def post(tree, owner):
+    from tree.models import FamilyUpdate
+    return FamilyUpdate.objects.create(tree=tree, created_by=owner, title='In memory', content='…')
+
+
+@pytest.mark.django_db
+class TestUpdateCounters:
+
+    def test_like_toggle_returns_counter_value(self, owner_client, other_client, other_user, tree, post):
+        TreePermission.objects.create(tree=tree, user=other_user, role='viewer', status='active')
+        res = owner_client.post(f'/api/family-updates/{post.pk}/like/')
+        assert (res.status_code, res.data) == (status.HTTP_201_CREATED, {'liked': True, 'likes_count': 1})
+        res = other_client.post(f'/api/family-updates/{post.pk}/like/')
+        assert res.data == {'liked': True, 'likes_count': 2}
+        res = owner_client.post(f'/api/family-updates/{post.pk}/like/')
+        assert res.data == {'liked': False, 'likes_count': 1}
+
+    def test_concurrent_unlikes_count_once(self, owner_client, other_user, tree, post):
+        from tree.counters import remove_like
+        from tree.models import UpdateLike
+        UpdateLike.objects.create(update=post, user=other_user)
+        owner_client.post(f'/api/family-updates/{post.pk}/like/')
+        stale = UpdateLike.objects.get(update=post, user=post.created_by)
+        assert owner_client.post(f'/api/family-updates/{post.pk}/like/').data['likes_count'] == 1
+        assert remove_like(stale) == 1  # the other request lost the race
+
+    def test_comments_bump_counter(self, owner_client, post):
+        owner_client.post(f'/api/family-updates/{post.pk}/comment/', {'content': 'Rest well'})
+        post.refresh_from_db()
+        assert post.comments_count == 1
+        post.comments.get().delete()
+        post.refresh_from_db()
+        assert post.comments_count == 0
+
+    def test_reconcile_fixes_drifted_post(self, owner, post):
+        from tree.counters import reconcile_update_counters
+        from tree.models import FamilyUpdate, UpdateLike
+        UpdateLike.objects.bulk_create([UpdateLike(update=post, user=owner)])
+        FamilyUpdate.objects.filter(pk=post.pk).update(comments_count=4)
+        assert reconcile_update_counters() == 1
+        post.refresh_from_db()
+        assert (post.likes_count, post.comments_count) == (1, 0)
+        assert reconcile_update_counters() == 0
+
+    def test_stale_post_save_keeps_bumped_counters(self, owner_client, post):
+        owner_client.post(f'/api/family-updates/{post.pk}/like/')
+        post.title = 'Remembered'
+        post.save()
+        post.refresh_from_db()
+        assert (post.title, post.likes_count) == ('Remembered', 1)
+
+
+# ─── GEDCOM import ───────────────────────────────────────────────────────────
+
+GEDCOM = b"""0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME Pierre /Martin/
+1 SEX M
+1 BIRT
+2 DATE ABT 1850
+2 PLAC Lyon
+1 DEAT
+2 DATE BEF 1920
+0 @I2@ INDI
+1 NAME Marie /Durand/
+1 SEX F
+1 BIRT
+2 DATE BET 1852 AND 1856
+0 @I3@ INDI
+1 NAME Luc /Martin/
+1 BIRT
+2 DATE 3 MAR 1880
+1 FAMC @F1@
+0 @I4@ INDI
+1 NAME Anne /Martin/
+1 FAMC @F1@
+2 PEDI adopted
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+1 CHIL @I3@
+1 CHIL @I4@
+0 TRLR
+"""
+
+
+@pytest.fixture
+def import_gedcom_upload(owner_client, settings, tmp_path, django_capture_on_commit_callbacks):
+    """POST a GEDCOM file, run the queued import, and return its status response."""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    settings.MEDIA_ROOT = tmp_path
+
+    def upload(tree, content=GEDCOM, client=owner_client):
+        with django_capture_on_commit_callbacks(execute=True):
+            res = client.post(
+                f'/api/trees/{tree.pk}/import/gedcom/',
+                {'file': SimpleUploadedFile('family.ged', content)}, format='multipart',
+            )
+        assert res.status_code == status.HTTP_202_ACCEPTED
+        return client.get(f'/api/trees/{tree.pk}/import/gedcom/{res.data["id"]}/')
+    return upload
+
+
+def test_gedcom_date_qualifiers():
+    from tree.gedcom import parse_gedcom_date
+    assert parse_gedcom_date('ABT 1850')['precision'] == 'approximate'
+    assert parse_gedcom_date('BEF MAR 1900')['precision'] == 'before'
+    assert parse_gedcom_date('AFT 1900')['precision'] == 'after'
+    between = parse_gedcom_date('BET 1850 AND 1860')
+    assert (between['date'].year, between['precision']) == (1855, 'approximate')
+    assert between['display_text'] == 'Between 1850 and 1860'
+    assert parse_gedcom_date('12 MAR 1850')['precision'] == 'exact'
+    assert parse_gedcom_date('sometime')['precision'] == 'unknown'
+
+
+@pytest.mark.django_db
+class TestGedcomImport:
+
+    def test_import_endpoint(self, import_gedcom_upload, tree):
+        from tree.models import FamilyRelationship, GedcomImport, MemberLineage, MemberPrivacySettings
+        res = import_gedcom_upload(tree)
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['status'] == 'done'
+        assert res.data['stats'] == {'individuals': 4, 'families': 1, 'relationships': 5, 'dates': 4}
+        assert not GedcomImport.objects.get(pk=res.data['id']).file  # upload removed
+
+        pierre = FamilyMember.objects.get(tree=tree, first_name='Pierre')
+        assert (pierre.gender, pierre.is_alive, pierre.birth_location) == ('male', False, 'Lyon')
+        assert (pierre.birth_date.precision, pierre.death_date.precision) == ('approximate', 'before')
+        types = set(FamilyRelationship.objects.filter(from_member=pierre).values_list(
+            'to_member__first_name', 'relationship_type'
+        ))
+        assert types == {('Marie', 'spouse'), ('Luc', 'parent'), ('Anne', 'adoptive_parent')}
+        assert MemberPrivacySettings.objects.filter(member__tree=tree).count() == 4
+        assert MemberLineage.objects.filter(ancestor=pierre).count() == 2
+        tree.refresh_from_db()
+        # Born in the 1800s or undated, with no death record: none presumed living
+        assert (tree.member_count, tree.living_count, tree.relationship_count) == (4, 0, 5)
+
+    def test_rejects_non_gedcom_upload(self, owner_client, tree):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from tree.models import GedcomImport
+        upload = SimpleUploadedFile('family.csv', b'name,born\nPierre,1850\n')
+        res = owner_client.post(f'/api/trees/{tree.pk}/import/gedcom/', {'file': upload}, format='multipart')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert not GedcomImport.objects.exists()
+
+    def test_families_before_individuals(self, tree):
+        from tree.gedcom import import_gedcom
+        from tree.models import FamilyRelationship
+        lines = GEDCOM.decode().splitlines()
+        start = lines.index('0 @F1@ FAM')
+        reordered = lines[:2] + lines[start:-1] + lines[2:start] + ['0 TRLR']
+        stats = import_gedcom(tree, reordered, batch_size=3)
+        assert stats == {'individuals': 4, 'families': 1, 'relationships': 5, 'dates': 4}
+        assert FamilyRelationship.objects.filter(from_member__tree=tree).count() == 5
+
+    def test_family_in_unwritten_batch_is_linked_without_waiting(self, tree):
+        from tree.gedcom import _Importer
+        importer = _Importer(tree, None, None, batch_size=3)
+        importer.run(GEDCOM.decode().splitlines())
+        # @I4@ was still in the last batch when @F1@ was read
+        assert importer.deferred == [] and importer.stats['relationships'] == 5
+
+    def test_presumed_alive(self):
+        from datetime import date
+        from tree.gedcom import parse_gedcom_date, presumed_alive
+        today = date(2026, 1, 1)
+        assert presumed_alive(parse_gedcom_date('1990'), False, today)
+        assert not presumed_alive(parse_gedcom_date('1990'), True, today)
+        assert not presumed_alive(parse_gedcom_date('ABT 1850'), False, today)
+        assert not presumed_alive(None, False, today)
+
+    def test_status_is_per_tree(self, import_gedcom_upload, owner_client, owner, tree):
+        job = import_gedcom_upload(tree).data['id']
+        other = Tree.objects.create(name='Other', created_by=owner)
+        TreePermission.objects.create(tree=other, user=owner, role='owner', status='active')
+        res = owner_client.get(f'/api/trees/{other.pk}/import/gedcom/{job}/')
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_viewer_cannot_import(self, other_client, other_user, tree):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        TreePermission.objects.create(tree=tree, user=other_user, role='viewer', status='active')
+        upload = SimpleUploadedFile('family.ged', GEDCOM)
+        res = other_client.post(f'/api/trees/{tree.pk}/import/gedcom/', {'file': upload}, format='multipart')
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+        assert not FamilyMember.objects.filter(tree=tree).exists()
+
+    def test_command_reports_progress(self, tree, tmp_path):
+        from django.core.management import call_command
+        path = tmp_path / 'family.ged'
+        path.write_bytes(GEDCOM)
+        out = io.StringIO()
+        call_command('import_gedcom', str(path), tree=tree.pk, batch_size=2, stdout=out)
+        assert 'Imported 4 individuals' in out.getvalue()
+        assert out.getvalue().count('individuals,') >= 2
+
+
+# ─── Tree export ─────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestTreeExport:
+
+    def _export(self, client, tree, fmt):
+        res = client.get(f'/api/trees/{tree.pk}/export/', {'format': fmt})
+        assert res.status_code == status.HTTP_200_OK
+        return b''.join(res.streaming_content).decode()
+
+    def test_jsonl_export(self, owner_client, owner, tree, family):
+        import json
+        from history.models import LifeEvent
+        LifeEvent.objects.create(member=family['child'], event_type='graduation', title='Graduated')
+        rows = [json.loads(line) for line in self._export(owner_client, tree, 'jsonl').splitlines()]
+        kinds = [row['type'] for row in rows]
+        assert kinds[0] == 'tree'
+        assert kinds.count('member') == FamilyMember.objects.filter(tree=tree).count()
+        assert 'relationship' in kinds and kinds[-1] == 'life_event'
+
+    def test_gedcom_round_trip(self, owner_client, owner, tree, import_gedcom_upload):
+        import_gedcom_upload(tree)
+        exported = self._export(owner_client, tree, 'gedcom')
+        assert exported.startswith('0 HEAD') and exported.rstrip().endswith('0 TRLR')
+        assert '2 DATE ABT 1850' in exported and '2 PEDI adopted' in exported
+
+        copy = Tree.objects.create(name='Copy', created_by=owner)
+        TreePermission.objects.create(tree=copy, user=owner, role='owner', status='active')
+        res = import_gedcom_upload(copy, exported.encode())
+        assert res.data['stats'] == {'individuals': 4, 'families': 1, 'relationships': 5, 'dates': 4}
+
+    def test_biological_and_adoptive_parents_are_separate_families(self, owner_client, owner, tree):
+        from tree.models import FamilyRelationship
+        ids = {}
+        for name in ('Cleo', 'Paul', 'Lea', 'Ada', 'Max', 'Ivo'):
+            ids[name] = FamilyMember.objects.create(tree=tree, first_name=name, added_by=owner).pk
+        FamilyRelationship.objects.create(from_member_id=ids['Paul'], to_member_id=ids['Lea'], relationship_type='spouse')
+        FamilyRelationship.objects.create(from_member_id=ids['Ada'], to_member_id=ids['Ivo'], relationship_type='spouse')
+        for name in ('Paul', 'Lea'):
+            FamilyRelationship.objects.create(from_member_id=ids[name], to_member_id=ids['Cleo'], relationship_type='parent')
+        for name in ('Ada', 'Max', 'Ivo'):
+            FamilyRelationship.objects.create(
+                from_member_id=ids[name], to_member_id=ids['Cleo'], relationship_type='adoptive_parent',
+            )
+        exported = self._export(owner_client, tree, 'gedcom')
+        cleo = exported.split(f'0 @I{ids["Cleo"]}@ INDI\n')[1].split('\n0 ')[0]
+        famc = [line for line in cleo.splitlines() if line.startswith(('1 FAMC', '2 PEDI'))]
+        assert famc == [
+            f'1 FAMC @F{ids["Paul"]}_{ids["Lea"]}@',
+            f'1 FAMC @F{ids["Ada"]}_{ids["Ivo"]}@', '2 PEDI adopted',
+            f'1 FAMC @F{ids["Max"]}@', '2 PEDI adopted',
+        ]
+        for xref in (f'@F{ids["Paul"]}_{ids["Lea"]}@', f'@F{ids["Ada"]}_{ids["Ivo"]}@', f'@F{ids["Max"]}@'):
+            family = exported.split(f'0 {xref} FAM\n')[1].split('\n0 ')[0]
+            assert f'1 CHIL @I{ids["Cleo"]}@' in family
+
+    def test_only_owner_can_export(self, other_client, other_user, tree):
+        TreePermission.objects.create(tree=tree, user=other_user, role='editor', status='active')
+        res = other_client.get(f'/api/trees/{tree.pk}/export/', {'format': 'gedcom'})
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+# ─── Bulk writes ─────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestBulkWrites:
+
+    def test_bulk_members_create_and_update(self, owner_client, tree, member):
+        res = owner_client.post(f'/api/trees/{tree.pk}/members/bulk/', [
+            {'first_name': 'Rose', 'last_name': 'Doe',
+             'birth_date': {'date': '1851-01-01', 'precision': 'year'}},
+            {'first_name': 'Abel', 'last_name': 'Doe', 'is_alive': False},
+            {'id': member.pk, 'occupation': 'Miller', 'is_alive': False},
+        ], format='json')
+        assert res.status_code == status.HTTP_201_CREATED
+        assert [r['status'] for r in res.data['results']] == ['created', 'created', 'updated']
+
+        rose = FamilyMember.objects.get(pk=res.data['results'][0]['id'])
+        assert (rose.birth_date.date.year, rose.birth_date.precision) == (1851, 'year')
+        assert rose.privacy_settings is not None
+        member.refresh_from_db()
+        assert (member.occupation, member.is_alive) == ('Miller', False)
+        tree.refresh_from_db()
+        assert (tree.member_count, tree.living_count) == (3, 1)
+
+    def test_invalid_batch_writes_nothing(self, owner_client, tree):
+        res = owner_client.post(f'/api/trees/{tree.pk}/members/bulk/', [
+            {'first_name': 'Rose', 'last_name': 'Doe'},
+            {'first_name': 'Nameless'},
+            {'id': 999999, 'occupation': 'Ghost'},
+        ], format='json')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert [r['status'] for r in res.data['results']] == ['valid', 'invalid', 'invalid']
+        assert not FamilyMember.objects.filter(tree=tree).exists()
+
+    def test_bulk_relationships(self, owner_client, owner, tree, member):
+        from tree.models import MemberLineage
+        kids = FamilyMember.objects.bulk_create([
+            FamilyMember(tree=tree, first_name=name, last_name='Doe') for name in ('Ivy', 'Max')
+        ])
+        res = owner_client.post(f'/api/trees/{tree.pk}/relationships/bulk/', [
+            {'from_member': member.pk, 'to_member': kid.pk, 'relationship_type': 'parent'}
+            for kid in kids
+        ], format='json')
+        assert res.status_code == status.HTTP_201_CREATED
+        assert MemberLineage.objects.filter(ancestor=member).count() == 2
+        tree.refresh_from_db()
+        assert tree.relationship_count == 2
+
+        again = owner_client.post(f'/api/trees/{tree.pk}/relationships/bulk/', [
+            {'from_member': member.pk, 'to_member': kids[0].pk, 'relationship_type': 'parent'},
+        ], format='json')
+        assert again.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bulk_relationships_same_tree_rule(self, owner_client, owner, tree, member):
+        other_tree = Tree.objects.create(name='Other Tree', created_by=owner)
+        outsider = FamilyMember.objects.create(tree=other_tree, first_name='Al', last_name='Roe')
+        res = owner_client.post(f'/api/trees/{tree.pk}/relationships/bulk/', [
+            {'from_member': member.pk, 'to_member': outsider.pk, 'relationship_type': 'sibling'},
+        ], format='json')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert res.data['results'][0]['status'] == 'invalid'
+
+    def test_viewer_cannot_bulk_write(self, other_client, other_user, tree):
+        TreePermission.objects.create(tree=tree, user=other_user, role='viewer', status='active')
+        res = other_client.post(f'/api/trees/{tree.pk}/members/bulk/', [
+            {'first_name': 'Rose', 'last_name': 'Doe'},
+        ], format='json')
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+# ─── Member search ───────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestMemberSearch:
+
+    def test_search_ranks_and_matches_prefixes(self, owner_client, owner, tree, member):
+        FamilyMember.objects.create(
+            tree=tree, first_name='Ann', last_name='Smith', biography='Married John Doerr', added_by=owner,
+        )
+        FamilyMember.objects.create(tree=tree, first_name='José', last_name='Doerr', added_by=owner)
+        res = owner_client.get('/api/members/', {'search': 'doe'})
+        names = [m['first_name'] for m in res.data['results']]
+        assert names[0] in ('John', 'José') and names[-1] == 'Ann'
+        assert len(names) == 3
+
+        res = owner_client.get('/api/members/', {'search': 'jose'})
+        assert [m['first_name'] for m in res.data['results']] == ['José']
+
+    def test_index_follows_saves_and_deletes(self, owner_client, member):
+        member.first_name = 'Jonah'
+        member.save()
+        assert owner_client.get('/api/members/', {'search': 'jonah'}).data['results']
+        member.delete()
+        assert not owner_client.get('/api/members/', {'search': 'jonah'}).data['results']
+
+    def test_search_respects_visibility(self, other_client, member):
+        assert not other_client.get('/api/members/', {'search': 'john'}).data['results']
+
+
+# ─── Name keys / ?name_like= ─────────────────────────────────────────────────
+
+def test_name_keys():
+    from tree.names import double_metaphone, latin_name, name_keys, soundex
+    assert name_keys('Müller')['folded'] == 'muller'
+    assert latin_name('Müller') == latin_name('Mueller') == 'mueller'
+    assert latin_name('कबिला') == 'kabila'
+    assert double_metaphone('Kabilla')[0] == double_metaphone('Kabila')[0] == 'KPL'
+    assert soundex('Robert') == soundex('Rupert') == 'R163'
+    assert name_keys('王伟') == {
+        'folded': '王伟', 'latin': '王伟', 'metaphone': '', 'metaphone_alt': '', 'soundex': '',
+    }
+
+
+@pytest.mark.django_db
+class TestNameLike:
+
+    def test_keys_follow_saves(self, member):
+        assert (member.last_name_folded, member.last_name_metaphone) == ('doe', 'T')
+        member.last_name = 'Müller'
+        member.save(update_fields=['last_name'])
+        member.refresh_from_db()
+        assert member.last_name_latin == 'mueller'
+
+    def test_fuzzy_lookup(self, owner_client, owner, tree):
+        for first, last in (('Jean', 'Kabila'), ('Anna', 'Mueller'), ('Élise', 'Dupont')):
+            FamilyMember.objects.create(tree=tree, first_name=first, last_name=last, added_by=owner)
+
+        def names(term):
+            res = owner_client.get('/api/members/', {'name_like': term})
+            return sorted(m['last_name'] for m in res.data['results'])
+
+        assert names('Kabilla') == ['Kabila']
+        assert names('müller') == ['Mueller']
+        assert names('elise') == ['Dupont']
+        assert names('jean kabila') == ['Kabila']
+        assert names('jean mueller') == []
+
+
+# ─── Duplicate detection ─────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestDuplicates:
+
+    def _person(self, tree, owner, first, last, year=None, **fields):
+        from datetime import date
+        from tree.models import FuzzyDate
+        born = FuzzyDate(date=date(year, 1, 1), precision='year') if year else None
+        return FamilyMember.objects.create(
+            tree=tree, first_name=first, last_name=last, birth_date=born, added_by=owner, **fields
+        )
+
+    def test_finds_close_pairs_only(self, owner_client, owner, tree):
+        a = self._person(tree, owner, 'Jean', 'Kabila', 1921, birth_location='Lubumbashi')
+        b = self._person(tree, owner, 'Jean', 'Kabilla', 1920, birth_location='Lubumbashi, Congo')
+        self._person(tree, owner, 'Marie', 'Kabila', 1921, gender='female')
+        self._person(tree, owner, 'Jean', 'Kabila', 1975)
+        self._person(tree, owner, 'Jean', 'Dupont', 1921)
+
+        res = owner_client.get(f'/api/trees/{tree.id}/duplicates/')
+        assert res.status_code == 200
+        assert [[m['id'] for m in pair['members']] for pair in res.data['results']] == [[a.id, b.id]]
+        assert res.data['results'][0]['score'] > 0.85
+
+    def test_related_members_are_not_duplicates(self, owner_client, owner, tree):
+        from tree.models import FamilyRelationship
+        a = self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        b = self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        assert owner_client.get(f'/api/trees/{tree.id}/duplicates/').data['count'] == 1
+        FamilyRelationship.objects.create(from_member=a, to_member=b, relationship_type='sibling')
+        assert owner_client.get(f'/api/trees/{tree.id}/duplicates/').data['count'] == 0
+
+    def test_cached_until_members_change(self, owner, tree, django_assert_num_queries):
+        from tree.duplicates import find_duplicates
+        a = self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        assert len(find_duplicates(tree.id)) == 1
+        with django_assert_num_queries(0):
+            find_duplicates(tree.id)
+        a.first_name = 'Pierre'
+        a.save()
+        assert find_duplicates(tree.id) == []
+
+    def test_rejects_min_score_below_scan_floor(self, owner_client, owner, tree):
+        self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        res = owner_client.get(f'/api/trees/{tree.id}/duplicates/', {'min_score': 0.5})
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        res = owner_client.get(f'/api/trees/{tree.id}/duplicates/', {'min_score': 0.9})
+        assert res.status_code == status.HTTP_200_OK
+
+    def test_scheduled_scan_warms_cache(self, owner, tree, django_assert_num_queries):
+        from tree.duplicates import find_duplicates
+        from tree.tasks import scan_tree_duplicates
+        self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        self._person(tree, owner, 'Jean', 'Kabila', 1921)
+        assert scan_tree_duplicates() == 1
+        with django_assert_num_queries(0):
+            assert len(find_duplicates(tree.id)) == 1
+
+    def test_requires_collaborator(self, other_client, tree):
+        assert other_client.get(f'/api/trees/{tree.id}/duplicates/').status_code in (403, 404)
+
+
+# ─── Member merge ────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestMemberMerge:
+
+    def test_merge_moves_references(self, owner_client, owner, tree, member):
+        from history.models import AuditLog, LifeEvent
+        from tree.models import FamilyRelationship, MemberLineage
+        drop = FamilyMember.objects.create(
+            tree=tree, first_name='Jon', last_name='Doe', biography='Farmer', added_by=owner,
+        )
+        parent = FamilyMember.objects.create(tree=tree, first_name='Old', last_name='Doe', added_by=owner)
+        child = FamilyMember.objects.create(tree=tree, first_name='Kid', last_name='Doe', added_by=owner)
+        FamilyRelationship.objects.create(from_member=parent, to_member=member, relationship_type='parent')
+        FamilyRelationship.objects.create(from_member=parent, to_member=drop, relationship_type='parent')
+        FamilyRelationship.objects.create(from_member=drop, to_member=child, relationship_type='parent')
+        FamilyRelationship.objects.create(from_member=member, to_member=drop, relationship_type='sibling')
+        event = LifeEvent.objects.create(member=drop, event_type='other', title='Moved')
+
+        res = owner_client.post(f'/api/members/{member.id}/merge/{drop.id}/')
+        assert res.status_code == 200, res.data
+        assert res.data['filled'] == ['biography']
+
+        assert not FamilyMember.objects.filter(pk=drop.pk).exists()
+        member.refresh_from_db()
+        assert member.biography == 'Farmer'
+        event.refresh_from_db()
+        assert event.member_id == member.pk
+        assert set(FamilyRelationship.objects.values_list('from_member_id', 'to_member_id')) == {
+            (parent.pk, member.pk), (member.pk, child.pk),
+        }
+        assert MemberLineage.objects.filter(ancestor=parent, descendant=child, depth=2).exists()
+        tree.refresh_from_db()
+        assert (tree.member_count, tree.relationship_count) == (3, 2)
+        assert AuditLog.objects.filter(action='merge', object_id=member.pk).count() == 1
+
+    def test_merge_rejects_other_tree_and_self(self, owner_client, owner, member):
+        other_tree = Tree.objects.create(name='Other', created_by=owner)
+        TreePermission.objects.create(tree=other_tree, user=owner, role='owner', status='active')
+        stranger = FamilyMember.objects.create(tree=other_tree, first_name='A', last_name='B', added_by=owner)
+        assert owner_client.post(f'/api/members/{member.id}/merge/{stranger.id}/').status_code == 400
+        assert owner_client.post(f'/api/members/{member.id}/merge/{member.id}/').status_code == 400
+
+    def test_merge_requires_editor(self, other_client, member):
+        drop = FamilyMember.objects.create(tree=member.tree, first_name='Jon', last_name='Doe')
+        assert other_client.post(f'/api/members/{member.id}/merge/{drop.id}/').status_code in (403, 404)
+
+
+# ─── Inline member dates ─────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestInlineDates:
+
+    def test_derived_columns(self, member):
+        from datetime import date
+        from tree.dates import day_number
+        from tree.models import FuzzyDate
+        member.birth_date = FuzzyDate(date=date(1921, 3, 7), precision='year')
+        member.death_date = FuzzyDate(date=date(1990, 6, 2), precision='exact')
+        member.save()
+        member.refresh_from_db()
+        assert (member.birth_date_low, member.birth_date_high) == (
+            day_number(1921, 1, 1), day_number(1921, 12, 31),
+        )
+        assert (member.birth_month, member.birth_day) == (None, None)
+        assert (member.death_month, member.death_day) == (6, 2)
+        assert member.death_date.precision == 'exact'
+        member.birth_date = None
+        member.save()
+        assert FamilyMember.objects.get(pk=member.pk).birth_date is None
+
+    def test_bce_sorts_before_ce(self):
+        from datetime import date
+        from tree.dates import fuzzy_range
+        from tree.dates import day_number
+        bce_low, bce_high = fuzzy_range(date(44, 3, 15), 'exact', bce=True)
+        assert bce_high < fuzzy_range(date(1, 1, 1), 'exact')[0]
+        # 10–1 BCE, then 1–9 CE: neither decade runs across the era boundary
+        bce_decade = fuzzy_range(date(1, 1, 1), 'decade', bce=True)
+        ce_decade = fuzzy_range(date(5, 1, 1), 'decade')
+        assert bce_high < bce_decade[0] < bce_decade[1] < ce_decade[0]
+        assert bce_decade == (day_number(10, 1, 1, bce=True), day_number(1, 12, 31, bce=True))
+        assert ce_decade == (day_number(1, 1, 1), day_number(9, 12, 31))
+        assert fuzzy_range(date(15, 1, 1), 'decade', bce=True)[0] == day_number(20, 1, 1, bce=True)
+
+    def test_serializer_accepts_object_and_iso(self, owner_client, member):
+        from tree.models import FuzzyDate
+        res = owner_client.patch(f'/api/members/{member.pk}/', {
+            'birth_date': {'date': '1950-05-01', 'precision': 'month_year'},
+        }, format='json')
+        assert res.status_code == status.HTTP_200_OK, res.data
+        assert res.data['birth_date'] == '1950-05-01'
+        assert 'id' not in res.data['birth_date_detail']
+        member.refresh_from_db()
+        assert (member.birth_date_precision, member.birth_month, member.birth_day) == ('month_year', 5, None)
+        assert not FuzzyDate.objects.exists()
+
+        # FuzzyDate ids are refused: dates are not rows any more
+        res = owner_client.patch(f'/api/members/{member.pk}/', {'birth_date': 1}, format='json')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+        res = owner_client.patch(f'/api/members/{member.pk}/', {
+            'birth_date': {'date': '1949-01-01', 'precision': 'approximate'},
+        }, format='json')
+        assert res.status_code == status.HTTP_200_OK, res.data
+        assert res.data['birth_date_detail']['precision'] == 'approximate'
+
+        res = owner_client.patch(f'/api/members/{member.pk}/', {'death_date': '2001-09-30'}, format='json')
+        assert res.status_code == status.HTTP_200_OK, res.data
+        member.refresh_from_db()
+        assert (member.death_date_precision, member.death_month, member.death_day) == ('exact', 9, 30)
+
+        res = owner_client.patch(f'/api/members/{member.pk}/', {'birth_date': 'soon'}, format='json')
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# ─── Date-range filters ──────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestDateRangeFilters:
+
+    def _born(self, tree, owner, first, value, precision):
+        from tree.models import FuzzyDate
+        return FamilyMember.objects.create(
+            tree=tree, first_name=first, last_name='Doe', added_by=owner,
+            birth_date=FuzzyDate(date=value, precision=precision),
+        )
+
+    def test_fuzzy_date_ordinals(self):
+        from datetime import date
+        from tree.dates import MAX_DAY, day_number, parse_bound
+        from tree.models import FuzzyDate
+        decade = FuzzyDate(date=date(1944, 1, 1), precision='decade')
+        assert (decade.earliest_ordinal, decade.latest_ordinal) == (
+            day_number(1940, 1, 1), day_number(1949, 12, 31),
+        )
+        after = FuzzyDate(date=date(1900, 1, 1), precision='after')
+        assert after.latest_ordinal == MAX_DAY
+        iso = FuzzyDate(date='1980-05-15', precision='year')
+        assert iso.earliest_ordinal == day_number(1980, 1, 1)
+        assert parse_bound('-44') < parse_bound('1') < parse_bound('1900-05', end=True)
+        with pytest.raises(ValueError):
+            parse_bound('1900-13')
+
+    def test_member_born_filters(self, owner_client, owner, tree):
+        from datetime import date
+        exact = self._born(tree, owner, 'Exact', date(1910, 5, 1), 'exact')
+        decade = self._born(tree, owner, 'Decade', date(1920, 1, 1), 'decade')
+        after = self._born(tree, owner, 'After', date(1905, 1, 1), 'after')
+        self._born(tree, owner, 'Late', date(1950, 1, 1), 'year')
+
+        def ids(query):
+            res = owner_client.get(f'/api/members/?{query}')
+            assert res.status_code == status.HTTP_200_OK, res.data
+            return {m['id'] for m in res.data['results']}
+
+        assert ids('born_after=1900&born_before=1920') == {exact.pk}
+        assert ids('born_overlaps=1900,1920') == {exact.pk, decade.pk, after.pk}
+        assert ids('born_before=1929') == {exact.pk, decade.pk}
+        assert owner_client.get('/api/members/?born_after=soon').status_code == 400
+        res = owner_client.get(f'/api/trees/{tree.pk}/members/?born_overlaps=1925,1930')
+        assert {m['id'] for m in res.data['results']} == {decade.pk, after.pk}
+
+    def test_life_event_filters(self, owner_client, member):
+        from datetime import date
+        from history.models import LifeEvent
+        army = LifeEvent.objects.create(
+            member=member, event_type='military', title='Army',
+            date=date(1940, 3, 1), end_date=date(1945, 6, 1),
+        )
+        LifeEvent.objects.create(member=member, event_type='other', title='Moved', date='1960-01-01')
+        LifeEvent.objects.create(member=member, event_type='other', title='Undated')
+
+        res = owner_client.get(f'/api/life-events/?member={member.pk}&date_overlaps=1944,1950')
+        assert res.status_code == status.HTTP_200_OK, res.data
+        assert [e['id'] for e in res.data['results']] == [army.pk]
+        res = owner_client.get('/api/life-events/?date_after=1941')
+        assert [e['title'] for e in res.data['results']] == ['Moved']